@@ -4,6 +4,7 @@ import sys
 import os
 import logging
 import platform
+from contextlib import contextmanager
 
 from direct.showbase.DirectObject import DirectObject
 
@@ -14,6 +15,7 @@ from panda3d.core import (
     loadPrcFileData,
     WindowProperties,
     ConfigVariableInt,
+    ConfigVariableDouble,
     ConfigVariableBool,
     ConfigVariableString,
     ConfigVariableSearchPath,
@@ -37,6 +39,7 @@ from DirectGuiDesigner.export.ExporterPy import ExporterPy
 from DirectGuiDesigner.export.ExporterProject import ExporterProject
 
 from DirectGuiDesigner.loader.Project import ProjectLoader
+from DirectGuiDesigner.tools.BinaryProject import BinaryProject
 
 from DirectGuiDesigner.dialogs.SettingsDialog import GUI as SettingsDialog
 
@@ -44,6 +47,8 @@ from DirectGuiDesigner.core.ElementHandler import ElementHandler
 from DirectGuiDesigner.core.ElementInfo import ElementInfo
 from DirectGuiDesigner.core.CustomWidgets import CustomWidgets
 from DirectGuiDesigner.core.KillRing import KillRing
+from DirectGuiDesigner.core.DefaultValueRegistry import DefaultValueRegistry
+from DirectGuiDesigner.core.ElementRegistry import ElementRegistry
 
 from DirectGuiDesigner.GUI.MainView import MainView
 
@@ -60,7 +65,7 @@ from DirectGuiDesigner.core.PropertyHelper import PropertyHelper
 class DirectGuiDesigner(DirectObject):
     # dict of all elements in the visual editor
     # Key = guiID; Value = elementInfo
-    elementDict = {}
+    elementDict = ElementRegistry()
 
     def __init__(self, parent):
         logging.debug("Start Designer")
@@ -79,10 +84,28 @@ class DirectGuiDesigner(DirectObject):
 
         self.dirty = False
         self.hasSaved = False
-        self.killRing = KillRing()
+        # counts changes to the project, used to skip unnecessary autosaves
+        self.editRevision = 0
+        self.lastAutosaveRevision = 0
+        # exporter of the autosave that may still be running and the
+        # revision it saves
+        self.autosaveExporter = None
+        self.autosaveRevision = 0
+        # limit the undo history, removed elements are kept alive for as
+        # long as they can be brought back with undo
+        self.killRing = KillRing(
+            ConfigVariableInt("undo-history-max-entries", 500).getValue(),
+            ConfigVariableInt("undo-history-memory-budget", 256).getValue() * 1024 * 1024,
+            self.releaseKillRingObject,
+            ConfigVariableDouble("undo-coalesce-time", 1.0).getValue())
+        # seconds to wait after moving elements with the keyboard before the
+        # properties panel will be updated
+        self.moveRefreshDelay = 0.2
 
         self.lastDirPath = ConfigVariableString("work-dir-path", "~").getValue()
         self.lastFileNameWOExtension = "export"
+        # the project file format last used, either .gui or binary
+        self.lastProjectExtension = ".gui"
 
         wp = WindowProperties()
         if platform.system() == "Windows":
@@ -121,6 +144,13 @@ class DirectGuiDesigner(DirectObject):
 
         self.openDialogCloseFunctions = []
 
+        # the loader of the last project loaded with the file browser
+        self.projectLoader = None
+
+        # whether the whole structure tree has to be rebuilt in this frame
+        # rather than only the changed subtrees
+        self.structureTreeOutdated = False
+
         self.copyOptionsElementInfo = None
 
         self.copiedElement = None
@@ -142,6 +172,13 @@ class DirectGuiDesigner(DirectObject):
         # Load user custom widgets
         self.customWidgetsHandler.loadCustomWidgets()
 
+        # Read the default values of widgets that need to be compared against
+        # vanilla instances of themselves when saving
+        DefaultValueRegistry.prewarm(
+            {**WidgetDefinition.DEFINITIONS,
+             **self.customWidgetsHandler.getCustomWidgetDefinitions()},
+            self.customWidgetsHandler.customWidgetsDict)
+
         # Exception save-file-handling
         tmpPath = os.path.join(tempfile.gettempdir(), "DGDExceptionSave.gui")
         if os.path.exists(tmpPath):
@@ -246,6 +283,7 @@ class DirectGuiDesigner(DirectObject):
         self.accept("createControl", self.__createControl)
         self.accept("selectElement", self.selectElement)
         self.accept("removeElement", self.removeElement)
+        self.accept("removeElements", self.removeElements)
         self.accept("copyOptions", self.copyOptions)
         self.accept("pasteOptions", self.pasteOptions)
         self.accept("cutElement", self.cutElement)
@@ -265,6 +303,8 @@ class DirectGuiDesigner(DirectObject):
         self.accept("toggleElementVisibility", self.toggleElementVisibility)
         self.accept("setParentOfElement", self.setParentOfElement)
         self.accept("addToKillRing", self.addToKillRing)
+        self.accept("beginKillRingTransaction", self.killRing.beginTransaction)
+        self.accept("commitKillRingTransaction", self.commitKillRingTransaction)
 
         # HELP DIALOG
         self.accept("showHelp", self.showHelp)
@@ -307,8 +347,10 @@ class DirectGuiDesigner(DirectObject):
 
     def setDirty(self):
         """Set dirty tag of self to True and add '*' to the window title."""
-        base.messenger.send("request_dirty_name")
+        if not self.dirty:
+            base.messenger.send("request_dirty_name")
         self.dirty = True
+        self.editRevision += 1
 
     def setClean(self):
         """Set dirty tag of self to False and remove '*' from the window title."""
@@ -330,16 +372,66 @@ class DirectGuiDesigner(DirectObject):
             return
         logging.debug(f"Add to killring action={action}, type={objectType}, old={oldValue}, new={newValue}")
         self.killRing.push(editObject, action, objectType, oldValue, newValue)
+        base.messenger.send("setUndoHistorySize", [self.killRing.entryCount, self.killRing.memoryUsage])
+
+    def commitKillRingTransaction(self):
+        """Add all actions since the beginKillRingTransaction event as one
+        undo step"""
+        self.killRing.commitTransaction()
+        base.messenger.send("setUndoHistorySize", [self.killRing.entryCount, self.killRing.memoryUsage])
+
+    @contextmanager
+    def killRingTransaction(self):
+        """Add all actions of the with block to the KillRing as one undo
+        step, even if the block raises"""
+        try:
+            with self.killRing.transaction():
+                yield
+        finally:
+            base.messenger.send("setUndoHistorySize", [self.killRing.entryCount, self.killRing.memoryUsage])
+
+    def __closeOpenKillRingTransaction(self):
+        """Make sure a transaction which hasn't been committed, e.g. due to
+        an error, doesn't swallow all following actions"""
+        if self.killRing.transactionDepth > 0:
+            logging.warning("Closing a KillRing transaction that hasn't been committed")
+            self.killRing.abortTransaction()
+
+    def releaseKillRingObject(self, editObject):
+        """Destroy a removed element which can't be brought back by undo
+        anymore, as the last KillRing entry referring to it has been dropped"""
+        if not hasattr(editObject, "guiId") or editObject.isEmpty():
+            return
+        if editObject.guiId in self.elementDict or not editObject.isStashed():
+            # the element is still part of the project
+            return
+        logging.debug(f"destroy element {editObject.guiId} dropped from the undo history")
+        editObject.destroy()
 
     def undo(self):
         """Undo the latest change in the current branch of the 'KillRing'.
         If the user hasn't just cycled between redo branches this will be the latest change.
         """
+        self.__closeOpenKillRingTransaction()
+
         # undo this action
         workOn = self.killRing.pop()
 
         if workOn is None: return
 
+        self.__undoEntry(workOn)
+
+        if self.selectedElement is not None:
+            self.refreshProperties(self.selectedElement)
+        base.messenger.send("setDirtyFlag")
+
+    def __undoEntry(self, workOn):
+        """Revert the change stored in the given KillRing entry"""
+        if workOn.action == "group":
+            for entry in reversed(workOn.newValue):
+                self.__undoEntry(entry)
+            return
+
         if workOn.action == "set":
             if workOn.objectType == "pos":
                 logging.debug(f"undo Position to {workOn.oldValue}")
@@ -371,31 +463,21 @@ class DirectGuiDesigner(DirectObject):
             if workOn.objectType == "element":
                 self.removeElement(workOn.editObject.element, False)
             elif workOn.objectType == "properties":
-                for key, value in workOn.oldValue.items():
-                    if key == "pos":
-                        workOn.editObject.element.setPos(value)
-                    elif key == "hpr":
-                        workOn.editObject.element.setHpr(value)
-                    elif key == "scale":
-                        workOn.editObject.element.setScale(value)
-                    elif key == "text_fg":
-                        workOn.editObject.element["text_fg"] = value
-                    else:
-                        workOn.editObject.element[key] = value[1]
+                self.__setCopiedOptions(workOn.editObject, workOn.oldValue)
 
         elif workOn.action == "cut":
             if workOn.objectType == "element":
                 workOn.editObject.element.reparentTo(workOn.oldValue)
                 self.setParentOfElement(workOn.editObject.element, workOn.oldValue)
 
-        if self.selectedElement is not None:
-            self.refreshProperties(self.selectedElement)
-        base.messenger.send("setDirtyFlag")
+        self.invalidateJSONCache(workOn.editObject)
 
     def redo(self):
         """Redo the latest change in the current branch of the 'KillRing'.
         If the user hasn't just cycled between redo branches this will be the latest change.
         """
+        self.__closeOpenKillRingTransaction()
+
         # redo this
         workOn = self.killRing.pull()
 
@@ -403,6 +485,26 @@ class DirectGuiDesigner(DirectObject):
             logging.debug("nothing to redo")
             return
 
+        self.__redoEntry(workOn)
+
+        if self.selectedElement is not None:
+            self.refreshProperties(self.selectedElement)
+        base.messenger.send("setDirtyFlag")
+
+    def __redoEntry(self, workOn):
+        """Apply the change stored in the given KillRing entry again"""
+        if workOn.action == "group":
+            kills = [
+                entry.editObject for entry in workOn.newValue
+                if entry.action == "kill" and entry.objectType == "element"]
+            if len(kills) == len(workOn.newValue):
+                # the elements have been removed together
+                self.removeElements(kills, False)
+                return
+            for entry in workOn.newValue:
+                self.__redoEntry(entry)
+            return
+
         if workOn.action == "set":
             if workOn.objectType == "pos":
                 if type(workOn.newValue) is list:
@@ -431,26 +533,22 @@ class DirectGuiDesigner(DirectObject):
                 self.elementDict[workOn.oldValue[0]] = workOn.oldValue[1]
                 base.messenger.send("refreshStructureTree")
             elif workOn.objectType == "properties":
-                for key, value in workOn.newValue.items():
-                    if key == "pos":
-                        workOn.editObject.element.setPos(value)
-                    elif key == "hpr":
-                        workOn.editObject.element.setHpr(value)
-                    elif key == "scale":
-                        workOn.editObject.element.setScale(value)
-                    elif key == "text_fg":
-                        workOn.editObject.element["text_fg"] = value
-                    else:
-                        workOn.editObject.element[key] = value[1]
+                self.__setCopiedOptions(workOn.editObject, workOn.newValue)
 
         elif workOn.action == "cut":
             if workOn.objectType == "element":
                 workOn.editObject.element.reparentTo(workOn.newValue)
                 self.setParentOfElement(workOn.editObject.element, workOn.newValue)
 
-        if self.selectedElement is not None:
-            self.refreshProperties(self.selectedElement)
-        base.messenger.send("setDirtyFlag")
+        self.invalidateJSONCache(workOn.editObject)
+
+    def invalidateJSONCache(self, editObject):
+        """Make sure the element of the given ElementInfo or GUI element will
+        be serialized from scratch the next time the project gets saved"""
+        if isinstance(editObject, ElementInfo):
+            editObject.invalidateJSONCache()
+        elif hasattr(editObject, "guiId") and editObject.guiId in self.elementDict:
+            self.elementDict[editObject.guiId].invalidateJSONCache()
 
     def cycleKillRing(self):
         """Cycles through the redo branches at the current depth of the kill ring"""
@@ -463,6 +561,9 @@ class DirectGuiDesigner(DirectObject):
         fn = os.path.splitext(os.path.basename(path))[0]
         if fn != "":
             self.lastFileNameWOExtension = os.path.splitext(os.path.basename(path))[0]
+        ext = os.path.splitext(path)[1]
+        if ext in [".gui", BinaryProject.fileExtension]:
+            self.lastProjectExtension = ext
 
     def getAllEditorPlacers(self):
         """Get all default positions for elements on the canvas (for example topRight, leftCenter).
@@ -499,14 +600,26 @@ class DirectGuiDesigner(DirectObject):
     def autosaveTask(self, task):
         """Task to autosave the current project (by default every minute)."""
         task.delayTime = ConfigVariableInt("autosave-delay", 60).getValue()
+        if ExporterProject.isAutosaveRunning():
+            # try again with the next run
+            return task.again
+        if self.autosaveExporter is not None:
+            # only count the revision as saved if the file has been written
+            if self.autosaveExporter.autosaveSucceeded:
+                self.lastAutosaveRevision = self.autosaveRevision
+            self.autosaveExporter = None
+        if self.editRevision == self.lastAutosaveRevision:
+            # nothing changed since the last autosave
+            return task.again
         try:
+            revision = self.editRevision
             filename = ""
             if self.hasSaved:
                 filename = os.path.join(self.lastDirPath, self.lastFileNameWOExtension + ".gui~")
             allWidgetDefinitions = {
                 **WidgetDefinition.DEFINITIONS,
                 **self.customWidgetsHandler.getCustomWidgetDefinitions()}
-            ExporterProject(
+            self.autosaveExporter = ExporterProject(
                 filename,
                 self.elementDict,
                 self.getEditorFrame,
@@ -515,6 +628,7 @@ class DirectGuiDesigner(DirectObject):
                 allWidgetDefinitions,
                 not self.mainView.editorFrame.visEditorInAspect2D,
                 autosave=True)
+            self.autosaveRevision = revision
         except Exception as e:
             logging.error("Autosave failed")
             logging.exception(e)
@@ -557,7 +671,7 @@ class DirectGuiDesigner(DirectObject):
             "shift-control-y": [self.cycleKillRing],
 
             "page_up": [self.moveElementInStructure, [1]],
-            "page_down": [self.moveElementInStructure, [-2]],
+            "page_down": [self.moveElementInStructure, [-1]],
 
             "arrow_left": [self.moveElement, ["left"]],
             "arrow_right": [self.moveElement, ["right"]],
@@ -615,8 +729,33 @@ class DirectGuiDesigner(DirectObject):
         self.mainView.propertiesFrame.setupProperties("Editor Properties", elementInfo, self.elementDict)
 
     def __refreshStructureTree(self):
+        """Request an update of the structure tree panel to reflect the current
+        state of the project. All requests within one frame will be handled by
+        one update at the end of the frame."""
+        self.structureTreeOutdated = True
+        self.__scheduleStructureTreeRefresh()
+
+    def __refreshStructureSubtree(self, node):
+        """Request an update of the structure tree items of the node and its
+        descendants. All subtrees changed within one frame will be updated
+        together at the end of the frame."""
+        self.mainView.structureFrame.queueSubtreeRefresh(node)
+        self.__scheduleStructureTreeRefresh()
+
+    def __scheduleStructureTreeRefresh(self):
+        if taskMgr.hasTaskNamed("refreshStructureTreeTask"):
+            return
+        # run right before the frame gets rendered
+        taskMgr.add(self.__refreshStructureTreeTask, "refreshStructureTreeTask", sort=49)
+
+    def __refreshStructureTreeTask(self, task):
         """Update the structure tree panel to reflect the current state of the project."""
-        self.mainView.structureFrame.refreshStructureTree(self.elementDict, self.selectedElement)
+        if self.structureTreeOutdated:
+            self.structureTreeOutdated = False
+            self.mainView.structureFrame.refreshStructureTree(self.elementDict, self.selectedElement)
+        else:
+            self.mainView.structureFrame.refreshQueuedSubtrees()
+        return task.done
 
     def __createControl(self, element, skipAddToKillRing=False, parentInfo=None, skipAddItemFunc=False):
         """Create a new element and reparent it to the selected object.
@@ -674,7 +813,10 @@ class DirectGuiDesigner(DirectObject):
             sort = self.getMaxSort(elementInfo)
             elementInfo.element.reparentTo(elementInfo.element.getParent(), sort)
             self.elementDict[elementInfo.element.guiId] = elementInfo
-        base.messenger.send("refreshStructureTree")
+        if type(elementInfo) is tuple:
+            self.__refreshStructureSubtree(elementInfo[0].element.getParent())
+        else:
+            self.__refreshStructureSubtree(elementInfo.element.getParent())
         base.messenger.send("setDirtyFlag")
 
         if not skipAddToKillRing:
@@ -685,8 +827,6 @@ class DirectGuiDesigner(DirectObject):
                 base.messenger.send("addToKillRing",
                     [elementInfo.element, "add", "element", (elementInfo.element.guiId, elementInfo), None])
 
-        self.fixElementSortAll()
-
         return elementInfo
 
     def selectElement(self, elementInfo, args=None):
@@ -715,7 +855,7 @@ class DirectGuiDesigner(DirectObject):
             # we don't need to select the editor itself
             self.selectedElement = None
             self.refreshProperties(elementInfo)
-            base.messenger.send("refreshStructureTree")
+            self.mainView.structureFrame.setSelectedElement(None)
             return
         if elementInfo.element is None:
             return
@@ -727,7 +867,7 @@ class DirectGuiDesigner(DirectObject):
             elementInfo.element.setColorScale(1, 1, 0, 1)
 
         self.refreshProperties(elementInfo)
-        base.messenger.send("refreshStructureTree")
+        self.mainView.structureFrame.setSelectedElement(elementInfo)
 
     def refreshProperties(self, elementInfo):
         """Clear the properties panel and populate it with the properties of the new elementInfo.
@@ -830,6 +970,7 @@ class DirectGuiDesigner(DirectObject):
                 t.elementInfo.element.setZ(self.mainView.editorFrame.getEditorCanvasSize()[3])
 
         if t.hasMoved:
+            t.elementInfo.invalidateJSONCache()
             definition = PropertyHelper.getDefinition(t.elementInfo, "pos")
             PropertyHelper.setValue(definition, t.elementInfo, pos)
             self.refreshProperties(t.elementInfo)
@@ -864,81 +1005,140 @@ class DirectGuiDesigner(DirectObject):
             workOn.setZ(workOn, speed*moverScaleZ*speedMult)
         elif direction == "down":
             workOn.setZ(workOn, -speed*moverScaleZ*speedMult)
-        self.refreshProperties(self.selectedElement)
+        self.selectedElement.invalidateJSONCache()
         base.messenger.send("setDirtyFlag")
         base.messenger.send("addToKillRing",
             [self.selectedElement, "set", "pos", startPos, workOn.getPos()])
 
+        # refresh the properties once the element stopped moving rather
+        # than on every key repeat
+        taskMgr.remove("refreshMovedElement")
+        taskMgr.doMethodLater(self.moveRefreshDelay, self.__refreshMovedElement, "refreshMovedElement")
+
+    def __refreshMovedElement(self, task):
+        if self.selectedElement is not None:
+            self.refreshProperties(self.selectedElement)
+        return task.done
+
     def removeElement(self, element=None, includeWithKillCycle=True):
         """Remove element from the project."""
-        workOn = None
-        selectEditor = False
-        if element is not None:
-            workOn = element
-            if self.selectedElement is not None and element == self.selectedElement.element:
-                selectEditor = True
-                self.selectedElement = None
-        elif self.selectedElement is not None:
+        if element is None:
+            if self.selectedElement is None:
+                return
             taskMgr.remove("dragDropTask")
-            selectEditor = True
-            workOn = self.selectedElement.element
-            self.selectedElement = None
-        else:
-            return
-
-        oldParent = None
-        if not workOn.isEmpty() and not workOn.isStashed():
-            self.canvasParents = [
-                "canvasTopCenter","canvasBottomCenter","canvasLeftCenter","canvasRightCenter",
-                "canvasTopLeft","canvasTopRight","canvasBottomLeft","canvasBottomRight"]
-            name = workOn.getName()
-            if name.split("-")[1] in self.elementDict.keys():
-                name = name.split("-")[1]
-            if name in self.elementDict.keys():
-
-                if includeWithKillCycle:
-                    base.messenger.send("addToKillRing",
-                        [workOn, "kill", "element", (name, self.elementDict[name]), None])
-
-                if self.elementDict[name].parent is not None \
-                and (self.elementDict[name].parent.getName() if hasattr(self.elementDict[name].parent, "getName") else self.elementDict[name].parent.name) not in self.canvasParents \
-                and self.elementDict[name].parent.type == "DirectScrolledList":
-                    self.elementDict[name].parent.element.removeItem(workOn)
-
-                # Check if our parent is a custom widget
-                if self.elementDict[name].parent is not None \
-                and isinstance(self.elementDict[name].parent, ElementInfo) \
-                and self.customWidgetsHandler.getWidget(self.elementDict[name].parent.type) is not None:
-                    widget = self.customWidgetsHandler.getWidget(self.elementDict[name].parent.type)
-                    if widget.removeItemFunction is not None:
-                        # call custom widget remove function
-                        try:
-                            getattr(self.elementDict[name].parent.element, widget.removeItemFunction)(workOn)
-                        except:
-                            try:
-                                getattr(self.elementDict[name].parent.element, widget.removeItemFunction)()
-                            except Exception as e:
-                                logging.error("Error while calling remove item function {} of item {}".format(widget.removeItemFunction, name))
-                                logging.exception(e)
-                del self.elementDict[name]
-        try:
-            workOn.stash()
-        except Exception as e:
-            print(e)
+            element = self.selectedElement.element
+        self.removeElements([element], includeWithKillCycle)
+
+    def removeElements(self, elements, includeWithKillCycle=True):
+        """Remove the given elements and all their child elements from the
+        project. The registry is only walked once and the structure tree
+        refreshed once, all removed elements can be restored by a single
+        undo step."""
+        # NodePath key: whether the node is part of a removed branch
+        removedKeys = {}
+        roots = []
+        for element in elements:
+            if element is None or element.isEmpty():
+                continue
+            if element.getKey() not in removedKeys:
+                removedKeys[element.getKey()] = True
+                roots.append(element)
 
-        #workOn.destroy()
+        if includeWithKillCycle:
+            with self.killRingTransaction():
+                self.__unregisterRemovedElements(removedKeys, True)
+        else:
+            self.__unregisterRemovedElements(removedKeys, False)
 
-        # cleanup
-        for key, value in self.elementDict.copy().items():
-            if value is None or value.element.isEmpty() or value.element.isStashed():
-                del self.elementDict[key]
+        for workOn in roots:
+            if self.__isInRemovedBranch(workOn.getParent(), removedKeys):
+                # will be stashed with its ancestor
+                continue
+            try:
+                workOn.stash()
+            except Exception:
+                logging.exception(f"Couldn't remove element {workOn}")
 
-        if selectEditor:
+        if self.selectedElement is not None \
+        and (self.selectedElement.element.isEmpty()
+             or self.__isInRemovedBranch(self.selectedElement.element, removedKeys)):
+            taskMgr.remove("dragDropTask")
+            self.selectedElement = None
             self.selectElement(self.visualEditorInfo)
-        self.fixElementSortAll()
-        base.messenger.send("refreshStructureTree")
+
+        if len(roots) == 1 and not roots[0].getParent().isEmpty():
+            self.__refreshStructureSubtree(roots[0].getParent())
+        else:
+            base.messenger.send("refreshStructureTree")
         base.messenger.send("setDirtyFlag")
 
+    def __unregisterRemovedElements(self, removedKeys, includeWithKillCycle):
+        """Remove all elements of the removed branches from the registry in
+        one pass"""
+        for guiId, elementInfo in list(self.elementDict.items()):
+            if elementInfo is None \
+            or elementInfo.element.isEmpty() \
+            or elementInfo.element.isStashed():
+                # cleanup of elements which have been removed before
+                del self.elementDict[guiId]
+                continue
+            workOn = elementInfo.element
+            if not self.__isInRemovedBranch(workOn, removedKeys):
+                continue
+
+            if includeWithKillCycle:
+                base.messenger.send("addToKillRing",
+                    [workOn, "kill", "element", (guiId, elementInfo), None])
+            if not self.__isInRemovedBranch(workOn.getParent(), removedKeys):
+                self.__removeFromParentElement(elementInfo)
+            del self.elementDict[guiId]
+
+    def __isInRemovedBranch(self, node, removedKeys):
+        """Returns True if the node or one of its ancestors is about to be
+        removed. The result is stored for all visited nodes, so the walk up
+        stops at the first node that has already been checked."""
+        visitedKeys = []
+        removed = False
+        while not node.isEmpty():
+            key = node.getKey()
+            if key in removedKeys:
+                removed = removedKeys[key]
+                break
+            visitedKeys.append(key)
+            node = node.getParent()
+        for key in visitedKeys:
+            removedKeys[key] = removed
+        return removed
+
+    def __removeFromParentElement(self, elementInfo):
+        """Call the remove functions of the parent, e.g. of scrolled lists and
+        custom widgets, for an element that is about to be removed"""
+        self.canvasParents = [
+            "canvasTopCenter","canvasBottomCenter","canvasLeftCenter","canvasRightCenter",
+            "canvasTopLeft","canvasTopRight","canvasBottomLeft","canvasBottomRight"]
+        workOn = elementInfo.element
+        name = workOn.guiId
+        if elementInfo.parent is not None \
+        and (elementInfo.parent.getName() if hasattr(elementInfo.parent, "getName") else elementInfo.parent.name) not in self.canvasParents \
+        and elementInfo.parent.type == "DirectScrolledList":
+            elementInfo.parent.element.removeItem(workOn)
+
+        # Check if our parent is a custom widget
+        if elementInfo.parent is not None \
+        and isinstance(elementInfo.parent, ElementInfo) \
+        and self.customWidgetsHandler.getWidget(elementInfo.parent.type) is not None:
+            widget = self.customWidgetsHandler.getWidget(elementInfo.parent.type)
+            if widget.removeItemFunction is not None:
+                # call custom widget remove function
+                try:
+                    getattr(elementInfo.parent.element, widget.removeItemFunction)(workOn)
+                except:
+                    try:
+                        getattr(elementInfo.parent.element, widget.removeItemFunction)()
+                    except Exception as e:
+                        logging.error("Error while calling remove item function {} of item {}".format(widget.removeItemFunction, name))
+                        logging.exception(e)
+
     def toggleElementVisibility(self, element=None):
         workOn = None
         if element is not None:
@@ -952,36 +1152,19 @@ class DirectGuiDesigner(DirectObject):
             workOn.show()
         else:
             workOn.hide()
-        base.messenger.send("refreshStructureTree")
+
+        if workOn.guiId in self.elementDict:
+            self.mainView.structureFrame.updateElement(self.elementDict[workOn.guiId])
+        else:
+            base.messenger.send("refreshStructureTree")
 
     def getMaxSort(self, elementInfo):
         """Returns the next sort value of the parent of the given "child" element"""
-        children = list(elementInfo.element.getParent().getChildren().getPaths())
-        if elementInfo.parent is None:
-            children = children[9:]
-        return len(children)+1
-
-    def fixElementSortAll(self):
-        fixedParents = []
-        for name, elementInfo in self.elementDict.items():
-            if elementInfo.parent in fixedParents:
-                continue
-            fixedParents.append(elementInfo.parent)
-
-            children = list(elementInfo.element.getParent().getChildren().getPaths())
-            if elementInfo.parent is None:
-                children = children[9:]
-
-            #sort = len(children)
-            sort = 1
-            for child in children:
-                child.reparentTo(child.getParent(), sort)
-                sort += 1
+        return self.elementDict.getNextSort(elementInfo.element.getParent())
 
     def moveElementInStructure(self, direction=1, childElementInfo=None):
-        # make sure the sort values of all elements are correct
-        self.fixElementSortAll()
-
+        """Move the element the given number of places forward (positive) or
+        back (negative) between its siblings in the structure."""
         workOn = None
         if childElementInfo is not None:
             workOn = childElementInfo
@@ -990,16 +1173,10 @@ class DirectGuiDesigner(DirectObject):
         else:
             return
 
-        parent = workOn.element.getParent()
-        workOnParent = self.getElementInfo(parent)
-        #self.getElementSort(workOn)
-        newSort = max(0, workOn.element.getSort()+direction)
-
-        self.reparentElement(workOn, workOnParent, newSort)
-
-        # make sure the sort is correct afterward
-        self.fixElementSortAll()
-
+        if not self.elementDict.moveInOrder(workOn, direction):
+            return
+        self.invalidateJSONCache(workOn)
+        self.__refreshStructureSubtree(workOn.element.getParent())
 
     def reparentElement(self, childElementInfo=None, parentElementInfo=None, sortInParent=0):
         workOn = None
@@ -1017,6 +1194,9 @@ class DirectGuiDesigner(DirectObject):
             workOnParent = workOn.getParent()
 
         workOn.reparentTo(workOnParent, sortInParent)
+        if workOn.guiId in self.elementDict:
+            self.elementDict.updateParent(self.elementDict[workOn.guiId])
+        self.invalidateJSONCache(workOn)
 
         base.messenger.send("refreshStructureTree")
 
@@ -1030,11 +1210,9 @@ class DirectGuiDesigner(DirectObject):
         """
         if hasattr(root, "getParent"):
             if not root.getParent().isEmpty():
-                name = root.getParent().getName()
-                if len(root.getName().split("-")) > 1:
-                    name = root.getName().split("-")[1]
-                if name in self.elementDict:
-                    return self.elementDict[name]
+                elementInfo = self.elementDict.getByNode(root)
+                if elementInfo is not None:
+                    return elementInfo
                 return self.__findFirstGUIElement(root.getParent())
             else:
                 return None
@@ -1058,13 +1236,13 @@ class DirectGuiDesigner(DirectObject):
         """Set name of element in 'elementInfo' to 'name'."""
         guiId = elementInfo.element.guiId
         e = self.elementDict[guiId]
-        e.name = name
+        self.elementDict.rename(e, name)
         if e.type == "DirectEntry":
             if (e.parent is not None
             and e.parent.type == "DirectEntryScroll"):
                 parentID = e.parent.element.guiId
                 self.elementDict[parentID].extraOptions["entry"] = name
-        base.messenger.send("refreshStructureTree")
+        self.mainView.structureFrame.updateElement(e)
 
     def setParentOfElement(self, element, parent):
         """Set the parent tag in the elements elementInfo to the correct parent based on 'parent'.
@@ -1079,18 +1257,17 @@ class DirectGuiDesigner(DirectObject):
         if parent is self.mainView.getEditorRootCanvas():
             self.elementDict[element.guiId].parent = None
         else:
-            parentElement = None
-            if parent.getName() in self.elementDict.keys():
-                parentElement = self.elementDict[parent.getName()]
-            elif len(parent.getName().split("-")) > 1 and parent.getName().split("-")[1] in self.elementDict.keys():
-                parentElement = self.elementDict[parent.getName().split("-")[1]]
-            elif parent.getName() in self.canvasParents:
-                parentElement = parent
-            else:
-                # check if we can find an element as parent of the current NP
-                # This happens for elements that have a canvas or other sub NPs
-                parentElement = self.__findFirstGUIElement(parent)
+            parentElement = self.elementDict.getByNode(parent)
+            if parentElement is None:
+                if parent.getName() in self.canvasParents:
+                    parentElement = parent
+                else:
+                    # check if we can find an element as parent of the current NP
+                    # This happens for elements that have a canvas or other sub NPs
+                    parentElement = self.__findFirstGUIElement(parent)
             self.elementDict[element.guiId].parent = parentElement
+        self.elementDict.updateParent(self.elementDict[element.guiId])
+        self.elementDict[element.guiId].invalidateJSONCache()
 
     def copyElement(self):
         """Copy the selected element (store element in 'self.copiedElement' to be copied later)."""
@@ -1190,6 +1367,7 @@ class DirectGuiDesigner(DirectObject):
                 widget.callAddItemFunc(self.selectedElement, self.theCutElement, forceOpenDialog=True)
 
         self.theCutElement.element.clearColorScale()
+        self.elementDict.updateParent(self.theCutElement)
 
         base.messenger.send("addToKillRing",
                             [self.theCutElement, "cut", "element", oldParent, parent])
@@ -1218,20 +1396,12 @@ class DirectGuiDesigner(DirectObject):
         elementTo = elementInfoTo.element
         if elementFrom is None or elementTo is None: return
         try:
-            # store for undo
-            oldOptions = elementTo._optionInfo.copy()
-            oldOptions["hpr"] = elementTo.getHpr()
-            oldOptions["scale"] = elementTo.getScale()
-            oldOptions["pos"] = elementTo.getPos()
-            oldOptions["text_fg"] = None
+            if not skipAddToKillRing:
+                # store for undo
+                oldOptions = self.__getCopiedOptions(elementTo)
 
             text = elementTo["text"]
-            text_fg = None
-            for compName in elementFrom.components():
-                comp = elementFrom.component(compName)
-                if hasattr(comp, "fg"):
-                    text_fg = comp.fg
-                    break
+            text_fg = self.__getTextFg(elementFrom)
 
             hpr = elementFrom.getHpr()
             scale = elementFrom.getScale()
@@ -1240,27 +1410,12 @@ class DirectGuiDesigner(DirectObject):
             elementTo.copyOptions(elementFrom)
             elementTo["text"] = text
             if text_fg is not None:
-
-                for compName in elementTo.components():
-                    comp = elementTo.component(compName)
-                    if hasattr(comp, "fg"):
-                        oldOptions["text_fg"] = comp.fg
-                        break
-
                 elementTo["text_fg"] = text_fg
             elementTo.setHpr(hpr)
             elementTo.setScale(scale)
 
-            # store for redo
-            newOptions = elementTo._optionInfo.copy()
-            newOptions["hpr"] = elementTo.getHpr()
-            newOptions["scale"] = elementTo.getScale()
-            newOptions["pos"] = elementTo.getPos()
-            newOptions["text_fg"] = text_fg
-
             if copyPosition:
                 elementTo.setPos(pos)
-                newOptions["pos"] = elementTo.getPos()
 
             # make sure the changed values are set correct
             for key, changed in elementInfoFrom.valueHasChanged.items():
@@ -1272,6 +1427,8 @@ class DirectGuiDesigner(DirectObject):
             # handle addItemExtra args and AddItemNode
             elementInfoTo.addItemExtraArgs = elementInfoFrom.addItemExtraArgs.copy()
             elementInfoTo.addItemNode = elementInfoFrom.addItemNode
+            elementInfoTo.lazy = elementInfoFrom.lazy
+            elementInfoTo.invalidateJSONCache()
             if parentInfo is not None:
                 widget = self.customWidgetsHandler.getWidget(parentInfo.type)
                 if widget is not None:
@@ -1279,13 +1436,69 @@ class DirectGuiDesigner(DirectObject):
                     widget.callAddItemFunc(parentInfo, elementInfoTo)
 
             if not skipAddToKillRing:
-                base.messenger.send("addToKillRing",
-                    [elementTo, "copy", "properties", oldOptions, newOptions])
+                # only keep the values which have actually been changed
+                oldOptions, newOptions = self.__diffOptions(
+                    oldOptions, self.__getCopiedOptions(elementTo))
+                if newOptions:
+                    base.messenger.send("addToKillRing",
+                        [elementInfoTo, "copy", "properties", oldOptions, newOptions])
         except Exception as e:
             logging.error("Couldn't copy element options")
             logging.exception(e)
             base.messenger.send("showWarning", ["Couldn't copy element options"])
 
+    def __getTextFg(self, element):
+        """Returns the foreground color of the first text component of the
+        element or None if it has no text"""
+        for compName in element.components():
+            comp = element.component(compName)
+            if hasattr(comp, "fg"):
+                return comp.fg
+        return None
+
+    def __getCopiedOptions(self, element):
+        """Returns the current values of all options changed by pasting
+        options to the element"""
+        options = {key: info[DGG._OPT_VALUE] for key, info in element._optionInfo.items()}
+        options["hpr"] = element.getHpr()
+        options["scale"] = element.getScale()
+        options["pos"] = element.getPos()
+        options["text_fg"] = self.__getTextFg(element)
+        return options
+
+    def __diffOptions(self, oldOptions, newOptions):
+        """Returns the old and new values of only those options which
+        differ between the two states"""
+        oldDiff = {}
+        newDiff = {}
+        for key, newValue in newOptions.items():
+            oldValue = oldOptions.get(key)
+            try:
+                if oldValue is newValue or oldValue == newValue:
+                    continue
+            except Exception:
+                # values which can't be compared are taken as changed
+                pass
+            oldDiff[key] = oldValue
+            newDiff[key] = newValue
+        return oldDiff, newDiff
+
+    def __setCopiedOptions(self, elementInfo, options):
+        """Set the option values as stored by pasting options"""
+        element = elementInfo.element
+        for key, value in options.items():
+            if key == "pos":
+                element.setPos(value)
+            elif key == "hpr":
+                element.setHpr(value)
+            elif key == "scale":
+                element.setScale(value)
+            elif key == "text_fg":
+                if value is not None:
+                    element["text_fg"] = value
+            else:
+                element[key] = value
+
     def new(self):
         """Create a new project if there are no unsaved changes, otherwise ask user."""
         if self.dirty:
@@ -1316,10 +1529,13 @@ class DirectGuiDesigner(DirectObject):
     def __newProject(self, selection):
         """Create a new project."""
         if selection == 1:
-            for name, elementInfo in list(self.elementDict.items()):
-                self.removeElement(elementInfo.element)
+            self.__cancelProjectLoad()
+            # removing all elements can be undone in one step
+            self.removeElements([
+                elementInfo.element for elementInfo in self.elementDict.values()
+                if elementInfo is not None])
             self.selectedElement = None
-            self.elementDict = {}
+            self.elementDict = ElementRegistry()
             base.messenger.send("clearDirtyFlag")
         if self.dlgNewProject is not None:
             self.dlgNewProject.destroy()
@@ -1334,7 +1550,7 @@ class DirectGuiDesigner(DirectObject):
             **WidgetDefinition.DEFINITIONS,
             **self.customWidgetsHandler.getCustomWidgetDefinitions()}
         ExporterProject(
-            os.path.join(self.lastDirPath, self.lastFileNameWOExtension + ".gui"),
+            os.path.join(self.lastDirPath, self.lastFileNameWOExtension + self.lastProjectExtension),
             self.elementDict,
             self.getEditorFrame,
             self.getEditorRootCanvas,
@@ -1362,13 +1578,16 @@ class DirectGuiDesigner(DirectObject):
 
     def load(self):
         """Load project from a .gui file."""
+        if ProjectLoader.isLoading():
+            base.messenger.send("showWarning", ["Another project is still being loaded!"])
+            return
         self.selectElement(self.visualEditorInfo)
 
         allWidgetDefinitions = {
             **WidgetDefinition.DEFINITIONS,
             **self.customWidgetsHandler.getCustomWidgetDefinitions()}
-        projectLoader = ProjectLoader(
-            os.path.join(self.lastDirPath, self.lastFileNameWOExtension + ".gui"),
+        self.projectLoader = ProjectLoader(
+            os.path.join(self.lastDirPath, self.lastFileNameWOExtension + self.lastProjectExtension),
             self.visualEditorInfo,
             self.elementHandler,
             self.customWidgetsHandler,
@@ -1378,12 +1597,19 @@ class DirectGuiDesigner(DirectObject):
             self.tt,
             self.new)
 
+    def __cancelProjectLoad(self):
+        """Stop a project which is still being loaded from adding its
+        elements to the canvas"""
+        if self.projectLoader is not None and ProjectLoader.isLoading():
+            self.projectLoader.cancelLoad()
+
     def updateElementDict(self, newDict):
         self.elementDict.update(newDict)
         base.messenger.send("refreshStructureTree")
 
     def __quit(self, selection):
         if selection == 1:
+            self.__cancelProjectLoad()
             base.userExit()
         else:
             self.dlgQuit.destroy()
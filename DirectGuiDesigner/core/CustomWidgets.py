@@ -296,6 +296,9 @@ class CustomWidgets:
             print(string)
 
     def extendToolbox(self):
+        if self.toolbox is None:
+            # running without the designers GUI
+            return
         self.toolbox.toolboxEntries += self.toolboxExtensionList
         self.toolbox.createEntries()
 
@@ -305,6 +308,9 @@ class CustomWidgets:
         return None
 
     def extendElementHandler(self):
+        if self.elementHandler is None:
+            # only the widget definitions are needed, e.g. for exporting
+            return
         for widgetName, widget in self.customWidgetsDict.items():
             self.__createNewElement(widgetName, widget)
 
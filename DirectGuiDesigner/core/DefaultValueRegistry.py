@@ -0,0 +1,92 @@
+"""The DefaultValueRegistry holds the default values of widgets which don't
+provide an options method, like the Onscreen* widgets. To know if a value of
+such a widget has been changed, we have to compare it against a vanilla
+instance of the widget. Those will be created only once per widget type and
+session.
+"""
+import logging
+
+from panda3d.core import NodePath
+from direct.gui.OnscreenText import OnscreenText
+from direct.gui.OnscreenImage import OnscreenImage
+from direct.gui.OnscreenGeom import OnscreenGeom
+
+
+class DefaultValueRegistry:
+
+    # Used for values that couldn't be read from the vanilla widget
+    NO_DEFAULT = object()
+
+    # widget class: {definition internal name: default value}
+    defaultValues = {}
+
+    @staticmethod
+    def prewarm(allWidgetDefinitions, customWidgetsDict):
+        """Read the default values of all known widget types without an
+        options method, so we don't have to create widgets while saving."""
+        widgetTypes = [OnscreenText, OnscreenImage, OnscreenGeom]
+        for widgetName, widget in customWidgetsDict.items():
+            widgetType = getattr(widget.module, widget.className, None)
+            if widgetType is not None:
+                widgetTypes.append(widgetType)
+
+        for widgetType in widgetTypes:
+            if hasattr(widgetType, "options"): continue
+            if widgetType.__name__ not in allWidgetDefinitions: continue
+            DefaultValueRegistry.getDefaultValues(
+                widgetType,
+                allWidgetDefinitions[widgetType.__name__])
+
+    @staticmethod
+    def getDefaultValues(widgetType, definitions):
+        """Returns a dictionary with the default values of the given widget
+        type for all given definitions."""
+        if widgetType not in DefaultValueRegistry.defaultValues:
+            DefaultValueRegistry.defaultValues[widgetType] = \
+                DefaultValueRegistry.__readDefaultValues(widgetType, definitions)
+        return DefaultValueRegistry.defaultValues[widgetType]
+
+    @staticmethod
+    def getDefaultValue(widgetType, definition, definitions):
+        """Returns the default value of the given definition or NO_DEFAULT if
+        it couldn't be determined."""
+        defaultValues = DefaultValueRegistry.getDefaultValues(widgetType, definitions)
+        return defaultValues.get(definition.internalName, DefaultValueRegistry.NO_DEFAULT)
+
+    @staticmethod
+    def __readDefaultValues(widgetType, definitions):
+        logging.debug(f"read default values of {widgetType.__name__}")
+        defaultValues = {}
+        try:
+            widget = widgetType()
+        except Exception:
+            # without defaults every value will count as changed
+            logging.exception(f"Couldn't create a {widgetType.__name__} to read its default values")
+            return defaultValues
+        # getters of empty NodePaths, like the ones of a vanilla
+        # OnscreenGeom, would only print assertion errors
+        isEmpty = isinstance(widget, NodePath) and widget.isEmpty()
+        try:
+            for definition in definitions:
+                if definition.internalName == "": continue
+                try:
+                    if definition.getFunctionName is not None:
+                        if type(definition.getFunctionName) == str:
+                            if isEmpty and hasattr(NodePath, definition.getFunctionName):
+                                raise ValueError("Empty NodePath")
+                            value = getattr(widget, definition.getFunctionName)()
+                        else:
+                            value = definition.getFunctionName()
+                    else:
+                        value = getattr(widget, definition.internalName)
+                except Exception:
+                    # this may happen if something hasn't been set in the
+                    # vanilla widget. E.g. the geom of an OnscreenGeom.
+                    value = DefaultValueRegistry.NO_DEFAULT
+                defaultValues[definition.internalName] = value
+        finally:
+            if hasattr(widget, "destroy"):
+                widget.destroy()
+            else:
+                widget.removeNode()
+        return defaultValues
@@ -47,6 +47,20 @@ class ElementInfo:
 
         self.addItemNode = addItemNode
 
+        # only create the element and its children in exported scripts
+        # when they are shown the first time
+        self.lazy = False
+
+        # Cached serialized data of the element. As this dict will be shared
+        # with shallow copies of this info, invalidating the cache of a copy
+        # will invalidate the cache of the original too.
+        self.jsonCache = {}
+
+    def invalidateJSONCache(self):
+        """Make sure the element will be serialized from scratch the next
+        time the project gets saved"""
+        self.jsonCache.clear()
+
     def __str__(self):
         return f"""ELEMENT INFO:
             Element: {self.element}
@@ -62,4 +76,5 @@ class ElementInfo:
             Changed Values: {self.valueHasChanged}
             Extra args to addItemFunc: {self.addItemExtraArgs}
             Parent Node: {self.addItemNode}
+            Lazy: {self.lazy}
             """
@@ -0,0 +1,212 @@
+"""The ElementRegistry holds all element infos of the designer. It behaves
+like the dictionary used before, mapping GUI IDs to element infos, but
+additionally keeps indexes of the element names and NodePaths, so elements
+can be looked up by those without walking through all elements.
+
+The registry also keeps the elements of each parent NodePath in their draw
+order, so the sort values can be maintained for the few siblings affected by
+an add or a move instead of renumbering the children of every parent.
+"""
+
+
+class ElementRegistry(dict):
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self)
+        # element name: element infos with this name. Names don't have to be
+        # unique, so there may be more than one.
+        self.nameIndex = {}
+        # NodePath key of the element: element info
+        self.nodeIndex = {}
+        # GUI ID: NodePath key the element has been registered with. We can't
+        # ask an element that has been removed for its key anymore.
+        self.nodeKeys = {}
+        # NodePath key of a parent: element infos of its children in draw order
+        self.siblingOrder = {}
+        # GUI ID: NodePath key of the parent the element has been ordered in
+        self.parentKeys = {}
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, guiId, elementInfo):
+        if guiId in self:
+            self.__removeFromIndex(guiId)
+        dict.__setitem__(self, guiId, elementInfo)
+        self.__addToIndex(guiId, elementInfo)
+
+    def __delitem__(self, guiId):
+        self.__removeFromIndex(guiId)
+        dict.__delitem__(self, guiId)
+
+    def pop(self, guiId, *default):
+        if guiId in self:
+            self.__removeFromIndex(guiId)
+        return dict.pop(self, guiId, *default)
+
+    def popitem(self):
+        guiId, elementInfo = dict.popitem(self)
+        dict.__setitem__(self, guiId, elementInfo)
+        del self[guiId]
+        return guiId, elementInfo
+
+    def setdefault(self, guiId, default=None):
+        if guiId not in self:
+            self[guiId] = default
+        return self[guiId]
+
+    def update(self, *args, **kwargs):
+        for guiId, elementInfo in dict(*args, **kwargs).items():
+            self[guiId] = elementInfo
+
+    def clear(self):
+        dict.clear(self)
+        self.nameIndex.clear()
+        self.nodeIndex.clear()
+        self.nodeKeys.clear()
+        self.siblingOrder.clear()
+        self.parentKeys.clear()
+
+    def copy(self):
+        return ElementRegistry(self)
+
+    def __addToIndex(self, guiId, elementInfo):
+        if elementInfo is None: return
+        self.nameIndex.setdefault(elementInfo.name, []).append(elementInfo)
+        element = elementInfo.element
+        if element is not None and not element.isEmpty():
+            key = element.getKey()
+            self.nodeIndex[key] = elementInfo
+            self.nodeKeys[guiId] = key
+            self.__addToOrder(guiId, elementInfo)
+
+    def __removeFromIndex(self, guiId):
+        elementInfo = dict.__getitem__(self, guiId)
+        if elementInfo is not None:
+            self.__removeFromNameIndex(elementInfo)
+        key = self.nodeKeys.pop(guiId, None)
+        if key is not None and self.nodeIndex.get(key) is elementInfo:
+            del self.nodeIndex[key]
+        self.__removeFromOrder(guiId, elementInfo)
+
+    def __removeFromNameIndex(self, elementInfo):
+        elementInfos = self.nameIndex.get(elementInfo.name)
+        if elementInfos is None: return
+        for index, indexedInfo in enumerate(elementInfos):
+            if indexedInfo is elementInfo:
+                del elementInfos[index]
+                break
+        if not elementInfos:
+            del self.nameIndex[elementInfo.name]
+
+    def __addToOrder(self, guiId, elementInfo):
+        """Insert the element in the draw order of its current parent"""
+        parent = elementInfo.element.getParent()
+        if parent.isEmpty(): return
+        parentKey = parent.getKey()
+        siblings = self.siblingOrder.setdefault(parentKey, [])
+        # children with the same sort are drawn in the order they have been
+        # added, so the element goes behind all siblings with a lower or
+        # equal sort. New elements usually get the highest sort and end up
+        # at the end without walking the list.
+        sort = elementInfo.element.getSort()
+        index = len(siblings)
+        while index > 0 and siblings[index-1].element.getSort() > sort:
+            index -= 1
+        siblings.insert(index, elementInfo)
+        self.parentKeys[guiId] = parentKey
+
+    def __removeFromOrder(self, guiId, elementInfo):
+        parentKey = self.parentKeys.pop(guiId, None)
+        siblings = self.siblingOrder.get(parentKey)
+        if siblings is None: return
+        for index in range(len(siblings)-1, -1, -1):
+            if siblings[index] is elementInfo:
+                del siblings[index]
+                break
+        if not siblings:
+            del self.siblingOrder[parentKey]
+
+    def updateParent(self, elementInfo):
+        """Move the element to the draw order of its current parent. This has
+        to be called after the element has been reparented."""
+        guiId = elementInfo.element.guiId
+        if dict.get(self, guiId) is not elementInfo: return
+        if elementInfo.element.isEmpty():
+            self.__removeFromOrder(guiId, elementInfo)
+            return
+        parent = elementInfo.element.getParent()
+        if not parent.isEmpty() and self.parentKeys.get(guiId) == parent.getKey():
+            return
+        self.__removeFromOrder(guiId, elementInfo)
+        self.__addToOrder(guiId, elementInfo)
+
+    def getSiblings(self, elementInfo):
+        """Returns the element infos with the same parent as the given
+        element in draw order, including the element itself"""
+        self.updateParent(elementInfo)
+        parentKey = self.parentKeys.get(elementInfo.element.guiId)
+        siblings = self.siblingOrder.get(parentKey, [])
+        # elements which have been reparented without updating the registry
+        moved = [
+            sibling for sibling in siblings
+            if sibling.element.isEmpty()
+            or sibling.element.getParent().getKey() != parentKey]
+        for sibling in moved:
+            self.updateParent(sibling)
+        return siblings
+
+    def getNextSort(self, parent):
+        """Returns the sort value to place a new child at the end of the
+        registered children of the given parent NodePath"""
+        siblings = self.siblingOrder.get(parent.getKey())
+        if not siblings:
+            return 1
+        return siblings[-1].element.getSort() + 1
+
+    def moveInOrder(self, elementInfo, direction):
+        """Move the element the given number of places forward (positive) or
+        back (negative) in the draw order of its siblings. Only the sort
+        values of the moved range are changed, followed by siblings that
+        share a sort value with the last renumbered one. Returns False if the
+        element couldn't be moved."""
+        siblings = self.getSiblings(elementInfo)
+        if elementInfo not in siblings: return False
+        index = siblings.index(elementInfo)
+        newIndex = max(0, min(len(siblings)-1, index + direction))
+        if newIndex == index: return False
+
+        del siblings[index]
+        siblings.insert(newIndex, elementInfo)
+
+        start = min(index, newIndex)
+        end = max(index, newIndex)
+        sort = siblings[start-1].element.getSort() if start > 0 else 0
+        for position in range(start, len(siblings)):
+            element = siblings[position].element
+            if position > end and element.getSort() > sort:
+                # the rest is already in order
+                break
+            sort += 1
+            element.reparentTo(element.getParent(), sort)
+        return True
+
+    def rename(self, elementInfo, name):
+        """Set the name of the given element info and update the index"""
+        self.__removeFromNameIndex(elementInfo)
+        elementInfo.name = name
+        if dict.get(self, elementInfo.element.guiId) is elementInfo:
+            self.nameIndex.setdefault(name, []).append(elementInfo)
+
+    def getByName(self, name):
+        """Returns the element info with the given name or None. If more
+        than one element has this name, the first registered one will be
+        returned."""
+        for elementInfo in self.nameIndex.get(name, ()):
+            if elementInfo.name == name:
+                return elementInfo
+        return None
+
+    def getByNode(self, nodePath):
+        """Returns the element info of the given NodePath or None if it
+        isn't an element of the designer"""
+        if nodePath is None or nodePath.isEmpty():
+            return None
+        return self.nodeIndex.get(nodePath.getKey())
@@ -3,8 +3,16 @@ You can think of it as a tree, where every action enlarges a branch.
 You can always undo and if you do something new afterward, it will create a new branch with new information.
 Changing between branches is fine from the toolbar or with a key combination.
 It's inspired by emacs kill-ring.
+The number of entries and their approximate memory usage can be limited, in
+which case the oldest entries will be dropped when a new one is added.
+Several actions can be grouped to one entry with transactions and repeated
+changes of the same value in quick succession will be merged to one entry.
 """
 
+import sys
+import time
+from contextlib import contextmanager
+
 
 class KillRingEntry:
     """A KillRingEntry stores the information needed to undo/redo a specific action.
@@ -21,6 +29,9 @@ class KillRingEntry:
         self.oldValue = oldValue  # The old value
         self.newValue = newValue  # The new value
 
+        self.size = 0  # the approximate memory used by this entry in bytes
+        self.index = 0  # the number of entries created before this one
+
     def addChild(self, child):
         """Add a new child entry to self and set it as the active child.
 
@@ -47,9 +58,39 @@ class KillRing:
     """Class for storing and retrieving information needed for undo/redo.
     Actually undoing/redoing actions is not handled in this class.
     """
-    def __init__(self):
-        self.currentRoot = KillRingEntry()  # the currently selected entry
-        self.currentRoot.setParent(self.currentRoot)
+
+    # rough memory cost of a scene graph node kept alive by an entry,
+    # including the python objects of the widget it belongs to
+    nodeSize = 4096
+
+    def __init__(self, maxEntries=0, memoryBudget=0, releaseCallback=None, coalesceTime=0):
+        """
+        :param int maxEntries: The maximum number of entries, 0 for no limit
+        :param int memoryBudget: The approximate memory in bytes all entries may use, 0 for no limit
+        :param releaseCallback: Called with the edited object of dropped entries if no other entry refers to it anymore
+        :param float coalesceTime: Seconds in which another change of the same value is merged with the last one, 0 to disable
+        """
+        self.rootEntry = KillRingEntry()  # the entry before the oldest action
+        self.rootEntry.setParent(self.rootEntry)
+        self.currentRoot = self.rootEntry  # the currently selected entry
+
+        self.maxEntries = maxEntries
+        self.memoryBudget = memoryBudget
+        self.releaseCallback = releaseCallback
+
+        self.entryCount = 0
+        self.memoryUsage = 0
+        self.pushCount = 0
+
+        # id of an edited object: [object, number of entries referring to it]
+        self.references = {}
+
+        self.coalesceTime = coalesceTime
+        self.lastPushTime = 0
+
+        # entries collected by the currently open transaction
+        self.transactionEntries = None
+        self.transactionDepth = 0
 
     def push(self, editObject, action, objectType, oldValue, newValue):
         """Add new action to KillRing.
@@ -60,11 +101,228 @@ class KillRing:
         :param oldValue: The old value
         :param newValue: The new value
         """
+        if self.__coalesce(editObject, action, objectType, newValue):
+            return
         newKill = KillRingEntry(editObject, action, objectType, oldValue, newValue)
+        if self.transactionEntries is not None:
+            self.transactionEntries.append(newKill)
+            return
+        self.__addEntry(newKill)
+
+    def beginTransaction(self):
+        """Collect all following actions until commitTransaction is called
+        in one entry, so they will be undone and redone together.
+        Transactions can be nested, only the outermost one adds an entry."""
+        self.transactionDepth += 1
+        if self.transactionDepth == 1:
+            self.transactionEntries = []
+
+    def commitTransaction(self):
+        """Add the actions collected since beginTransaction as one entry"""
+        if self.transactionDepth == 0: return
+        self.transactionDepth -= 1
+        if self.transactionDepth > 0: return
+        self.__addTransactionEntries()
+
+    def abortTransaction(self):
+        """Close all open transactions, e.g. if a commit has been missed.
+        The actions collected so far have already been applied, so they will
+        still be added as one entry."""
+        if self.transactionDepth == 0: return
+        self.transactionDepth = 0
+        self.__addTransactionEntries()
+
+    @contextmanager
+    def transaction(self):
+        """Group all actions added within the with block to one entry. The
+        transaction will be committed even if the block raises."""
+        self.beginTransaction()
+        try:
+            yield
+        finally:
+            self.commitTransaction()
+
+    def __addTransactionEntries(self):
+        entries = self.transactionEntries
+        self.transactionEntries = None
+        if len(entries) == 1:
+            self.__addEntry(entries[0])
+        elif entries:
+            self.__addEntry(KillRingEntry(None, "group", "", None, entries))
+
+    def __coalesce(self, editObject, action, objectType, newValue):
+        """Merge the change into the latest entry if it sets the same value
+        of the same object again shortly after. Returns True if merged."""
+        now = time.monotonic()
+        lastPushTime = self.lastPushTime
+        self.lastPushTime = now
+        if action != "set" or now - lastPushTime > self.coalesceTime:
+            return False
+
+        if self.transactionEntries is not None:
+            latest = self.transactionEntries[-1] if self.transactionEntries else None
+        elif self.currentRoot is not self.rootEntry and not self.currentRoot.children:
+            latest = self.currentRoot
+        else:
+            # changes after an undo start a new branch
+            latest = None
+        if latest is None \
+        or latest.action != action \
+        or latest.objectType != objectType \
+        or latest.editObject is not editObject:
+            return False
+
+        latest.newValue = newValue
+        if self.transactionEntries is None:
+            self.memoryUsage -= latest.size
+            latest.size = self.estimateSize(latest)
+            self.memoryUsage += latest.size
+        return True
+
+    def __addEntry(self, newKill):
         self.currentRoot.addChild(newKill)
         newKill.setParent(self.currentRoot)
         self.currentRoot = newKill
 
+        newKill.size = self.estimateSize(newKill)
+        newKill.index = self.pushCount
+        self.pushCount += 1
+        self.entryCount += 1
+        self.memoryUsage += newKill.size
+        for editObject in self.__getEditObjects(newKill):
+            self.__addReference(editObject)
+
+        while self.entryCount > 0 and self.isOverLimit():
+            self.dropOldest()
+
+    def isOverLimit(self):
+        """Returns True if more entries or memory are used than allowed"""
+        if self.maxEntries > 0 and self.entryCount > self.maxEntries:
+            return True
+        return self.memoryBudget > 0 and self.memoryUsage > self.memoryBudget
+
+    def dropOldest(self):
+        """Remove the oldest action from the KillRing. If it has already been
+        done, it becomes the new starting point of the history and all
+        branches which started before it will be removed as well."""
+        children = self.rootEntry.children
+        if not children: return
+
+        oldest = min(children, key=lambda child: child.index)
+        entry = self.currentRoot
+        while entry is not self.rootEntry and entry is not oldest:
+            entry = entry.parent
+        if entry is not oldest:
+            # the oldest action isn't done, so nothing after it can be redone
+            # from the current state and its whole branch can go
+            children.remove(oldest)
+            if self.rootEntry.activeChild is oldest:
+                self.rootEntry.activeChild = children[-1] if children else None
+            self.__release(oldest)
+            return
+
+        for child in children[:-1]:
+            self.__release(child)
+        self.__releaseEntry(oldest)
+        oldest.editObject = oldest.oldValue = oldest.newValue = None
+        oldest.action = oldest.objectType = ""
+        oldest.setParent(oldest)
+        self.rootEntry = oldest
+
+    def __release(self, entry):
+        """Release the entry and all entries following it"""
+        toRelease = [entry]
+        while toRelease:
+            entry = toRelease.pop()
+            toRelease += entry.children
+            self.__releaseEntry(entry)
+
+    def __releaseEntry(self, entry):
+        self.entryCount -= 1
+        self.memoryUsage -= entry.size
+        for editObject in self.__getEditObjects(entry):
+            self.__removeReference(editObject)
+
+    def __getEditObjects(self, entry):
+        if entry.action == "group":
+            return [groupEntry.editObject for groupEntry in entry.newValue]
+        return [entry.editObject]
+
+    def __getReferenceObject(self, editObject):
+        # element infos refer to the same widget as the element itself
+        return getattr(editObject, "element", editObject)
+
+    def __addReference(self, editObject):
+        editObject = self.__getReferenceObject(editObject)
+        if editObject is None: return
+        reference = self.references.setdefault(id(editObject), [editObject, 0])
+        reference[1] += 1
+
+    def __removeReference(self, editObject):
+        editObject = self.__getReferenceObject(editObject)
+        if editObject is None: return
+        reference = self.references.get(id(editObject))
+        if reference is None: return
+        reference[1] -= 1
+        if reference[1] > 0: return
+        del self.references[id(editObject)]
+        if self.releaseCallback is not None:
+            self.releaseCallback(editObject)
+
+    def estimateSize(self, entry):
+        """Returns the approximate memory used by the entry. Removed elements
+        count with all their nodes, as they are only kept alive by the
+        KillRing. Elements which have been removed together with one of
+        their ancestors are already counted with the ancestor."""
+        if entry.action != "group":
+            return self.__estimateEntrySize(entry, True)
+        removedKeys = set(
+            groupEntry.editObject.getKey() for groupEntry in entry.newValue
+            if self.__keepsNodesAlive(groupEntry))
+        size = sys.getsizeof(entry) + sys.getsizeof(entry.__dict__)
+        for groupEntry in entry.newValue:
+            countNodes = self.__keepsNodesAlive(groupEntry) \
+                and not self.__hasRemovedAncestor(groupEntry.editObject, removedKeys)
+            size += self.__estimateEntrySize(groupEntry, countNodes)
+        return size
+
+    def __estimateEntrySize(self, entry, countNodes):
+        size = sys.getsizeof(entry) + sys.getsizeof(entry.__dict__)
+        size += self.__estimateValueSize(entry.oldValue)
+        size += self.__estimateValueSize(entry.newValue)
+        if countNodes and self.__keepsNodesAlive(entry):
+            size += (entry.editObject.countNumDescendants() + 1) * self.nodeSize
+        return size
+
+    def __keepsNodesAlive(self, entry):
+        """Returns True if the entry holds the only reference to the nodes of
+        its element. Elements of other actions are still part of the project
+        when the action is added."""
+        return entry.action == "kill" \
+            and hasattr(entry.editObject, "countNumDescendants") \
+            and not entry.editObject.isEmpty()
+
+    def __hasRemovedAncestor(self, node, removedKeys):
+        node = node.getParent()
+        while not node.isEmpty():
+            if node.getKey() in removedKeys:
+                return True
+            node = node.getParent()
+        return False
+
+    def __estimateValueSize(self, value, depth=0):
+        size = sys.getsizeof(value)
+        if depth > 3:
+            return size
+        if isinstance(value, dict):
+            for key, item in value.items():
+                size += self.__estimateValueSize(key, depth + 1)
+                size += self.__estimateValueSize(item, depth + 1)
+        elif isinstance(value, (list, tuple, set)):
+            for item in value:
+                size += self.__estimateValueSize(item, depth + 1)
+        return size
+
     def pop(self):
         """Revert last push. Change current root to the parent of the current root.
 
@@ -86,6 +86,8 @@ class PropertyHelper:
         nameAdd = f"{elementInfo.subComponentName}_" if elementInfo.subComponentName != "" else ""
         propName = nameAdd + propName
 
+        elementInfo.invalidateJSONCache()
+
         if definition.isInitOption:
             # This is an initialization option, so we just store it as extra options
             if valueAsString != "":
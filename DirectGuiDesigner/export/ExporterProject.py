@@ -9,18 +9,24 @@ See License.txt or http://opensource.org/licenses/BSD-2-Clause for more info
 """
 
 import os
+import copy
 import json
 import logging
 import tempfile
+import threading
 
 from DirectFolderBrowser.DirectFolderBrowser import DirectFolderBrowser
 
 from DirectGuiDesigner.tools.JSONTools import JSONTools
+from DirectGuiDesigner.tools.BinaryProject import BinaryProject
 
 
 class ExporterProject:
     """Class for saving a project to a '.gui' file."""
 
+    # the thread currently writing an autosave file, if any
+    autosaveThread = None
+
     def __init__(
             self,
             fileName,
@@ -39,6 +45,8 @@ class ExporterProject:
         self.getAllEditorPlacers = getAllEditorPlacers
         self.usePixel2D = usePixel2D
         self.isAutosave = False
+        # set by the autosave thread once the file has been written
+        self.autosaveSucceeded = False
         self.allWidgetDefinitions = allWidgetDefinitions
 
         if exceptionSave:
@@ -66,11 +74,39 @@ class ExporterProject:
         logging.info("Wrote crash session file to {}".format(tmpPath))
 
     def autoSave(self, fileName=""):
-        """Used to occasionally save the current project."""
+        """Used to occasionally save the current project.
+        The project data will be collected on the calling thread while the
+        encoding and writing of the file will be done on a worker thread."""
+        if ExporterProject.isAutosaveRunning():
+            logging.info("Skip autosave, previous autosave is still running")
+            return
         if fileName == "":
             fileName = os.path.join(tempfile.gettempdir(), "DGDAutosave.gui")
-        self.__executeSave(fileName)
-        logging.info("Wrote autosave file to {}".format(fileName))
+        # copy the data, some values are still shared with the elements which
+        # may get changed while the worker thread encodes them
+        jsonElements = copy.deepcopy(self.__getSnapshot())
+        ExporterProject.autosaveThread = threading.Thread(
+            target=self.__writeAutosave,
+            args=(jsonElements, fileName),
+            name="autosave",
+            daemon=True)
+        ExporterProject.autosaveThread.start()
+
+    @staticmethod
+    def isAutosaveRunning():
+        """Returns True if an autosave file is currently being written."""
+        thread = ExporterProject.autosaveThread
+        return thread is not None and thread.is_alive()
+
+    def __writeAutosave(self, jsonElements, path):
+        """Write the given project data to path, runs on the autosave thread."""
+        try:
+            self.__writeFile(jsonElements, path)
+            self.autosaveSucceeded = True
+            logging.info("Wrote autosave file to {}".format(path))
+        except Exception as e:
+            logging.error("Autosave failed")
+            logging.exception(e)
 
     def save(self, doSave):
         """Used when saving manually (via the file browser)."""
@@ -85,17 +121,39 @@ class ExporterProject:
 
     def __executeSave(self, path):
         """Actually save the project to 'path'."""
+        self.__writeFile(self.__getSnapshot(), path)
+
+        if not self.isAutosave:
+            base.messenger.send("clearDirtyFlag")
+
+    def __getSnapshot(self):
+        """Collect the current state of all elements as plain python data
+        which can then be encoded independently from the scene."""
         jsonTools = JSONTools()
-        jsonElements = jsonTools.getProjectJSON(
+        return jsonTools.getProjectJSON(
             self.guiElementsDict,
             self.getEditorFrame,
             self.getEditorRootCanvas,
             self.getAllEditorPlacers,
             self.allWidgetDefinitions,
             self.usePixel2D)
-        with open(path, 'w') as outfile:
-            json.dump(jsonElements, outfile, indent=2)
-
-        if not self.isAutosave:
-            base.messenger.send("clearDirtyFlag")
 
+    def __writeFile(self, jsonElements, path):
+        """Encode the project data and write it to 'path'. The data will be
+        written to a temporary file first which will then replace the actual
+        file so we never leave a half written project behind. Paths with the
+        binary project extension will be written in the binary format."""
+        tmpPath = path + ".tmp"
+        try:
+            if path.endswith(BinaryProject.fileExtension):
+                with open(tmpPath, 'wb') as outfile:
+                    outfile.write(BinaryProject.dumps(jsonElements))
+            else:
+                with open(tmpPath, 'w') as outfile:
+                    json.dump(jsonElements, outfile, indent=2)
+            os.replace(tmpPath, path)
+        except Exception:
+            # don't leave the half written temporary file behind
+            if os.path.exists(tmpPath):
+                os.remove(tmpPath)
+            raise
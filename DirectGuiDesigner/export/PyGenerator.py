@@ -0,0 +1,849 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Module for generating python code from project JSON data."""
+
+__author__ = "Fireclaw the Fox"
+__license__ = """
+Simplified BSD (BSD 2-Clause) License.
+See License.txt or http://opensource.org/licenses/BSD-2-Clause for more info
+"""
+
+import io
+import sys
+import ast
+import json
+import math
+import logging
+from panda3d.core import ConfigVariableBool, ConfigVariableString
+
+from DirectGuiDesigner.core.PropertyHelper import PropertyHelper
+from DirectGuiDesigner.core.WidgetDefinition import PropertyEditTypes, DEFINITIONS
+from DirectGuiDesigner.tools.BinaryProject import BinaryProject
+from DirectGuiDesigner.tools.LiteralDecoder import LiteralDecoder
+
+
+class PyGenerator:
+    """Generates the python script of a project from its JSON data as stored
+    in .gui files. No widgets will be created for this, so projects can be
+    exported without loading them into the designer first."""
+
+    importStatements = {
+        "DirectButton":"from direct.gui.DirectButton import DirectButton",
+        "DirectEntry":"from direct.gui.DirectEntry import DirectEntry",
+        "DirectEntryScroll":"from direct.gui.DirectEntryScroll import DirectEntryScroll",
+        "DirectCheckBox":"from direct.gui.DirectCheckBox import DirectCheckBox",
+        "DirectCheckButton":"from direct.gui.DirectCheckButton import DirectCheckButton",
+        "DirectOptionMenu":"from direct.gui.DirectOptionMenu import DirectOptionMenu",
+        "DirectRadioButton":"from direct.gui.DirectRadioButton import DirectRadioButton",
+        "DirectSlider":"from direct.gui.DirectSlider import DirectSlider",
+        "DirectScrollBar":"from direct.gui.DirectScrollBar import DirectScrollBar",
+        "DirectScrolledList":"from direct.gui.DirectScrolledList import DirectScrolledList",
+        "DirectScrolledListItem":"from direct.gui.DirectScrolledList import DirectScrolledListItem",
+        "DirectLabel":"from direct.gui.DirectLabel import DirectLabel",
+        "DirectWaitBar":"from direct.gui.DirectWaitBar import DirectWaitBar",
+        "OkDialog":"from direct.gui.DirectDialog import OkDialog",
+        "OkCancelDialog":"from direct.gui.DirectDialog import OkCancelDialog",
+        "YesNoDialog":"from direct.gui.DirectDialog import YesNoDialog",
+        "YesNoCancelDialog":"from direct.gui.DirectDialog import YesNoCancelDialog",
+        "RetryCancelDialog":"from direct.gui.DirectDialog import RetryCancelDialog",
+        "DirectFrame":"from direct.gui.DirectFrame import DirectFrame",
+        "DirectScrolledFrame":"from direct.gui.DirectScrolledFrame import DirectScrolledFrame",
+    }
+
+    canvasParents = [
+        "a2dTopCenter","a2dBottomCenter","a2dLeftCenter","a2dRightCenter",
+        "a2dTopLeft","a2dTopRight","a2dBottomLeft","a2dBottomRight"]
+
+    # loader functions of path properties: kind of asset in the manifest
+    assetLoaderFuncs = {
+        "loader.loadFont(value)": "font",
+        "loader.loadSfx(value)": "sfx"}
+
+    # functions added to the script if the elements use any assets
+    assetFunctions = """
+
+# (kind, path): loaded asset, shared by all elements using the asset
+loadedAssets = {}
+
+
+def getAsset(kind, path):
+    \"\"\"Returns the asset with the given kind and path. Assets which haven't
+    been preloaded will be loaded now.\"\"\"
+    asset = loadedAssets.get((kind, path))
+    if asset is None:
+        if kind == "font":
+            asset = loader.loadFont(path)
+        elif kind == "texture":
+            asset = loader.loadTexture(path)
+        elif kind == "sfx":
+            asset = loader.loadSfx(path)
+        else:
+            asset = loader.loadModel(path)
+        loadedAssets[(kind, path)] = asset
+    return asset
+
+
+def preloadAssets(callback=None):
+    \"\"\"Load all assets of the GUI in the background. The callback will be
+    called once everything has been loaded, after which the GUI can be
+    created without loading anything from disk.\"\"\"
+    pending = ["model", "sfx", "pool"]
+
+    def finished(assets, kind, paths):
+        for path, asset in zip(paths, assets):
+            loadedAssets.setdefault((kind, path), asset)
+        pending.remove(kind)
+        if not pending and callback is not None:
+            callback()
+
+    for kind, load in (("model", loader.loadModel), ("sfx", loader.loadSfx)):
+        paths = [path for path in ASSETS.get(kind, ()) if (kind, path) not in loadedAssets]
+        if paths:
+            load(paths, callback=finished, extraArgs=[kind, paths])
+        else:
+            finished([], kind, [])
+
+    # fonts and textures can't be loaded by the asynchronous loader, so
+    # load them on a thread of their own
+    def loadFromPools(task):
+        try:
+            for kind in ("font", "texture"):
+                for path in ASSETS.get(kind, ()):
+                    try:
+                        getAsset(kind, path)
+                    except Exception:
+                        # the asset will be loaded again when it's used
+                        logging.exception(f"Couldn't preload {kind} {path}")
+        finally:
+            # always report back, so the callback won't wait forever
+            taskMgr.add(reportPoolsLoaded, "guiAssetsPreloaded")
+        return task.done
+
+    def reportPoolsLoaded(task):
+        finished([], "pool", [])
+        return task.done
+
+    if ASSETS.get("font") or ASSETS.get("texture"):
+        if not taskMgr.hasTaskChain("guiAssetLoader"):
+            taskMgr.setupTaskChain("guiAssetLoader", numThreads=1)
+        taskMgr.add(loadFromPools, "preloadGuiAssets", taskChain="guiAssetLoader")
+    else:
+        finished([], "pool", [])
+"""
+
+    # functions added to the GUI class if the project contains elements
+    # which should only be created when they are shown the first time
+    lazySubtreeFunctions = """
+    def createSubtree(self, name):
+        getattr(self, f"create_{name}")()
+
+    def showSubtree(self, name):
+        \"\"\"Show the lazily created element with the given name. The element
+        and its children will be created if they don't exist yet.\"\"\"
+        if getattr(self, name) is None:
+            self.createSubtree(name)
+        getattr(self, name).show()
+
+    def hideSubtree(self, name, release=False):
+        \"\"\"Hide the lazily created element with the given name. If release
+        is set, the element and its children will be destroyed and created
+        again by the next call to showSubtree.\"\"\"
+        if getattr(self, name) is None:
+            return
+        if not release:
+            getattr(self, name).hide()
+            return
+        for elementName in reversed(LAZY_SUBTREES[name]):
+            element = getattr(self, elementName)
+            if element is not None:
+                element.destroy()
+                setattr(self, elementName, None)
+"""
+
+    def __init__(self, customWidgetHandler=None, exportStyle=None):
+        # used to look up the import paths and add item functions of custom
+        # widgets. Without it, projects must only contain DirectGui widgets.
+        self.customWidgetHandler = customWidgetHandler
+
+        # "classic" creates each element with its own statement, "table"
+        # writes the elements as data which will be created in a loop
+        if exportStyle is None:
+            exportStyle = ConfigVariableString("python-export-style", "classic").getValue()
+        if exportStyle not in ("classic", "table"):
+            logging.warning(f"Unknown python export style {exportStyle}, using classic")
+            exportStyle = "classic"
+        self.exportStyle = exportStyle
+
+        # used to find the option values which can be created on import
+        self.decoder = LiteralDecoder()
+
+    def getWidget(self, widgetType):
+        if self.customWidgetHandler is None:
+            return None
+        return self.customWidgetHandler.getWidget(widgetType)
+
+    @staticmethod
+    def loadProject(path):
+        """Read the JSON data of a .gui or binary project file"""
+        if BinaryProject.isBinaryProject(path):
+            return BinaryProject.jsonFromTyped(BinaryProject.load(path))
+        with open(path, 'r') as infile:
+            return json.load(infile)
+
+    def generateFromFile(self, path, createExecutable=None):
+        """Returns the python script for the given project file"""
+        return self.generate(self.loadProject(path), createExecutable)
+
+    def writeFromFile(self, path, outfile, createExecutable=None):
+        """Write the python script for the given project file to the given
+        file object"""
+        self.write(self.loadProject(path), outfile, createExecutable)
+
+    def generate(self, jsonProject, createExecutable=None):
+        """Returns the python script for the given project JSON data. If
+        createExecutable isn't given, the create-executable-scripts
+        configuration decides if the script can be run directly."""
+        buffer = io.StringIO()
+        self.write(jsonProject, buffer, createExecutable)
+        return buffer.getvalue()
+
+    def write(self, jsonProject, outfile, createExecutable=None):
+        """Write the python script for the given project JSON data to the
+        given file object. The script is written piece by piece, so it
+        never has to be held in memory as a whole."""
+        if createExecutable is None:
+            createExecutable = ConfigVariableBool("create-executable-scripts", False).getValue()
+        usePixel2D = jsonProject["EditorConfig"]["usePixel2D"]
+        self.jsonElements = jsonProject["ComponentList"]
+
+        self.postSetupCalling = []
+        self.radiobuttonDict = {}
+        self.customWidgetAddDict = {}
+
+        # element name: name of the lazily created element it will be
+        # created with or None if it is created with the GUI
+        self.lazyRoots = {}
+        for name in self.jsonElements.keys():
+            self.__getLazyRoot(name)
+        self.lazySubtrees = self.__getLazySubtrees()
+
+        # kind of asset: paths of the assets used by the elements
+        self.assets = self.__collectAssets()
+
+        write = outfile.write
+        write("""#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# This file was created using the DirectGUI Designer
+
+from direct.gui import DirectGuiGlobals as DGG
+""")
+        # widget type: import statement, in order of first use
+        usedImports = {}
+        for elementInfo in self.jsonElements.values():
+            widgetType = elementInfo["type"]
+            if widgetType not in usedImports:
+                if widgetType in self.importStatements:
+                    usedImports[widgetType] = self.importStatements[widgetType]
+                else:
+                    usedImports[widgetType] = self.__getCustomImportPath(widgetType)
+        for importStatement in usedImports.values():
+            write("\n")
+            write(importStatement)
+        write("""
+from panda3d.core import (
+    LPoint3f,
+    LVecBase3f,
+    LVecBase4f,
+    TextNode
+)""")
+        if self.assets:
+            write("\nimport logging")
+            self.__writeAssets(write)
+
+        topLevelItems = [
+            name for name, elementInfo in self.jsonElements.items()
+            if elementInfo["parent"] == "root" or elementInfo["parent"].startswith("a2d")]
+
+        if self.exportStyle == "table":
+            self.__writeTableStyle(write, topLevelItems)
+        else:
+            self.__writeClassicStyle(write, topLevelItems)
+
+        # Make script executable if desired
+        if createExecutable:
+            write("""
+# We need a showbase instance to make this script directly runnable
+from direct.showbase.ShowBase import ShowBase
+app = ShowBase()\n""")
+            if usePixel2D:
+                write("GUI(app.pixel2d)\n")
+            else:
+                write("GUI()\n")
+            write("app.run()\n")
+
+    def __writeClassicStyle(self, write, topLevelItems):
+        """Write a GUI class creating each element with its own statement"""
+        if self.lazySubtrees:
+            self.__writeLazySubtrees(write)
+        write("""
+
+class GUI:
+    def __init__(self, rootParent=None):
+        """)
+        if self.lazySubtrees:
+            # lazy elements are created later on and need the root parent
+            write("self.rootParent = rootParent\n")
+            for name, lazyRoot in self.lazyRoots.items():
+                if lazyRoot is not None:
+                    write(" "*8 + f"self.{name} = None\n")
+
+        for name, elementInfo in self.jsonElements.items():
+            if self.lazyRoots[name] is None:
+                self.__writeElement(write, name, elementInfo)
+
+
+        write("\n")
+        self.__writePostSetup(write)
+
+        for lazyRoot in self.lazySubtrees.keys():
+            self.__writeCreateSubtreeHeader(write, lazyRoot)
+            write(" "*8 + "rootParent = self.rootParent\n")
+            for name, elementInfo in self.jsonElements.items():
+                if self.lazyRoots[name] == lazyRoot:
+                    self.__writeElement(write, name, elementInfo)
+            write("\n")
+            self.__writePostSetup(write, lazyRoot)
+
+        # Create helper functions for toplevel elements
+        if len(topLevelItems) > 0:
+            for functionName in ["show", "hide", "destroy"]:
+                write("\n")
+                write(" "*4 + f"def {functionName}(self):\n")
+                if functionName == "destroy":
+                    for lazyRoot in self.lazySubtrees.keys():
+                        write(" "*8 + f"self.hideSubtree({lazyRoot!r}, release=True)\n")
+                for name in topLevelItems:
+                    if self.lazyRoots[name] is None:
+                        write(" "*8 + f"self.{name}.{functionName}()\n")
+                    elif functionName != "destroy":
+                        write(" "*8 + f"if self.{name} is not None:\n")
+                        write(" "*12 + f"self.{name}.{functionName}()\n")
+
+        if self.lazySubtrees:
+            write(self.lazySubtreeFunctions)
+
+    def __writeTableStyle(self, write, topLevelItems):
+        """Write the elements as a data table and a GUI class which creates
+        them in a loop. The table is stored as JSON strings, which python
+        doesn't have to compile like code, so big scripts import a lot
+        faster. Equal sets of options are written only once."""
+        # source code: index, in order of first use
+        self.tableCreateOptions = {}
+        # literal and value options: index of the option set
+        self.tableOptionSets = {}
+        # names of the classes of the value options, in order of first use
+        self.tableValueTypes = {}
+
+        write("""
+import json
+
+
+# Name, widget class name, parent, options, options which need to be
+# created for each element, transparency and the lazily created element
+# each element will be created with. The parent is given as list of the kind of parent
+# and the names needed to find it. The options are indices into OPTION_SETS
+# and CREATE_OPTIONS.
+ELEMENTS = json.loads(r\"\"\"[""")
+        separator = "\n"
+        for name, elementInfo in self.jsonElements.items():
+            write(separator + json.dumps(self.__getTableRow(name, elementInfo)))
+            separator = ",\n"
+        write('\n]""")\n')
+
+        write("""
+# Options with literal values, where lists stand for tuples, and options
+# with values of VALUE_TYPES, given as the name of the type and the
+# arguments to create the value with
+OPTION_SETS = json.loads(r\"\"\"[""")
+        separator = "\n"
+        for literalOptions, valueOptions in self.tableOptionSets.keys():
+            write(separator + json.dumps([dict(literalOptions), dict(valueOptions)]))
+            separator = ",\n"
+        write('\n]""")\n')
+
+        write("\nVALUE_TYPES = {")
+        for valueType in self.tableValueTypes.keys():
+            write(f"\n    {valueType!r}: {valueType},")
+        write("\n}\n" if self.tableValueTypes else "}\n")
+
+        write("""
+# Source code of the options which have to be created for each element
+# when it's created, like mutable values, assets and commands. Each will be
+# compiled when it's needed the first time.
+CREATE_OPTIONS = (
+""")
+        for source in self.tableCreateOptions.keys():
+            write(f"    {source!r},\n")
+        write(")\n")
+        write("""
+# index in CREATE_OPTIONS: compiled code
+createOptionsCode = {}
+
+
+def toTuple(value):
+    \"\"\"Returns the value read from JSON with all lists turned to tuples\"\"\"
+    if isinstance(value, list):
+        return tuple(toTuple(item) for item in value)
+    return value
+""")
+
+        write("\n\nWIDGET_CLASSES = {")
+        widgetTypes = dict.fromkeys(
+            elementInfo["type"] for elementInfo in self.jsonElements.values())
+        for widgetType in widgetTypes:
+            write(f"\n    {widgetType!r}: {widgetType},")
+        write("\n}\n")
+
+        write("\nTOP_LEVEL_ELEMENTS = (")
+        write("".join(f"{name!r}, " for name in topLevelItems).rstrip())
+        write(")")
+        self.__writeLazySubtrees(write)
+        write("\n")
+
+        write("""
+
+class GUI:
+    def __init__(self, rootParent=None):
+        self.rootParent = rootParent
+        for names in LAZY_SUBTREES.values():
+            for name in names:
+                setattr(self, name, None)
+        self.createElements(None)
+""")
+        self.__writePostSetup(write)
+        write("""
+    def createElements(self, lazyRoot):
+        for name, widgetType, parent, options, createOptions, transparency, elementLazyRoot in ELEMENTS:
+            if elementLazyRoot != lazyRoot:
+                continue
+            options = self.getOptions(options)
+            if createOptions is not None:
+                options = {**options, **self.getCreateOptions(createOptions)}
+            widgetClass = WIDGET_CLASSES[widgetType]
+            if parent is None:
+                element = widgetClass(**options)
+            else:
+                element = widgetClass(parent=self.getParent(parent), **options)
+            if transparency is not None:
+                element.setTransparency(transparency)
+            setattr(self, name, element)
+""")
+        for lazyRoot in self.lazySubtrees.keys():
+            self.__writeCreateSubtreeHeader(write, lazyRoot)
+            write(" "*8 + f"self.createElements({lazyRoot!r})\n")
+            self.__writePostSetup(write, lazyRoot)
+        write("""
+    def getOptions(self, index):
+        literalOptions, valueOptions = OPTION_SETS[index]
+        options = {key: toTuple(value) for key, value in literalOptions.items()}
+        for key, (valueType, args) in valueOptions.items():
+            options[key] = VALUE_TYPES[valueType](*args)
+        return options
+
+    def getCreateOptions(self, index):
+        code = createOptionsCode.get(index)
+        if code is None:
+            code = compile(CREATE_OPTIONS[index], f"<CREATE_OPTIONS[{index}]>", "eval")
+            createOptionsCode[index] = code
+        return eval(code, globals(), {"self": self})
+
+    def getParent(self, parent):
+        kind = parent[0]
+        if kind == "root":
+            return self.rootParent
+        if kind == "base":
+            return getattr(base, parent[1])
+        element = getattr(self, parent[1])
+        if kind == "canvas":
+            return element.getCanvas()
+        if kind == "node":
+            return getattr(element, parent[2])
+        return element
+
+    def show(self):
+        for name in TOP_LEVEL_ELEMENTS:
+            if getattr(self, name) is not None:
+                getattr(self, name).show()
+
+    def hide(self):
+        for name in TOP_LEVEL_ELEMENTS:
+            if getattr(self, name) is not None:
+                getattr(self, name).hide()
+
+    def destroy(self):
+        for name in LAZY_SUBTREES:
+            self.hideSubtree(name, release=True)
+        for name in TOP_LEVEL_ELEMENTS:
+            if getattr(self, name) is not None:
+                getattr(self, name).destroy()
+""")
+        if self.lazySubtrees:
+            write(self.lazySubtreeFunctions)
+
+    def __collectAssets(self):
+        """Returns the paths of all assets used by the elements by the kind
+        of asset, each path only once and in order of first use"""
+        assets = {}
+        for elementInfo in self.jsonElements.values():
+            for optionName, optionValue in elementInfo["extraOptions"].items():
+                if "others" in optionName:
+                    continue
+                definition = self.__getDefinition(elementInfo, optionName)
+                assetKind = self.__getAssetKind(definition, optionName, optionValue)
+                if assetKind is not None:
+                    assets.setdefault(assetKind, {})[optionValue] = None
+        return {assetKind: list(paths.keys()) for assetKind, paths in assets.items()}
+
+    def __getDefinition(self, elementInfo, optionName):
+        """Returns the definition of the option or None if it's unknown.
+        Options of sub components, like text0_font, will be looked up in the
+        definitions of the text, image and geom components."""
+        try:
+            return PropertyHelper.getDefinition(elementInfo, optionName)
+        except ValueError:
+            pass
+        internalName = optionName.rsplit("_", 1)[-1]
+        for componentType in ("OnscreenText", "OnscreenImage", "OnscreenGeom"):
+            for definition in DEFINITIONS[componentType]:
+                if definition.internalName == internalName:
+                    return definition
+        return None
+
+    def __getAssetKind(self, definition, optionName, value):
+        """Returns the kind of asset the path property refers to or None if
+        the value isn't an asset path"""
+        if definition is None or definition.editType != PropertyEditTypes.path:
+            return None
+        if type(value) is not str or value == "":
+            return None
+        if definition.loaderFunc is not None:
+            return self.assetLoaderFuncs.get(definition.loaderFunc)
+        name = optionName.rsplit("_", 1)[-1].lower()
+        if "geom" in name:
+            return "model"
+        if "image" in name or "texture" in name:
+            return "texture"
+        if "font" in name:
+            return "font"
+        return None
+
+    def __writeAssets(self, write):
+        write("""
+
+
+# Paths of all assets used by the elements by the kind of asset. Use
+# preloadAssets to load them in the background before creating the GUI.
+ASSETS = {""")
+        for assetKind, paths in self.assets.items():
+            write(f"\n    {assetKind!r}: (")
+            write("".join(f"{path!r}, " for path in paths).rstrip())
+            write("),")
+        write("\n}")
+        write(self.assetFunctions)
+
+    def __getLazyRoot(self, name):
+        """Returns the name of the nearest element marked as lazy which
+        contains the given element or the element itself"""
+        if name not in self.lazyRoots:
+            elementInfo = self.jsonElements[name]
+            # set first to not run in circles on broken parent loops
+            self.lazyRoots[name] = None
+            if elementInfo.get("lazy", False):
+                self.lazyRoots[name] = name
+            elif elementInfo["parent"] in self.jsonElements:
+                self.lazyRoots[name] = self.__getLazyRoot(elementInfo["parent"])
+        return self.lazyRoots[name]
+
+    def __getLazySubtrees(self):
+        """Returns the names of all elements which will be removed together
+        with each lazily created element, including those of lazily created
+        elements nested in it, in the order of creation"""
+        lazySubtrees = {}
+        for name, lazyRoot in self.lazyRoots.items():
+            while lazyRoot is not None:
+                lazySubtrees.setdefault(lazyRoot, []).append(name)
+                parentRoot = self.lazyRoots.get(self.jsonElements[lazyRoot]["parent"])
+                lazyRoot = parentRoot if parentRoot != lazyRoot else None
+        return lazySubtrees
+
+    def __writeLazySubtrees(self, write):
+        write("""
+
+# Elements which will only be created when they are shown the first time,
+# with all elements which will be created and released together with them
+LAZY_SUBTREES = {""")
+        for lazyRoot, names in self.lazySubtrees.items():
+            write(f"\n    {lazyRoot!r}: (")
+            write("".join(f"{name!r}, " for name in names).rstrip())
+            write("),")
+        write("\n}" if self.lazySubtrees else "}")
+
+    def __writeCreateSubtreeHeader(self, write, lazyRoot):
+        write("\n" + " "*4 + f"def create_{lazyRoot}(self):\n")
+        parentRoot = self.lazyRoots.get(self.jsonElements[lazyRoot]["parent"])
+        if parentRoot is not None:
+            # nested lazy elements need their parent to be created first
+            write(" "*8 + f"if self.{parentRoot} is None:\n")
+            write(" "*12 + f"self.create_{parentRoot}()\n")
+
+    def __getTableRow(self, name, elementInfo):
+        options, extraOptions = self.__getElementOptions(name, elementInfo)
+        parent = self.__getParent(name, elementInfo)
+
+        literalOptions = []
+        valueOptions = []
+        createOptions = []
+        for optionKey, source in options + extraOptions:
+            isLiteral, value = self.__getLiteral(source)
+            if isLiteral:
+                literalOptions.append((optionKey, value))
+                continue
+            value = self.__getValueOfType(source)
+            if value is not None:
+                self.tableValueTypes[value[0]] = None
+                valueOptions.append((optionKey, value))
+                continue
+            success, value = self.decoder.tryDecode(source)
+            if success and self.__isConstant(value):
+                # e.g. the TextNode constants
+                literalOptions.append((optionKey, value))
+            else:
+                # mutable values or references to other objects will be
+                # evaluated for each element
+                createOptions.append(f"{optionKey!r}: {source}")
+
+        optionSet = (tuple(literalOptions), tuple(valueOptions))
+        optionsIndex = self.tableOptionSets.setdefault(optionSet, len(self.tableOptionSets))
+        createOptionsIndex = None
+        if createOptions:
+            source = "{" + ", ".join(createOptions) + "}"
+            createOptionsIndex = self.tableCreateOptions.setdefault(
+                source, len(self.tableCreateOptions))
+
+        transparency = elementInfo["element"].get("transparency", "M_none")
+        if transparency == "M_none":
+            transparency = None
+        else:
+            isLiteral, value = self.__getLiteral(transparency)
+            transparency = value if isLiteral else int(self.decoder.decode(transparency))
+
+        return (
+            name, elementInfo["type"], parent, optionsIndex, createOptionsIndex,
+            transparency, self.lazyRoots[name])
+
+    def __getLiteral(self, source):
+        """Returns if the source is an immutable python literal and its
+        value. Only these can be stored in the data table."""
+        try:
+            value = ast.literal_eval(source.strip())
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            return False, None
+        return self.__isConstant(value), value
+
+    def __isConstant(self, value):
+        if isinstance(value, tuple):
+            return all(self.__isConstant(item) for item in value)
+        if isinstance(value, float):
+            # inf and nan have no literal form
+            return math.isfinite(value)
+        return value is None or isinstance(value, (bool, int, str))
+
+    def __getValueOfType(self, source):
+        """Returns the name of the type and the literal arguments if the
+        source creates one of the Panda3D vector types, otherwise None"""
+        try:
+            node = ast.parse(source.strip(), mode="eval").body
+        except SyntaxError:
+            return None
+        if not isinstance(node, ast.Call) \
+        or not isinstance(node.func, ast.Name) \
+        or node.func.id not in LiteralDecoder.knownConstructors \
+        or node.keywords:
+            return None
+        try:
+            args = tuple(ast.literal_eval(arg) for arg in node.args)
+        except ValueError:
+            return None
+        if not self.__isConstant(args):
+            return None
+        return (node.func.id, args)
+
+    def __writePostSetup(self, write, lazyRoot=None):
+        """Write the calls needed after all elements have been created. Only
+        the calls for elements created with the given lazily created element
+        will be written, or those of the eagerly created ones if it's None."""
+        for name, line in self.postSetupCalling:
+            if self.lazyRoots[name] == lazyRoot:
+                write(line + "\n")
+
+        for radioButton, others in self.radiobuttonDict.items():
+            if self.lazyRoots[radioButton.removeprefix("self.")] != lazyRoot: continue
+            write(" "*8 + f"{radioButton}.setOthers([")
+            write("".join(other + "," for other in others))
+            write("])\n")
+
+        for name, elementInfo in self.jsonElements.items():
+            widget = self.getWidget(elementInfo["type"])
+            if widget is None or name not in self.customWidgetAddDict: continue
+            for element in self.customWidgetAddDict[name]:
+                if self.lazyRoots[element.removeprefix("self.")] != lazyRoot: continue
+                if widget.addItemFunction is not None:
+                    extraArgs = []
+                    childInfo = self.jsonElements[element.removeprefix("self.")]  # elementInfo for elements to add
+                    if args := childInfo["addItemExtraArgs"]:  # add extra args to add item function
+                        if isinstance(widget.addItemExtraArgs, dict):
+                            for arg, definition in zip(args, widget.addItemExtraArgs.values()):
+                                valueType = definition["type"]
+                                if valueType == "str":
+                                    extraArgs.append(f", '{arg}'")
+                                elif valueType == "element":
+                                    extraArgs.append(f", self.{arg}")
+                                else:
+                                    extraArgs.append(f", {arg}")
+                        else:
+                            for arg in args:
+                                if isinstance(arg, str):
+                                    extraArgs.append(f", '{arg}'")
+                                else:
+                                    extraArgs.append(f", {arg}")
+
+                    write(" "*8 + f"self.{name}.{widget.addItemFunction}({element}{''.join(extraArgs)})\n")
+
+    def __getCustomImportPath(self, widgetType):
+        widget = self.getWidget(widgetType)
+        if widget is None:
+            logging.warning(f"No import known for widget type {widgetType}")
+            return f"# no import known for {widgetType}"
+        return widget.importPath
+
+    def __writeElement(self, write, name, elementInfo):
+        options, extraOptions = self.__getElementOptions(name, elementInfo)
+        parent = self.__getParent(name, elementInfo)
+
+        write(f"""
+        self.{name} = {elementInfo["type"]}(
+""")
+        indent = " "*12
+        for optionKey, source in options:
+            write(f"{indent}{optionKey} = {source},\n")
+        if parent is not None:
+            write(f"{indent}parent={self.__getParentSource(parent)},\n")
+        for optionKey, source in extraOptions:
+            write(f"{indent}{optionKey}={source},\n")
+        write(" "*8 + ")\n")
+
+        transparency = elementInfo["element"].get("transparency", "M_none")
+        if transparency != "M_none":
+            write(" "*8 + f"self.{name}.setTransparency({transparency})\n")
+
+    def __getElementOptions(self, name, elementInfo):
+        """Returns the option names and the source code of their values for
+        the options of the element itself and for the extra options"""
+        options = []
+        for optionKey, optionValue in elementInfo["element"].items():
+            if optionKey.endswith("transparency"):
+                continue
+
+            if optionKey in elementInfo["extraOptions"].keys():
+                continue
+
+            # values not stored as repr strings, like the radio buttons
+            # others, are written as they are
+            options.append((optionKey, f"{optionValue}"))
+
+        extraOptions = []
+        for optionName, optionValue in elementInfo["extraOptions"].items():
+            if optionName == "others":
+                others = []
+                for other in optionValue:
+                    others.append("self.{}".format(other))
+                    if other in self.lazyRoots and self.lazyRoots[other] != self.lazyRoots[name]:
+                        logging.warning(f"Radio button {name} is grouped with {other} which is created with a different lazy element")
+                self.radiobuttonDict["self.{}".format(name)] = others
+                continue
+
+            v = optionValue
+            if "others" in optionName:
+                continue
+            writeAsIsList = ["command"]
+            if type(v) is list:
+                v = f"[{','.join(map(str, v))}]"
+            elif type(v) is str and optionName not in writeAsIsList:
+                v = f"'{v}'"
+
+            definition = self.__getDefinition(elementInfo, optionName)
+            assetKind = self.__getAssetKind(definition, optionName, optionValue)
+            if assetKind is not None:
+                # share the asset loaded once for all elements
+                extraOptions.append((optionName, f"getAsset({assetKind!r}, {optionValue!r})"))
+                continue
+            if definition is not None and definition.loaderFunc is not None:
+                if isinstance(definition.loaderFunc, str):
+                    v = definition.loaderFunc.replace("value", f"{v}")
+
+            extraOptions.append((optionName, f"{v}"))
+
+        if elementInfo["type"] == "DirectScrolledListItem":
+            self.postSetupCalling.append((name, " "*8 + f"self.{elementInfo['parent']}.addItem(self.{name})"))
+
+        return options, extraOptions
+
+    def __getParent(self, name, elementInfo):
+        """Returns how to find the parent of the element as tuple of the kind
+        of parent and the names needed to find it. Returns None if the
+        element will be added to its parent by the parents add function."""
+        parentName = elementInfo["parent"]
+        if parentName == "root":
+            # use the parent passed to the class
+            return ("root",)
+
+        if parentName in self.jsonElements and self.jsonElements[parentName]["type"] == "DirectScrollFrame":
+            # use the canvas as parent
+            return ("canvas", parentName)
+        elif parentName in self.jsonElements and elementInfo["addItemNode"] is not None:
+            return ("node", parentName, elementInfo["addItemNode"])
+        elif parentName in self.jsonElements and self.getWidget(self.jsonElements[parentName]["type"]) is not None:
+            widget = self.getWidget(self.jsonElements[parentName]["type"])
+            if widget.addItemFunction is not None:
+                if parentName in self.customWidgetAddDict:
+                    self.customWidgetAddDict[parentName].append("self.{}".format(name))
+                else:
+                    self.customWidgetAddDict[parentName] = ["self.{}".format(name)]
+            return None
+        elif parentName in self.canvasParents:
+            return ("base", parentName)
+        return ("element", parentName)
+
+    def __getParentSource(self, parent):
+        kind = parent[0]
+        if kind == "root":
+            return "rootParent"
+        if kind == "base":
+            return f"base.{parent[1]}"
+        if kind == "canvas":
+            return f"self.{parent[1]}.getCanvas()"
+        if kind == "node":
+            return f"self.{parent[1]}.{parent[2]}"
+        return f"self.{parent[1]}"
+
+
+if __name__ == "__main__":
+    # export a project file to python without starting the designer
+    if len(sys.argv) != 3:
+        print(f"usage: {sys.argv[0]} PROJECTFILE OUTFILE")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO)
+    inPath, outPath = sys.argv[1:]
+    with open(outPath, 'w') as outfile:
+        PyGenerator().writeFromFile(inPath, outfile)
@@ -14,8 +14,16 @@ import logging
 import tempfile
 
 from direct.showbase.DirectObject import DirectObject
+from direct.gui import DirectGuiGlobals as DGG
+from direct.gui.DirectFrame import DirectFrame
+from direct.gui.DirectLabel import DirectLabel
+from direct.gui.DirectButton import DirectButton
+from direct.gui.DirectWaitBar import DirectWaitBar
 from DirectGuiDesigner.core.PropertyHelper import PropertyHelper
 from DirectGuiDesigner.core.ElementInfo import ElementInfo
+from DirectGuiDesigner.core.ElementRegistry import ElementRegistry
+from DirectGuiDesigner.tools.LiteralDecoder import LiteralDecoder
+from DirectGuiDesigner.tools.BinaryProject import BinaryProject, ProjectExpression, RawProjectValue
 
 from DirectFolderBrowser.DirectFolderBrowser import DirectFolderBrowser
 
@@ -24,6 +32,7 @@ from panda3d.core import TextNode
 from panda3d.core import NodePath
 from panda3d.core import LVecBase2f, LVecBase3f, LVecBase4f, LPoint2f, LPoint3f, LPoint4f
 from panda3d.core import LVecBase2, LVecBase3, LVecBase4, LPoint2, LPoint3, LPoint4, ConfigVariableString
+from panda3d.core import ConfigVariableBool, ConfigVariableDouble
 
 import importlib.util
 
@@ -39,21 +48,36 @@ class ProjectLoader(DirectObject):
     ignoreMap = []#"state"]
     ignoreComponentSplit = ["text", "image"]
 
-    def __init__(self, fileName, visualEditorInfo, elementHandler, customWidgetHandler, getEditorPlacer, allWidgetDefinitions, exceptionLoading=False, tooltip=None, newProjectCall=None):
+    def __init__(self, fileName, visualEditorInfo, elementHandler, customWidgetHandler, getEditorPlacer, allWidgetDefinitions, exceptionLoading=False, tooltip=None, newProjectCall=None, directLoad=False):
         self.newProjectCall = newProjectCall
         self.extraOptions = ["borderWidth", "frameColor", "initialText", "clipSize"]
         self.parentMap = {}
         self.radiobuttonOthersDict = {}
-        self.elementDict = {}
+        self.elementDict = ElementRegistry()
         self.elementHandler = elementHandler
         self.customWidgetHandler = customWidgetHandler
         self.visualEditorInfo = visualEditorInfo
         self.visualEditor = visualEditorInfo.element
         self.getEditorPlacer = getEditorPlacer
         self.hasErrors = False
+        # names of elements which have been skipped while loading
+        self.skippedElements = []
         self.allWidgetDefinitions = allWidgetDefinitions
+        # decoder for the stored property values, falls back to eval with
+        # the names available in this module
+        self.decoder = LiteralDecoder(globals())
+        # binary project files store their values typed instead of as strings
+        self.typedValues = False
+
+        # create the elements of manually loaded projects over multiple frames
+        self.progressiveLoading = ConfigVariableBool("progressive-project-loading", True).getValue()
+        self.loadFrameBudget = ConfigVariableDouble("project-load-frame-budget", 0.02).getValue()
+        self.progressDialog = None
         if exceptionLoading:
             self.excLoad()
+        elif directLoad:
+            # load the given file without asking the user, e.g. for batch exports
+            self.__executeLoad(fileName)
         else:
             self.browser = DirectFolderBrowser(
                 self.Load,
@@ -64,6 +88,11 @@ class ProjectLoader(DirectObject):
                 askForOverwrite=False,
                 title="Load GUI Project")
 
+    @staticmethod
+    def isLoading():
+        """Returns True while a project is being loaded over multiple frames"""
+        return taskMgr.hasTaskNamed("progressiveProjectLoad")
+
     def excLoad(self):
         """Load an exception save."""
         tmpPath = os.path.join(tempfile.gettempdir(), "DGDExceptionSave.gui")
@@ -84,46 +113,73 @@ class ProjectLoader(DirectObject):
                 base.messenger.send("showWarning", ["File \"{}\" does not exist.".format(path)])
                 return
 
+            if ProjectLoader.isLoading():
+                base.messenger.send("showWarning", ["Another project is still being loaded!"])
+                return
+
             if self.newProjectCall():
-                self.__executeLoad(path)
+                self.__executeLoad(path, self.progressiveLoading)
             else:
-                self.accept("clearDirtyFlag", self.__executeLoad, [path])
+                self.accept("clearDirtyFlag", self.__executeLoad, [path, self.progressiveLoading])
         self.browser.destroy()
         del self.browser
 
-    def __executeLoad(self, path):
-        """Do the actual loading from file 'path'."""
+    def __executeLoad(self, path, progressive=False):
+        """Do the actual loading from file 'path'. If progressive is set, the
+        elements will be created over multiple frames."""
+        self.ignore("clearDirtyFlag")
+        if ProjectLoader.isLoading():
+            # the elements of both projects would end up on the canvas
+            logging.warning("Didn't load {} as another project is still being loaded".format(path))
+            base.messenger.send("showWarning", ["Another project is still being loaded!"])
+            return
         fileContent = None
-        with open(path, 'r') as infile:
-            try:
-                fileContent = json.load(infile)
-            except Exception as e:
-                logging.error("Couldn't load project file {}".format(infile))
-                logging.exception(e)
-                base.messenger.send("showWarning", ["Error while loading Project!\nPlease check output logs for more information."])
-                return
+        try:
+            if BinaryProject.isBinaryProject(path):
+                fileContent = BinaryProject.load(path)
+                self.typedValues = True
+            else:
+                with open(path, 'r') as infile:
+                    fileContent = json.load(infile)
+                self.typedValues = False
+        except Exception as e:
+            logging.error("Couldn't load project file {}".format(path))
+            logging.exception(e)
+            base.messenger.send("showWarning", ["Error while loading Project!\nPlease check output logs for more information."])
+            return
         if fileContent is None:
-            logging.error("Problems reading Project file: {}".format(infile))
+            logging.error("Problems reading Project file: {}".format(path))
             return
 
         self.canvasParents = [
             "a2dTopCenter","a2dBottomCenter","a2dLeftCenter","a2dRightCenter",
             "a2dTopLeft","a2dTopRight","a2dBottomLeft","a2dBottomRight"]
-        self.createdParents = ["root"] + self.canvasParents
-        self.postponedElements = {}
         if fileContent["ProjectVersion"] != "0.2a":
             logging.warning("Unsupported Project Version")
             base.messenger.send("showWarning", ["Unsupported Project Version"])
             return
         base.messenger.send("setVisualEditorParent", [fileContent["EditorConfig"]["usePixel2D"]])
-        base.messenger.send("setVisualEditorCanvasSize", [eval(fileContent["EditorConfig"]["canvasSize"])])
-        for name, elementInfo in fileContent["ComponentList"].items():
-            self.__createElement(name, elementInfo)
+        base.messenger.send("setVisualEditorCanvasSize", [self.__decodeValue(fileContent["EditorConfig"]["canvasSize"])])
+        self.path = path
+        self.componentList = fileContent["ComponentList"]
+        self.creationOrder = self.__getCreationOrder(self.componentList)
 
+        if progressive and len(self.creationOrder) > 0:
+            self.__startProgressiveLoad()
+            return
+
+        for name in self.creationOrder:
+            self.__createControl(name, self.componentList[name])
+        self.__finishLoad()
+
+    def __finishLoad(self):
+        """Resolve references between the created elements and hand the
+        loaded project over to the designer"""
         for elementInfo, option in self.radiobuttonOthersDict.items():
             elementList = []
-            for elementId, info in self.elementDict.items():
-                if info.name in option:
+            for otherName in option:
+                info = self.elementDict.getByName(otherName)
+                if info is not None:
                     elementList.append(info.element)
             elementInfo.element["others"] = elementList
 
@@ -131,27 +187,164 @@ class ProjectLoader(DirectObject):
             base.messenger.send("showWarning", ["Errors occured while loading the project!\nProject may not be fully loaded\nSee output log for more information."])
             return
 
-        base.messenger.send("setLastPath", [path])
-        base.messenger.send("updateElementDict-afterLoad", [self.elementDict])
+        if self.skippedElements:
+            # all other elements are loaded and handed to the designer
+            base.messenger.send("showWarning", ["{} elements couldn't be loaded!\nSee output log for more information.".format(len(self.skippedElements))])
 
-    def __createElement(self, name, info):
-        """Control the creation of gui elements so that they are created in the correct order."""
-        if info["parent"] not in self.createdParents:
-            self.postponedElements[name] = info
-            return
+        logging.debug("Decoded {} distinct values, {} of them with eval".format(
+            len(self.decoder.factories), self.decoder.evalCount))
 
-        # create the element
-        self.__createControl(name, info)
-        self.createdParents.append(name)
-
-        if name in self.postponedElements.keys():
-            del self.postponedElements[name]
+        base.messenger.send("setLastPath", [self.path])
+        base.messenger.send("updateElementDict-afterLoad", [self.elementDict])
 
-        # check if we can create postponed elements
-        for elementName, elementInfo in self.postponedElements.copy().items():
-            if elementName in self.createdParents: continue
-            if elementInfo["parent"] in self.createdParents:
-                self.__createElement(elementName, elementInfo)
+    def __startProgressiveLoad(self):
+        self.nextElementIndex = 0
+        self.__createProgressDialog()
+        taskMgr.add(self.__progressiveLoadTask, "progressiveProjectLoad")
+
+    def __progressiveLoadTask(self, task):
+        """Create as many elements as fit in the frame budget"""
+        try:
+            return self.__loadNextElements(task)
+        except Exception:
+            # don't leave the modal progress dialog behind
+            logging.exception("Couldn't load project {}".format(self.path))
+            self.__destroyProgressDialog()
+            self.__removeCreatedElements()
+            base.messenger.send("showWarning", ["Error while loading Project!\nPlease check output logs for more information."])
+            return task.done
+
+    def __loadNextElements(self, task):
+        startTime = globalClock.getRealTime()
+        numElements = len(self.creationOrder)
+        while self.nextElementIndex < numElements:
+            name = self.creationOrder[self.nextElementIndex]
+            self.nextElementIndex += 1
+            self.__createControl(name, self.componentList[name])
+            if globalClock.getRealTime() - startTime >= self.loadFrameBudget:
+                break
+
+        self.progressBar["value"] = self.nextElementIndex / numElements * 100
+        self.progressLabel["text"] = f"Loading project... {self.nextElementIndex}/{numElements}"
+        if self.nextElementIndex < numElements:
+            return task.cont
+
+        self.__destroyProgressDialog()
+        self.__finishLoad()
+        return task.done
+
+    def cancelLoad(self):
+        """Stop a progressive load and remove all elements created so far"""
+        taskMgr.remove("progressiveProjectLoad")
+        self.__destroyProgressDialog()
+        self.__removeCreatedElements()
+        logging.info("Canceled loading project {}".format(self.path))
+
+    def __removeCreatedElements(self):
+        # remove children prior to their parents
+        for elementInfo in reversed(list(self.elementDict.values())):
+            if not elementInfo.element.isEmpty():
+                elementInfo.element.destroy()
+        self.elementDict.clear()
+        base.messenger.send("refreshStructureTree")
+
+    def __createProgressDialog(self):
+        screenWidth, screenHeight = base.getSize()
+        self.progressDialog = DirectFrame(
+            state=DGG.NORMAL,
+            relief=DGG.RIDGE,
+            frameColor=(1,1,1,1),
+            frameSize=(-160, 160, -50, 40),
+            pos=(screenWidth/2, 0, -screenHeight/2),
+            sortOrder=1,
+            parent=base.pixel2d)
+        self.progressLabel = DirectLabel(
+            text="Loading project...",
+            text_scale=14,
+            frameColor=(0,0,0,0),
+            pos=(0, 0, 20),
+            parent=self.progressDialog)
+        self.progressBar = DirectWaitBar(
+            range=100,
+            value=0,
+            frameSize=(-140, 140, -8, 8),
+            frameColor=(0.8, 0.8, 0.8, 1),
+            barColor=(0.2, 0.6, 0.2, 1),
+            parent=self.progressDialog)
+        DirectButton(
+            text="Cancel",
+            text_scale=14,
+            pad=(4, 2),
+            relief=DGG.FLAT,
+            frameColor=(0.8, 0.8, 0.8, 1),
+            pos=(0, 0, -36),
+            command=self.cancelLoad,
+            parent=self.progressDialog)
+
+    def __destroyProgressDialog(self):
+        if self.progressDialog is not None:
+            self.progressDialog.destroy()
+            self.progressDialog = None
+
+    def __decodeValue(self, value):
+        """Returns the python value of a value stored in the project file"""
+        if self.typedValues and not isinstance(value, ProjectExpression):
+            return value
+        return self.decoder.decode(value)
+
+    def __getCreationOrder(self, componentList):
+        """Returns the names of all elements in an order in which every
+        element comes after its parent. Elements keep the order they have
+        in the file as long as their parent has already been created."""
+        createdParents = set(["root"] + self.canvasParents)
+        # parent name: names of the elements waiting for this parent
+        waitingElements = {}
+        creationOrder = []
+        for name, info in componentList.items():
+            if info["parent"] not in createdParents:
+                waitingElements.setdefault(info["parent"], []).append(name)
+                continue
+            # create the element and all elements that waited for it
+            stack = [name]
+            while stack:
+                current = stack.pop()
+                creationOrder.append(current)
+                createdParents.add(current)
+                stack.extend(reversed(waitingElements.pop(current, [])))
+
+        if waitingElements:
+            self.__reportUnresolvedElements(componentList, waitingElements)
+        return creationOrder
+
+    def __reportUnresolvedElements(self, componentList, waitingElements):
+        """Log elements which couldn't be created as their parent is missing
+        in the file or they are part of a parent cycle."""
+        unresolved = [name for names in waitingElements.values() for name in names]
+        self.skippedElements.extend(unresolved)
+
+        orphans = [name for name in unresolved if componentList[name]["parent"] not in componentList]
+        for name in orphans:
+            logging.error("Element {} has unknown parent {} and will not be loaded".format(
+                name, componentList[name]["parent"]))
+
+        # follow the parent chains of all unresolved elements to find cycles
+        visited = set()
+        for name in unresolved:
+            path = []
+            pathIndex = {}
+            current = name
+            while current in componentList and current not in visited and current not in pathIndex:
+                pathIndex[current] = len(path)
+                path.append(current)
+                current = componentList[current]["parent"]
+            if current in pathIndex:
+                cycle = path[pathIndex[current]:]
+                logging.error("Elements {} are parents of each other and will not be loaded".format(
+                    " -> ".join(cycle + [cycle[0]])))
+            visited.update(path)
+
+        logging.error("{} elements couldn't be loaded due to missing or cyclic parents".format(
+            len(unresolved)))
 
     def __createControl(self, jsonElementName, jsonElementInfo):
         """Create a specific gui element."""
@@ -182,9 +375,10 @@ class ProjectLoader(DirectObject):
             elementInfo.extraOptions = jsonElementInfo["extraOptions"]
             elementInfo.addItemExtraArgs = jsonElementInfo["addItemExtraArgs"]
             elementInfo.addItemNode = jsonElementInfo["addItemNode"]
+            elementInfo.lazy = jsonElementInfo.get("lazy", False)
             elementInfo.name = jsonElementName
             if "transparency" in jsonElementInfo:
-                elementInfo.element.setTransparency(eval(jsonElementInfo["transparency"]))
+                elementInfo.element.setTransparency(self.__decodeValue(jsonElementInfo["transparency"]))
 
             if type(elementInfo) is tuple:
                 if parent is not None and "DirectScrolledList" == parent.type:
@@ -237,10 +431,9 @@ class ProjectLoader(DirectObject):
             for value, parentArg in zip(elementInfo.addItemExtraArgs, parentWidget.addItemExtraArgs.values()):
                 valueType = parentArg["type"]
                 if valueType == "element":  # replace the element name for the element itself
-                    for elInfo in self.elementDict.values():
-                        if elInfo.name == value:
-                            elementInfo.addItemExtraArgs[index] = elInfo.element
-                            break
+                    elInfo = self.elementDict.getByName(value)
+                    if elInfo is not None:
+                        elementInfo.addItemExtraArgs[index] = elInfo.element
                     else:  # if the element was not found
                         self.doMethodLater(0.2, self.__handleWidgetAddItemFunc, "__handleWidgetAddItem", [elementInfo, parent, parentWidget])
                         return
@@ -253,6 +446,8 @@ class ProjectLoader(DirectObject):
         tempOptionDict = {}
         for name, value in jsonElementInfo["element"].items():
             if name == "others":
+                if isinstance(value, RawProjectValue):
+                    value = value.value
                 self.radiobuttonOthersDict[elementInfo] = value
                 continue
             if name in self.prioList:
@@ -311,8 +506,15 @@ class ProjectLoader(DirectObject):
             wdList = self.allWidgetDefinitions[ei.type]
             for wd in wdList:
                 if wd.internalName == optionName:
+                    if self.typedValues \
+                    and not isinstance(value, (ProjectExpression, RawProjectValue)):
+                        # values from binary projects are already decoded
+                        PropertyHelper.setValue(wd, ei, value, repr(value))
+                        break
+                    if isinstance(value, RawProjectValue):
+                        value = value.value
                     if isinstance(value, str):
-                        PropertyHelper.setValue(wd, ei, eval(value), value)
+                        PropertyHelper.setValue(wd, ei, self.decoder.decode(value), value)
                     else:
                         PropertyHelper.setValue(wd, ei, eval(value))
                     # don't need to continue, we only have one value to set
@@ -9,6 +9,7 @@ See License.txt or http://opensource.org/licenses/BSD-2-Clause for more info
 import logging
 import sys
 import copy
+import functools
 
 from panda3d.core import (
     VBase4,
@@ -22,6 +23,8 @@ from panda3d.core import (
     MouseButton,
     NodePath,
     ConfigVariableString,
+    ConfigVariableBool,
+    ConfigVariableInt,
     Filename)
 from direct.showbase.DirectObject import DirectObject
 
@@ -51,6 +54,50 @@ MWDOWN = PGButton.getPressPrefix() + MouseButton.wheel_down().getName() + '-'
 SCROLLBARWIDTH = 20
 
 
+class ElementInfoProxy:
+    """Forwards all attribute access to the element info it currently points
+    to. This way the property widgets of a cached layout can be reused for
+    other elements of the same type."""
+    def __init__(self, elementInfo=None):
+        object.__setattr__(self, "target", elementInfo)
+
+    def setTarget(self, elementInfo):
+        object.__setattr__(self, "target", elementInfo)
+
+    def __getattr__(self, name):
+        return getattr(object.__getattribute__(self, "target"), name)
+
+    def __setattr__(self, name, value):
+        setattr(object.__getattribute__(self, "target"), name, value)
+
+
+class PropertiesLayout:
+    """Holds all widgets created to edit the properties of one type of
+    element, so they can be reused for other elements of that type."""
+    def __init__(self, key):
+        self.key = key
+        self.mainBoxFrame = None
+        self.headerLabel = None
+        self.boxFrames = {}
+
+        # header labels of the sub components and the name of the component
+        self.componentHeaders = []
+
+        # the element info proxies the property widgets work on. The main
+        # component is stored with an empty string as component name
+        self.targets = {}
+
+        # functions to push the values of the current element into the widgets
+        self.valueUpdaters = []
+
+        # sections which haven't been extended yet and the function that
+        # will create their content
+        self.sectionBuilders = {}
+
+        # layouts with errors will not be cached
+        self.hasErrors = False
+
+
 class PropertiesPanel(DirectObject):
     scrollSpeedUp = -0.001
     scrollSpeedDown = 0.001
@@ -63,6 +110,15 @@ class PropertiesPanel(DirectObject):
 
         self.setupDone = False
 
+        # layouts of previously shown types of elements
+        self.useLayoutCache = ConfigVariableBool("cache-properties-layout", True).getValue()
+        self.maxCachedLayouts = ConfigVariableInt("properties-cache-size", 10).getValue()
+        self.layoutCache = {}
+        self.activeLayout = None
+        # set while the sections of a new layout are created
+        self.buildingLayout = False
+        self.mainBoxFrame = None
+
         self.box = DirectBoxSizer(
             frameColor=(0.25, 0.25, 0.25, 1),
             autoUpdateFrameSize=False,
@@ -138,7 +194,7 @@ class PropertiesPanel(DirectObject):
                 self.parent["frameSize"][2]+DGH.getRealHeight(self.lblHeader), self.parent["frameSize"][3])
 
         if self.setupDone and not taskMgr.hasTaskNamed("updatePropPanel"):
-            taskMgr.doMethodLater(0.99, self.clear, "clearPropPanel", extraArgs=[])
+            taskMgr.doMethodLater(0.99, self.clearLayoutCache, "clearPropPanel", extraArgs=[])
             taskMgr.doMethodLater(1, self.refreshProperties, "updatePropPanel", extraArgs=[])
 
 
@@ -146,13 +202,124 @@ class PropertiesPanel(DirectObject):
         """Creates the set of editable properties for the given element"""
         if taskMgr.hasTaskNamed("updatePropPanel"):
             taskMgr.remove("updatePropPanel")
-        self.ignoreAll()
         self.headerText = headerText
         self.elementInfo = elementInfo
         self.elementDict = elementDict
         self.refreshProperties()
 
     def refreshProperties(self):
+        if self.mainBoxFrame is not None:
+            self.clear()
+
+        layoutKey = self.__getLayoutKey()
+        if layoutKey in self.layoutCache:
+            layout = self.layoutCache.pop(layoutKey)
+            if self.__reuseLayout(layout):
+                # keep the most recently used layouts at the end
+                self.layoutCache[layoutKey] = layout
+                return
+            # the layout couldn't be updated, so create a new one instead
+            self.__destroyLayout(layout)
+
+        self.activeLayout = PropertiesLayout(layoutKey)
+        self.__createLayout()
+
+        if self.useLayoutCache and not self.activeLayout.hasErrors:
+            self.layoutCache[layoutKey] = self.activeLayout
+            while len(self.layoutCache) > self.maxCachedLayouts:
+                oldestKey = next(iter(self.layoutCache))
+                self.__destroyLayout(self.layoutCache.pop(oldestKey))
+
+    def __getLayoutKey(self):
+        """Returns a key which is equal for all elements that will show the
+        same set of properties"""
+        components = []
+        componentInfo = getattr(self.elementInfo.element, "_DirectGuiBase__componentInfo", {})
+        for componentName, componentDefinition in componentInfo.items():
+            components.append((componentName, componentDefinition[2]))
+        return (self.elementInfo.type, tuple(components))
+
+    def __getComponentHeaderName(self, componentName, componentDefinition):
+        widget = componentDefinition[0]
+        wType = componentDefinition[2]
+        group = componentDefinition[4]
+        headerName = componentName
+        if group is not None:
+            widgetNPName = str(widget)
+            if len(widgetNPName) > 35:
+                widgetNPName = widgetNPName[-35:]
+                widgetNPName = "..." + widgetNPName
+            headerName = f"{wType} - [{widgetNPName}]"
+        return headerName
+
+    def __setLayoutTargets(self, layout):
+        """Point all property widgets of the layout to the current element"""
+        if "" not in layout.targets:
+            layout.targets[""] = ElementInfoProxy()
+        layout.targets[""].setTarget(self.elementInfo)
+
+        componentInfo = getattr(self.elementInfo.element, "_DirectGuiBase__componentInfo", {})
+        for componentName, componentDefinition in componentInfo.items():
+            # store the sub widget as an element info object
+            subWidgetElementInfo = copy.copy(self.elementInfo)
+            subWidgetElementInfo.element = componentDefinition[0]
+            subWidgetElementInfo.subComponentName = componentName
+            if componentName not in layout.targets:
+                layout.targets[componentName] = ElementInfoProxy()
+            layout.targets[componentName].setTarget(subWidgetElementInfo)
+
+    def __reuseLayout(self, layout):
+        """Show a previously created layout with the values of the current
+        element. Returns False if the layout couldn't be updated."""
+        self.activeLayout = layout
+        self.mainBoxFrame = layout.mainBoxFrame
+        self.boxFrames = layout.boxFrames
+        self.__setLayoutTargets(layout)
+
+        try:
+            layout.headerLabel["text"] = self.headerText
+            componentInfo = self.elementInfo.element._DirectGuiBase__componentInfo
+            for lbl, componentName in layout.componentHeaders:
+                lbl["text"] = self.__getComponentHeaderName(
+                    componentName, componentInfo[componentName])
+
+            for updateValues in layout.valueUpdaters:
+                if updateValues() is False:
+                    return False
+        except Exception:
+            logging.debug("Couldn't update cached properties layout", exc_info=True)
+            return False
+
+        self.mainBoxFrame.unstash()
+        self.updateCanvasSize()
+        return True
+
+    def __destroyLayout(self, layout):
+        for section in layout.boxFrames.keys():
+            self.ignore(section.getCollapsedEvent())
+            self.ignore(section.getExtendedEvent())
+        if layout.mainBoxFrame is not None:
+            layout.mainBoxFrame.destroy()
+        if layout is self.activeLayout:
+            self.activeLayout = None
+            self.mainBoxFrame = None
+
+    def clearLayoutCache(self):
+        """Destroy all cached layouts, e.g. if the panel size changed"""
+        for layout in self.layoutCache.values():
+            self.__destroyLayout(layout)
+        self.layoutCache = {}
+        self.clear()
+
+    def __addValueUpdater(self, updateFunc):
+        """Register a function that will push the values of the current
+        element into the property widgets once the layout gets reused"""
+        self.activeLayout.valueUpdaters.append(updateFunc)
+
+    def __createLayout(self):
+        layout = self.activeLayout
+        self.__setLayoutTargets(layout)
+
         # create the frame that will hold all our properties
         self.mainBoxFrame = DirectBoxSizer(
             orientation=DGG.VERTICAL,
@@ -179,15 +346,17 @@ class PropertiesPanel(DirectObject):
         lbl.bind(DGG.MWDOWN, self.scroll, [self.scrollSpeedDown])
         lbl.bind(DGG.MWUP, self.scroll, [self.scrollSpeedUp])
         self.mainBoxFrame.addItem(lbl)
+        layout.mainBoxFrame = self.mainBoxFrame
+        layout.headerLabel = lbl
 
-        has_error = False
-        error_count = 0
-        # Set up all the properties
+        # Set up the sections. Their content will only be created once a
+        # section gets extended for the first time.
         try:
 
             allDefinitions = {**WidgetDefinition.DEFINITIONS, **self.customWidgetDefinitions}
 
-            self.boxFrames = {}
+            self.boxFrames = layout.boxFrames
+            self.buildingLayout = True
 
             # check if we have a definition for this specific GUI element
             if self.elementInfo.type in allDefinitions:
@@ -196,66 +365,43 @@ class PropertiesPanel(DirectObject):
                 # create a header for this type of element
                 self.__createInbetweenHeader(self.elementInfo.type)
 
-                section = self.createSection()
+                elementInfo = layout.targets[""]
+
+                def buildMainSection(wd=wd, elementInfo=elementInfo):
+                    # Designer specific entries
+                    self.__createNameProperty(elementInfo)
 
-                # Designer specific entries
-                self.__createNameProperty(self.elementInfo)
+                    self.__createLazyProperty(elementInfo)
 
-                self.__createRootReParent(self.elementInfo)
+                    self.__createRootReParent(elementInfo)
 
-                # create the set of properties to edit on the main component
-                for definition in wd:
-                    try:
-                        self.createProperty(definition, self.elementInfo)
-                    except:
-                        #e = sys.exc_info()[1]
-                        has_error = True
-                        error_count += 1
-                        logging.exception("Failed to load property for properties panel")
+                    # create the set of properties to edit on the main component
+                    return self.__createProperties(wd, elementInfo)
 
+                section = self.createSection()
+                layout.sectionBuilders[section] = buildMainSection
                 self.updateSection(section)
 
                 # create the sub component set of properties to edit
-                groups = {}
                 for componentName, componentDefinition in self.elementInfo.element._DirectGuiBase__componentInfo.items():
-                    widget = componentDefinition[0]
-                    wConfigure = componentDefinition[1]
                     wType = componentDefinition[2]
-                    wGet = componentDefinition[3]
-                    group = componentDefinition[4]
-
-                    # store the sub widget as an element info object
-                    subWidgetElementInfo = copy.copy(self.elementInfo)
-                    subWidgetElementInfo.element = widget
-                    subWidgetElementInfo.subComponentName = componentName
-
-                    headerName = componentName
-                    if group is not None:
-                        widgetNPName = str(widget)
-                        if len(widgetNPName) > 35:
-                            widgetNPName = widgetNPName[-35:]
-                            widgetNPName = "..." + widgetNPName
-                        headerName = f"{wType} - [{widgetNPName}]"
+
+                    # the sub widget as an element info object
+                    subWidgetElementInfo = layout.targets[componentName]
+
+                    headerName = self.__getComponentHeaderName(
+                        componentName, componentDefinition)
 
                     # check if this component has definitions
                     if wType in allDefinitions:
                         # write the header for this component
-                        self.__createInbetweenHeader(headerName)
+                        lbl = self.__createInbetweenHeader(headerName)
+                        layout.componentHeaders.append((lbl, componentName))
                         subsection = self.createSection()
-                        subWd = allDefinitions[wType]
-                        for definition in subWd:
-                            # create the property for all definitions of this
-                            # sub widget
-                            try:
-                                self.createProperty(
-                                    definition,
-                                    subWidgetElementInfo)
-                            except:
-                                #e = sys.exc_info()[1]
-                                has_error = True
-                                error_count += 1
-                                logging.exception("Failed to load property for properties panel")
-
+                        layout.sectionBuilders[subsection] = functools.partial(
+                            self.__createProperties,
+                            allDefinitions[wType],
+                            subWidgetElementInfo)
                         self.updateSection(subsection)
 
             self.setupDone = True
@@ -263,10 +409,10 @@ class PropertiesPanel(DirectObject):
             e = sys.exc_info()[1]
             base.messenger.send("showWarning", [str(e)])
             logging.exception("Error while loading properties panel")
-
-        if has_error:
-            base.messenger.send("showWarning", [f"There were {error_count} Errors while loading the properties panel.\nSee log file for more details."])
-
+            # don't keep incomplete layouts
+            layout.hasErrors = True
+        finally:
+            self.buildingLayout = False
 
         #
         # Reset property Frame framesize
@@ -274,6 +420,7 @@ class PropertiesPanel(DirectObject):
         self.updateCanvasSize()
 
     def updateCanvasSize(self):
+        if self.mainBoxFrame is None: return
         for section, boxFrame in self.boxFrames.items():
             boxFrame.refresh()
 
@@ -305,7 +452,7 @@ class PropertiesPanel(DirectObject):
                 0, 20))
 
         self.accept(section.getCollapsedEvent(), self.sectionCollapsed, extraArgs=[section])
-        self.accept(section.getExtendedEvent(), self.updateCanvasSize)
+        self.accept(section.getExtendedEvent(), self.sectionExtended, extraArgs=[section])
 
         section.toggleCollapseButton["text_scale"] = 12
         tp = section.toggleCollapseButton["text_pos"]
@@ -337,8 +484,51 @@ class PropertiesPanel(DirectObject):
         return section
 
     def sectionCollapsed(self, section):
+        if self.buildingLayout: return
+        self.updateCanvasSize()
+
+    def sectionExtended(self, section):
+        if self.buildingLayout: return
+        layout = self.activeLayout
+        if layout is not None and section in layout.sectionBuilders:
+            self.__buildSection(layout, section)
+            # this will send the extended event again which then updates the
+            # canvas size
+            self.updateSection(section)
+            return
         self.updateCanvasSize()
 
+    def __buildSection(self, layout, section):
+        """Create the property widgets of a section which hasn't been
+        extended before"""
+        builder = layout.sectionBuilders.pop(section)
+        self.boxFrame = self.boxFrames[section]
+        try:
+            error_count = builder()
+        except Exception:
+            logging.exception("Error while loading properties panel section")
+            error_count = 1
+
+        if error_count:
+            # don't keep incomplete layouts
+            layout.hasErrors = True
+            if self.layoutCache.get(layout.key) is layout:
+                del self.layoutCache[layout.key]
+            base.messenger.send("showWarning", [f"There were {error_count} Errors while loading the properties panel.\nSee log file for more details."])
+
+    def __createProperties(self, definitions, elementInfo):
+        """Create the properties for all given definitions and return the
+        number of properties that failed to load"""
+        error_count = 0
+        for definition in definitions:
+            try:
+                self.createProperty(definition, elementInfo)
+            except:
+                #e = sys.exc_info()[1]
+                error_count += 1
+                logging.exception("Failed to load property for properties panel")
+        return error_count
+
     def updateSection(self, section):
         self.boxFrames[section].refresh()
         fs = self.boxFrames[section]["frameSize"]
@@ -377,9 +567,18 @@ class PropertiesPanel(DirectObject):
             logging.error(f"Edit type {definition.editType} not in Edit type definitions")
 
     def clear(self):
-        if not hasattr(self, "mainBoxFrame"): return
         if self.mainBoxFrame is not None:
-            self.mainBoxFrame.destroy()
+            if self.activeLayout is not None \
+            and self.layoutCache.get(self.activeLayout.key) is self.activeLayout:
+                # keep the layout for later use
+                self.mainBoxFrame.stash()
+            else:
+                for section in self.boxFrames.keys():
+                    self.ignore(section.getCollapsedEvent())
+                    self.ignore(section.getExtendedEvent())
+                self.mainBoxFrame.destroy()
+        self.mainBoxFrame = None
+        self.activeLayout = None
 
     def __createInbetweenHeader(self, description):
         l = DirectLabel(
@@ -392,6 +591,7 @@ class PropertiesPanel(DirectObject):
         l.bind(DGG.MWDOWN, self.scroll, [self.scrollSpeedDown])
         l.bind(DGG.MWUP, self.scroll, [self.scrollSpeedUp])
         self.mainBoxFrame.addItem(l, skipRefresh=True)
+        return l
 
     def __createPropertyHeader(self, description):
         l = DirectLabel(
@@ -407,6 +607,9 @@ class PropertiesPanel(DirectObject):
         self.boxFrame.addItem(l, skipRefresh=True)
 
     def __addToKillRing(self, elementInfo, definition, oldValue, newValue):
+        if isinstance(elementInfo, ElementInfoProxy):
+            # the proxy may point to another element later
+            elementInfo = elementInfo.target
         base.messenger.send("addToKillRing",
             [elementInfo, "set", definition.internalName, oldValue, newValue])
 
@@ -491,6 +694,17 @@ class PropertiesPanel(DirectObject):
             entryBox.addItem(entry)
         self.boxFrame.addItem(entryBox, skipRefresh=True)
 
+        def updateValues():
+            values = PropertyHelper.getValues(definition, elementInfo)
+            if type(values) is int or type(values) is float:
+                values = [values] * n
+            if definition.nullable:
+                if values is None:
+                    values = [""] * n
+            for i in range(n):
+                entryList[i].set(str(PropertyHelper.getFormated(values[i])))
+        self.__addValueUpdater(updateValues)
+
     def __createNumberInput(self, definition, elementInfo, numberType):
         def update(text, elementInfo):
             base.messenger.send("setDirtyFlag")
@@ -519,6 +733,13 @@ class PropertiesPanel(DirectObject):
         entry = self.__createTextEntry(str(valueA), width, update, [elementInfo])
         self.boxFrame.addItem(entry, skipRefresh=True)
 
+        def updateValue():
+            valueA = PropertyHelper.getValues(definition, elementInfo)
+            if valueA is not None:
+                valueA = PropertyHelper.getFormated(valueA, numberType is int)
+            entry.set(str(valueA))
+        self.__addValueUpdater(updateValue)
+
     def __createTextProperty(self, definition, elementInfo):
         def update(text, elementInfo):
             base.messenger.send("setDirtyFlag")
@@ -535,6 +756,11 @@ class PropertiesPanel(DirectObject):
         entry = self.__createTextEntry(text, width, update, [elementInfo])
         self.boxFrame.addItem(entry, skipRefresh=True)
 
+        def updateValue():
+            text = PropertyHelper.getValues(definition, elementInfo)
+            entry.set(text if text is not None else "")
+        self.__addValueUpdater(updateValue)
+
     def __createBoolProperty(self, definition, elementInfo):
         def update(value):
             base.messenger.send("setDirtyFlag")
@@ -556,6 +782,10 @@ class PropertiesPanel(DirectObject):
         btn.bind(DGG.MWUP, self.scroll, [self.scrollSpeedUp])
         self.boxFrame.addItem(btn, skipRefresh=True)
 
+        def updateValue():
+            btn["indicatorValue"] = PropertyHelper.getValues(definition, elementInfo)
+        self.__addValueUpdater(updateValue)
+
     def __createListProperty(self, definition, elementInfo):
         def update(text, elementInfo, entries):
             base.messenger.send("setDirtyFlag")
@@ -622,6 +852,17 @@ class PropertiesPanel(DirectObject):
         btn.bind(DGG.MWUP, self.scroll, [self.scrollSpeedUp])
         self.boxFrame.addItem(btn, skipRefresh=True)
 
+        def updateValues():
+            listItems = PropertyHelper.getValues(definition, elementInfo)
+            if listItems is None or isinstance(listItems, str):
+                listItems = [listItems]
+            if len(listItems) != len(entries):
+                # the entries need to be recreated
+                return False
+            for entry, text in zip(entries, listItems):
+                entry.set(str(text))
+        self.__addValueUpdater(updateValues)
+
     def __createTupleProperty(self, definition, elementInfo):
         def update(text, elementInfo, entries):
             base.messenger.send("setDirtyFlag")
@@ -685,10 +926,20 @@ class PropertiesPanel(DirectObject):
         btn.bind(DGG.MWUP, self.scroll, [self.scrollSpeedUp])
         self.boxFrame.addItem(btn, skipRefresh=True)
 
+        def updateValues():
+            listItems = PropertyHelper.getValues(definition, elementInfo)
+            if len(listItems) != len(entries):
+                # the entries need to be recreated
+                return False
+            for entry, text in zip(entries, listItems):
+                entry.set(str(text))
+        self.__addValueUpdater(updateValues)
+
     def __createCustomCommandProperty(self, description, updateElement, updateAttribute, elementInfo):
         def update(text, elementInfo):
             base.messenger.send("setDirtyFlag")
             self.elementInfo.extraOptions[updateAttribute] = text
+            elementInfo.invalidateJSONCache()
 
             for elementId, self.elementInfo in self.elementDict.items():
                 if elementId in text:
@@ -785,6 +1036,13 @@ class PropertiesPanel(DirectObject):
         entry = self.__createTextEntry(path, width, update)
         self.boxFrame.addItem(entry, skipRefresh=True)
 
+        def updateValue():
+            path = PropertyHelper.getValues(definition, elementInfo)
+            if type(path) is not str:
+                path = ""
+            entry.set(path)
+        self.__addValueUpdater(updateValue)
+
         btn = DirectButton(
             text="Browse",
             text_align=TextNode.ALeft,
@@ -840,13 +1098,25 @@ class PropertiesPanel(DirectObject):
         menu.bind(DGG.MWUP, self.scroll, [self.scrollSpeedUp])
         self.boxFrame.addItem(menu, skipRefresh=True)
 
+        def updateValue():
+            value = PropertyHelper.getValues(definition, elementInfo)
+            selectedIndex = 0
+            for i, v in enumerate(definition.valueOptions.values()):
+                if v == value:
+                    selectedIndex = i
+                    break
+            menu.set(selectedIndex, fCommand=0)
+        self.__addValueUpdater(updateValue)
+
     def __createCustomCommand(self, definition, elementInfo):
+        def runCommand():
+            getattr(elementInfo.element, definition.valueOptions)()
         self.__createPropertyHeader(definition.visibleName)
         btn = DirectButton(
             text="Run Command",
             pad=(0.25,0.25),
             scale=12,
-            command=getattr(elementInfo.element, definition.valueOptions)
+            command=runCommand
             )
         btn.bind(DGG.MWDOWN, self.scroll, [self.scrollSpeedDown])
         btn.bind(DGG.MWUP, self.scroll, [self.scrollSpeedUp])
@@ -865,11 +1135,7 @@ class PropertiesPanel(DirectObject):
             if len(rootElement.getChildren()) <= 0:
                 return [l,r,b,t]
             for child in rootElement.getChildren():
-                childElementInfo = None
-                if child.getName() in self.elementDict.keys():
-                    childElementInfo = self.elementDict[child.getName()]
-                elif len(child.getName().split("-")) > 1 and child.getName().split("-")[1] in self.elementDict.keys():
-                    childElementInfo = self.elementDict[child.getName().split("-")[1]]
+                childElementInfo = self.elementDict.getByNode(child)
 
                 if childElementInfo is None: continue
 
@@ -901,6 +1167,7 @@ class PropertiesPanel(DirectObject):
             if l is None or r is None or b is None or t is None:
                 return
             elementInfo.element["frameSize"] = [l, r, b, t]
+            elementInfo.invalidateJSONCache()
 
         btn = DirectButton(
             text="Fit to children",
@@ -922,18 +1189,44 @@ class PropertiesPanel(DirectObject):
             name = elementInfo.element.guiId.replace("-", "")
             if text != "":
                 name = text
-            base.messenger.send("setName", [elementInfo, name])
+            base.messenger.send("setName", [elementInfo.target, name])
         self.__createPropertyHeader("Name")
         text = elementInfo.name
         width = DGH.getRealWidth(self.boxFrame) - SCROLLBARWIDTH
         entry = self.__createTextEntry(text, width, update)
         self.boxFrame.addItem(entry, skipRefresh=True)
 
+        def updateValue():
+            entry.set(elementInfo.name)
+        self.__addValueUpdater(updateValue)
+
+    def __createLazyProperty(self, elementInfo):
+        def update(value):
+            base.messenger.send("setDirtyFlag")
+            elementInfo.lazy = bool(value)
+        self.__createPropertyHeader("Create on first show (exported scripts)")
+        btn = DirectCheckButton(
+            indicatorValue=elementInfo.lazy,
+            scale=24,
+            frameSize=(-.5,.5,-.5,.5),
+            text_align=TextNode.ALeft,
+            command=update)
+        btn.bind(DGG.MWDOWN, self.scroll, [self.scrollSpeedDown])
+        btn.bind(DGG.MWUP, self.scroll, [self.scrollSpeedUp])
+        self.boxFrame.addItem(btn, skipRefresh=True)
+
+        def updateValue():
+            btn["indicatorValue"] = elementInfo.lazy
+        self.__addValueUpdater(updateValue)
+
     def __createRootReParent(self, elementInfo):
         def update(name):
             base.messenger.send("setDirtyFlag")
             parent = self.getEditorPlacer(name)
             elementInfo.element.reparentTo(parent)
+            # the registry only knows the element info, not its proxy
+            self.elementDict.updateParent(elementInfo.target)
+            elementInfo.invalidateJSONCache()
             if name == "canvasRoot":
                 elementInfo.parent = None
             else:
@@ -18,6 +18,173 @@ from DirectGuiExtension import DirectGuiHelper as DGH
 from DirectGuiExtension.DirectBoxSizer import DirectBoxSizer
 from DirectGuiExtension.DirectAutoSizer import DirectAutoSizer
 
+class StructureTreeRow:
+    """A single row of the structure tree. Rows will be reused for different
+    elements while scrolling through the tree."""
+    margin = 5
+    shift = 6
+
+    def __init__(self, panel):
+        self.panel = panel
+        canvas = panel.structureFrame.getCanvas()
+
+        # Label for nodes that aren't editable elements
+        self.lbl = DirectLabel(
+            text="",
+            text_align=TextNode.ALeft,
+            frameColor=(0,0,0,0),
+            relief=DGG.FLAT,
+            scale=16,
+            parent=canvas)
+
+        # Collapse Button
+        self.btnC = DirectCheckBox(
+            relief=DGG.FLAT,
+            frameSize=(-8, 8, -8, 8),
+            frameColor=(0,0,0,0),
+            command=panel.collapseElement,
+            image="icons/Collapse.png",
+            uncheckedImage="icons/Collapse.png",
+            checkedImage="icons/Collapsed.png",
+            image_scale=8,
+            parent=canvas)
+        self.btnC.setTransparency(TransparencyAttrib.M_alpha)
+
+        # Element Name
+        self.btn = DirectButton(
+            frameColor=(VBase4(1,1,1,1), #normal
+                VBase4(0.9,0.9,0.9,1), #click
+                VBase4(0.8,0.8,0.8,1), #hover
+                VBase4(0.5,0.5,0.5,1)), #disabled
+            text="",
+            text_align=TextNode.ALeft,
+            relief=DGG.FLAT,
+            scale=16,
+            command=panel.selectElement,
+            parent=canvas)
+
+        # Delete Button
+        self.btnX = DirectButton(
+            relief=DGG.FLAT,
+            frameSize=(-8, 8, -8, 8),
+            frameColor=(0,0,0,0),
+            command=panel.removeElement,
+            image="icons/DeleteSmall.png",
+            image_scale=8,
+            parent=canvas)
+        self.btnX.setTransparency(TransparencyAttrib.M_multisample)
+
+        # Visibility Button
+        self.btnV = DirectCheckBox(
+            relief=DGG.FLAT,
+            frameSize=(-8, 8, -8, 8),
+            frameColor=(0,0,0,0),
+            command=panel.toggleElementVisibility,
+            image="icons/VisibilityOnSmall.png",
+            uncheckedImage="icons/VisibilityOffSmall.png",
+            checkedImage="icons/VisibilityOnSmall.png",
+            image_scale=8,
+            isChecked=True,
+            parent=canvas)
+        self.btnV.setTransparency(TransparencyAttrib.M_multisample)
+
+        # Move Up Button
+        self.btnUp = DirectButton(
+            relief=DGG.FLAT,
+            frameSize=(-8, 8, -8, 8),
+            frameColor=(0,0,0,0),
+            command=panel.moveElementInStructure,
+            image="icons/ArrowUpSmall.png",
+            image_scale=8,
+            parent=canvas)
+        self.btnUp.setTransparency(TransparencyAttrib.M_multisample)
+
+        # Move Down Button
+        self.btnDown = DirectButton(
+            relief=DGG.FLAT,
+            frameSize=(-8, 8, -8, 8),
+            frameColor=(0,0,0,0),
+            command=panel.moveElementInStructure,
+            image="icons/ArrowDownSmall.png",
+            image_scale=8,
+            parent=canvas)
+        self.btnDown.setTransparency(TransparencyAttrib.M_multisample)
+
+        self.widgets = [
+            self.lbl, self.btnC, self.btn, self.btnX,
+            self.btnV, self.btnUp, self.btnDown]
+        for widget in self.widgets:
+            widget.bind(DGG.MWDOWN, panel.scroll, [0.01])
+            widget.bind(DGG.MWUP, panel.scroll, [-0.01])
+
+        self.hide()
+
+    def hide(self):
+        for widget in self.widgets:
+            widget.hide()
+
+    def update(self, index, elementNP, elementInfo, level, hasChildren):
+        """Show the given item of the tree in this row"""
+        z = -16*index
+        x = self.panel.structureFrame["frameSize"][0] + 20*level
+
+        if elementInfo is None:
+            self.hide()
+            self.lbl["text"] = elementNP.getName()
+            self.lbl.setPos(x, 0, z)
+            self.lbl.show()
+            return
+
+        self.lbl.hide()
+
+        if hasChildren:
+            isCollapsed = elementInfo in self.panel.collapsedElements
+            self.btnC["isChecked"] = isCollapsed
+            self.btnC["image"] = "icons/Collapsed.png" if isCollapsed else "icons/Collapse.png"
+            self.btnC["extraArgs"] = [elementInfo]
+            self.btnC.setPos(x - 16 + self.margin, 0, z+self.shift)
+            self.btnC.show()
+        else:
+            self.btnC.hide()
+
+        if self.btn["text"] != elementInfo.name:
+            self.btn["text"] = elementInfo.name
+            self.btn.resetFrameSize()
+        self.btn["extraArgs"] = [elementInfo]
+        self.btn.setPos(x, 0, z)
+        if self.panel.selectedElement is not None and self.panel.selectedElement == elementInfo:
+            self.btn.setColorScale(1,1,0,1)
+        else:
+            self.btn.clearColorScale()
+        self.btn.show()
+
+        x += 8 + self.margin + self.btn.getWidth()*self.btn.getScale()[0]
+        self.btnX["extraArgs"] = [elementInfo]
+        self.btnX.setPos(x, 0, z+self.shift)
+        self.btnX.show()
+
+        x += self.margin + self.btnX.getWidth()
+        isVisible = not elementInfo.element.isHidden()
+        self.btnV["isChecked"] = isVisible
+        self.btnV["image"] = "icons/VisibilityOnSmall.png" if isVisible else "icons/VisibilityOffSmall.png"
+        self.btnV["extraArgs"] = [elementInfo]
+        self.btnV.setPos(x, 0, z+self.shift)
+        self.btnV.show()
+
+        x += self.margin + self.btnV.getWidth()
+        self.btnUp["extraArgs"] = [-1, elementInfo]
+        self.btnUp.setPos(x, 0, z+self.shift)
+        self.btnUp.show()
+
+        x += self.margin + self.btnUp.getWidth()
+        self.btnDown["extraArgs"] = [1, elementInfo]
+        self.btnDown.setPos(x, 0, z+self.shift)
+        self.btnDown.show()
+
+    def destroy(self):
+        for widget in self.widgets:
+            widget.destroy()
+
 class StructurePanel:
     def __init__(self, parent, getEditorRootCanvas, elementDict, selectedElement):
         height = DGH.getRealHeight(parent)
@@ -76,8 +243,27 @@ class StructurePanel:
         self.box.addItem(self.structureFrame)
         self.structureFrame.bind(DGG.MWDOWN, self.scroll, [0.01])
         self.structureFrame.bind(DGG.MWUP, self.scroll, [-0.01])
+        self.structureFrame.verticalScroll["command"] = self.updateVisibleRows
         self.maxWidth = parent["frameSize"][1]-20
         self.getEditorRootCanvas = getEditorRootCanvas
+
+        # used to calculate the width of the items in the tree
+        self.textMeasure = TextNode("StructureTextMeasure")
+        self.textMeasure.setFont(DGG.getDefaultFont())
+
+        # the widgets showing the currently visible part of the tree
+        self.rowPool = []
+        self.treeItems = []
+        self.itemIndex = {}
+        self.itemCounter = 0
+        self.firstVisibleItem = 0
+        # nodes whose subtree changed since the last refresh
+        self.dirtyNodes = {}
+
+        # number of times the tree has been rebuilt
+        self.rebuildCount = 0
+        # number of times the index of the tree items has been updated
+        self.reindexCount = 0
         self.refreshStructureTree(elementDict, selectedElement)
 
     def scroll(self, scrollStep, event):
@@ -107,6 +293,7 @@ class StructurePanel:
                     self.parent["frameSize"][2]+DGH.getRealHeight(self.lblHeader), self.parent["frameSize"][3])
 
             self.recalcScrollSize()
+            self.updateVisibleRows()
 
         #posZ = 0
         #height = DGH.getRealHeight(parent)
@@ -118,18 +305,23 @@ class StructurePanel:
         #self.structureFrame.setPos(0,0,posZ)
 
     def refreshStructureTree(self, elementDict, selectedElement):
+        self.rebuildCount += 1
         self.elementDict = elementDict
         self.selectedElement = selectedElement
-
-        # cleanup the structure tree
-        for element in self.structureFrame.getCanvas().getChildren():
-            element.removeNode()
+        self.dirtyNodes = {}
 
         self.maxWidth = self.parent["frameSize"][1]-20
-        self.itemCounter = 0
 
-        # create the tree
-        self.__fillStructureTree(self.getEditorRootCanvas(), 0, 0)
+        # create a flat list of all visible items of the tree
+        self.treeItems = []
+        self.__fillStructureTree(self.getEditorRootCanvas(), 0, self.treeItems)
+        self.itemIndex = {}
+        self.__updateItemIndex(0)
+
+        self.__updateCanvas()
+
+    def __updateCanvas(self):
+        self.itemCounter = len(self.treeItems) + 1
 
         self.structureFrame["canvasSize"] = (
             self.structureFrame["frameSize"][0], self.maxWidth,
@@ -137,163 +329,162 @@ class StructurePanel:
         self.structureFrame.setCanvasSize()
         self.recalcScrollSize()
 
-    def __fillStructureTree(self, root, level, z):
+        self.updateVisibleRows()
+
+    def __updateItemIndex(self, start):
+        """Update the index of all tree items starting from the given index"""
+        self.reindexCount += 1
+        for index in range(start, len(self.treeItems)):
+            self.itemIndex[self.treeItems[index][0]] = index
+
+    def __fillStructureTree(self, root, level, treeItems):
         if "DirectGrid" == root.getName(): return
-        self.itemCounter += 1
 
-        elementInfo = None
-        if root.getName() in self.elementDict.keys():
-            elementInfo = self.elementDict[root.getName()]
-        elif len(root.getName().split("-")) > 1 and root.getName().split("-")[1] in self.elementDict.keys():
-            elementInfo = self.elementDict[root.getName().split("-")[1]]
+        elementInfo = self.elementDict.getByNode(root)
 
+        hasChildren = hasattr(root, "getChildren") and root.getNumChildren() > 0
         if level > 0:
-            self.__makeStructureFrameTreeItem(root, elementInfo, level, z)
-        if hasattr(root, "getChildren") \
+            treeItems.append((root, elementInfo, level, hasChildren))
+            self.__updateMaxWidth(root, elementInfo, level)
+        if hasChildren \
         and elementInfo not in self.collapsedElements:
             for child in root.getChildren():
-                z=-16*self.itemCounter
-                self.__fillStructureTree(child, level+1, z)
+                self.__fillStructureTree(child, level+1, treeItems)
 
-    def __makeStructureFrameTreeItem(self, elementNP, elementInfo, parentsLevel, z):
+    def __updateMaxWidth(self, elementNP, elementInfo, level):
+        """Calculate the width an item will need in the tree without actually
+        creating the widgets for it"""
+        x = self.structureFrame["frameSize"][0] + 20*level
         if elementInfo is None:
-            lbl = DirectLabel(
-                text=elementNP.getName(),
-                text_align=TextNode.ALeft,
-                frameColor=(0,0,0,0),
-                relief=DGG.FLAT,
-                pos=(self.structureFrame["frameSize"][0] + 20*parentsLevel, 0, z),
-                scale=16,
-                parent=self.structureFrame.getCanvas())
-            self.maxWidth = max(self.maxWidth, lbl.getX() + lbl.getWidth()*lbl.getScale()[0])
+            width = self.textMeasure.calcWidth(elementNP.getName()) * 16
+            self.maxWidth = max(self.maxWidth, x + width)
         else:
-            margin = 5
-            shift = 6
-
-            if hasattr(elementNP, "getChildren"):
-                if len(elementNP.getChildren()) > 0:
-                    # Collapse Button
-                    btnC = DirectCheckBox(
-                        relief=DGG.FLAT,
-                        pos=(self.structureFrame["frameSize"][0] + 20*parentsLevel - 16 + margin, 0, z+shift),
-                        frameSize=(-8, 8, -8, 8),
-                        frameColor=(0,0,0,0),
-                        command=self.__collapseElement,
-                        extraArgs=[elementInfo],
-                        image="icons/Collapsed.png" if elementInfo in self.collapsedElements else "icons/Collapse.png",
-                        uncheckedImage="icons/Collapse.png",
-                        checkedImage="icons/Collapsed.png",
-                        image_scale=8,
-                        isChecked=elementInfo in self.collapsedElements,
-                        parent=self.structureFrame.getCanvas())
-                    btnC.setTransparency(TransparencyAttrib.M_alpha)
-                    btnC.bind(DGG.MWDOWN, self.scroll, [0.01])
-                    btnC.bind(DGG.MWUP, self.scroll, [-0.01])
-
-            # Element Name
-            btn = DirectButton(
-                frameColor=(VBase4(1,1,1,1), #normal
-                    VBase4(0.9,0.9,0.9,1), #click
-                    VBase4(0.8,0.8,0.8,1), #hover
-                    VBase4(0.5,0.5,0.5,1)), #disabled
-                text=elementInfo.name,
-                text_align=TextNode.ALeft,
-                relief=DGG.FLAT,
-                pos=(self.structureFrame["frameSize"][0] + 20*parentsLevel, 0, z),
-                scale=16,
-                command=self.__selectElement,
-                extraArgs=[elementInfo],
-                parent=self.structureFrame.getCanvas())
-            btn.bind(DGG.MWDOWN, self.scroll, [0.01])
-            btn.bind(DGG.MWUP, self.scroll, [-0.01])
-            if self.selectedElement is not None and self.selectedElement == elementInfo:
-                btn.setColorScale(1,1,0,1)
-
-            x = self.structureFrame["frameSize"][0] + 8 + margin + 20*parentsLevel + btn.getWidth()*btn.getScale()[0]
-            # Delete Button
-            btnX = DirectButton(
-                relief=DGG.FLAT,
-                pos=(x, 0, z+shift),
-                frameSize=(-8, 8, -8, 8),
-                frameColor=(0,0,0,0),
-                command=self.__removeElement,
-                extraArgs=[elementInfo],
-                image="icons/DeleteSmall.png",
-                image_scale=8,
-                parent=self.structureFrame.getCanvas())
-            btnX.setTransparency(TransparencyAttrib.M_multisample)
-            btnX.bind(DGG.MWDOWN, self.scroll, [0.01])
-            btnX.bind(DGG.MWUP, self.scroll, [-0.01])
-
-            x += margin + btnX.getWidth()
-            # Visibility Button
-            btnV = DirectCheckBox(
-                relief=DGG.FLAT,
-                pos=(x, 0, z+shift),
-                frameSize=(-8, 8, -8, 8),
-                frameColor=(0,0,0,0),
-                command=self.__toggleElementVisibility,
-                extraArgs=[elementInfo],
-                image="icons/VisibilityOffSmall.png" if elementInfo.element.isHidden() else "icons/VisibilityOnSmall.png",
-                uncheckedImage="icons/VisibilityOffSmall.png",
-                checkedImage="icons/VisibilityOnSmall.png",
-                image_scale=8,
-                isChecked=not elementInfo.element.isHidden(),
-                parent=self.structureFrame.getCanvas())
-            btnV.setTransparency(TransparencyAttrib.M_multisample)
-            btnV.bind(DGG.MWDOWN, self.scroll, [0.01])
-            btnV.bind(DGG.MWUP, self.scroll, [-0.01])
-            self.maxWidth = max(self.maxWidth, btnV.getX() + 8)
-
-            x += margin + btnV.getWidth()
-            # Move Up Button
-            btnUp = DirectButton(
-                relief=DGG.FLAT,
-                pos=(x, 0, z+shift),
-                frameSize=(-8, 8, -8, 8),
-                frameColor=(0,0,0,0),
-                command=self.__moveElementInStructure,
-                extraArgs=[-2, elementInfo],
-                image="icons/ArrowUpSmall.png",
-                image_scale=8,
-                parent=self.structureFrame.getCanvas())
-            btnUp.setTransparency(TransparencyAttrib.M_multisample)
-            btnUp.bind(DGG.MWDOWN, self.scroll, [0.01])
-            btnUp.bind(DGG.MWUP, self.scroll, [-0.01])
-
-            x += margin + btnUp.getWidth()
-            # Move Down Button
-            btnDown = DirectButton(
-                relief=DGG.FLAT,
-                pos=(x, 0, z+shift),
-                frameSize=(-8, 8, -8, 8),
-                frameColor=(0,0,0,0),
-                command=self.__moveElementInStructure,
-                extraArgs=[1, elementInfo],
-                image="icons/ArrowDownSmall.png",
-                image_scale=8,
-                parent=self.structureFrame.getCanvas())
-            btnDown.setTransparency(TransparencyAttrib.M_multisample)
-            btnDown.bind(DGG.MWDOWN, self.scroll, [0.01])
-            btnDown.bind(DGG.MWUP, self.scroll, [-0.01])
-
-    def __selectElement(self, elementInfo, args=None):
+            width = self.textMeasure.calcWidth(elementInfo.name) * 16
+            # the name plus the delete and visibility buttons
+            self.maxWidth = max(self.maxWidth, x + width + 8 + 5*2 + 16 + 8)
+
+    def updateVisibleRows(self, *args):
+        """Only the rows of the tree which are currently visible in the
+        scrolled frame will be shown. The row widgets will be reused and
+        placed at the respective positions while scrolling."""
+        frameHeight = DGH.getRealHeight(self.structureFrame)
+        neededRows = int(frameHeight / 16) + 2
+        while len(self.rowPool) < neededRows:
+            self.rowPool.append(StructureTreeRow(self))
+
+        # calculate the first visible item from the current scroll position
+        canvasHeight = self.itemCounter * 16
+        scrollValue = self.structureFrame.verticalScroll["value"]
+        if self.structureFrame.verticalScroll.isHidden():
+            scrollValue = 0
+        offset = max(0, canvasHeight - frameHeight) * scrollValue
+        self.firstVisibleItem = max(0, int(offset / 16) - 1)
+
+        for i, row in enumerate(self.rowPool):
+            index = self.firstVisibleItem + i
+            if index < len(self.treeItems):
+                row.update(index+1, *self.treeItems[index])
+            else:
+                row.hide()
+
+    def __updateItemRow(self, index):
+        """Update the row showing the item at the given index if it is
+        currently visible"""
+        row = index - self.firstVisibleItem
+        if 0 <= row < len(self.rowPool):
+            self.rowPool[row].update(index+1, *self.treeItems[index])
+
+    #
+    # Incremental updates of the tree
+    #
+    def updateElement(self, elementInfo):
+        """Update the row of the given element, e.g. after it has been renamed
+        or its visibility changed"""
+        index = self.itemIndex.get(elementInfo.element)
+        if index is None: return
+        maxWidth = self.maxWidth
+        self.__updateMaxWidth(elementInfo.element, elementInfo, self.treeItems[index][2])
+        if self.maxWidth != maxWidth:
+            # widen the canvas so the longer label isn't clipped, this will
+            # update all visible rows
+            self.__updateCanvas()
+            return
+        self.__updateItemRow(index)
+
+    def setSelectedElement(self, elementInfo):
+        """Change the highlighted element of the tree, only the rows of the
+        previously and newly selected element will be updated"""
+        previousElement = self.selectedElement
+        self.selectedElement = elementInfo
+        for info in [previousElement, elementInfo]:
+            if info is not None:
+                self.updateElement(info)
+
+    def queueSubtreeRefresh(self, node):
+        """Mark the subtree of the given node as changed, e.g. after an
+        element has been added or removed below the node. All changed
+        subtrees will be updated at once by refreshQueuedSubtrees."""
+        self.dirtyNodes[node] = True
+
+    def refreshQueuedSubtrees(self):
+        """Update the items of all changed nodes and their descendants. All
+        following items will only be shifted."""
+        dirtyNodes = list(self.dirtyNodes)
+        self.dirtyNodes = {}
+        if not dirtyNodes:
+            return
+
+        # item ranges of the changed subtrees, ordered by their position
+        ranges = []
+        for node in dirtyNodes:
+            index = self.itemIndex.get(node)
+            if index is None or node.isEmpty():
+                # not part of the tree, e.g. the root or a collapsed node,
+                # or removed since it changed
+                self.refreshStructureTree(self.elementDict, self.selectedElement)
+                return
+            level = self.treeItems[index][2]
+            end = index + 1
+            while end < len(self.treeItems) and self.treeItems[end][2] > level:
+                end += 1
+            ranges.append((index, end, node, level))
+        ranges.sort(key=lambda itemRange: itemRange[0])
+
+        # subtrees within another changed subtree will be updated with it
+        outerRanges = []
+        for itemRange in ranges:
+            if outerRanges and itemRange[0] < outerRanges[-1][1]:
+                continue
+            outerRanges.append(itemRange)
+
+        # replace the last ranges first so the positions of the others stay valid
+        for index, end, node, level in reversed(outerRanges):
+            for item in self.treeItems[index:end]:
+                del self.itemIndex[item[0]]
+            newItems = []
+            self.__fillStructureTree(node, level, newItems)
+            self.treeItems[index:end] = newItems
+        self.__updateItemIndex(outerRanges[0][0])
+
+        self.__updateCanvas()
+
+    def selectElement(self, elementInfo, args=None):
         if elementInfo is not None:
             base.messenger.send("selectElement", [elementInfo, args])
 
-    def __removeElement(self, elementInfo):
+    def removeElement(self, elementInfo):
         if elementInfo is not None:
             base.messenger.send("removeElement", [elementInfo.element])
 
-    def __toggleElementVisibility(self, toggle, elementInfo):
+    def toggleElementVisibility(self, toggle, elementInfo):
         if elementInfo is not None:
             base.messenger.send("toggleElementVisibility", [elementInfo.element])
 
-    def __moveElementInStructure(self, direction, elementInfo):
+    def moveElementInStructure(self, direction, elementInfo):
         if elementInfo is not None:
             base.messenger.send("moveElementInStructure", [direction, elementInfo])
 
-    def __collapseElement(self, collapse, elementInfo):
+    def collapseElement(self, collapse, elementInfo):
         if elementInfo is not None:
             if collapse:
                 self.collapsedElements.append(elementInfo)
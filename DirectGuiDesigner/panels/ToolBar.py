@@ -8,6 +8,7 @@ DGG.BELOW = "below"
 from direct.gui.DirectButton import DirectButton
 from direct.gui.DirectSlider import DirectSlider
 from direct.gui.DirectFrame import DirectFrame
+from direct.gui.DirectLabel import DirectLabel
 from direct.gui.DirectCheckBox import DirectCheckBox
 from DirectGuiExtension.DirectMenuItem import DirectMenuItem, DirectMenuItemEntry, DirectMenuItemSubMenu
 from DirectGuiExtension.DirectBoxSizer import DirectBoxSizer
@@ -144,6 +145,20 @@ class ToolBar(DirectObject):
         btn.bind(DGG.EXIT, self.tt.hide)
         self.toolBar.addItem(btn)
 
+        self.undoHistoryText = ""
+        self.lblUndoHistory = DirectLabel(
+            text="",
+            text_scale=12,
+            text_fg=(1,1,1,1),
+            text_pos=(0,-4),
+            frameSize=(-24,24,-24,24),
+            frameColor=(0,0,0,0),
+            state=DGG.NORMAL)
+        self.lblUndoHistory.bind(DGG.ENTER, self.showUndoHistoryTooltip)
+        self.lblUndoHistory.bind(DGG.EXIT, self.tt.hide)
+        self.toolBar.addItem(self.lblUndoHistory)
+        self.setUndoHistorySize(0, 0)
+
         placeholder = DirectFrame(
             text="|",
             frameSize=(-1,1,-24,24),
@@ -292,6 +307,7 @@ class ToolBar(DirectObject):
             self.toolBar.hide()
 
         self.accept("setVisualEditorParent", self.setVisualEditorParent)
+        self.accept("setUndoHistorySize", self.setUndoHistorySize)
         self.accept("DirectGuiDesigner_toggleGrid", self.setGrid)
         #self.accept("DirectGuiDesigner_toggleGrid", self.setVisualEditorParent)
 
@@ -321,6 +337,14 @@ class ToolBar(DirectObject):
         self.cb_scale.setImage()
 
 
+    def setUndoHistorySize(self, entryCount, memoryUsage):
+        if self.lblUndoHistory["text"] != str(entryCount):
+            self.lblUndoHistory["text"] = str(entryCount)
+        self.undoHistoryText = f"Undo history: {entryCount} steps, about {memoryUsage / (1024 * 1024):.1f} MB"
+
+    def showUndoHistoryTooltip(self, args):
+        self.tt.show(self.undoHistoryText)
+
     def setZoomMinMax(self, minVal, maxVal):
         self.zoomSlider["range"] = (minVal, maxVal)
 
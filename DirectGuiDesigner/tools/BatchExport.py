@@ -0,0 +1,393 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Export many projects to python scripts without opening the designer.
+
+Usage:
+    python -m DirectGuiDesigner.tools.BatchExport [-j JOBS] [-o OUTDIR] PATH...
+
+PATH can be project files or folders which will be searched for .gui and
+.guib files. The projects are distributed over a pool of worker processes.
+By default the scripts are generated straight from the project files. With
+--load-projects, each worker runs its own windowless ShowBase and loads the
+projects into the editor first, the same way the designer exports them.
+Projects which haven't changed since the last run will be skipped, which is
+tracked in a cache file.
+"""
+
+__author__ = "Fireclaw the Fox"
+__license__ = """
+Simplified BSD (BSD 2-Clause) License.
+See License.txt or http://opensource.org/licenses/BSD-2-Clause for more info
+"""
+
+import os
+import sys
+import json
+import hashlib
+import logging
+import argparse
+import multiprocessing
+
+from panda3d.core import loadPrcFile, loadPrcFileData, Filename
+
+from direct.showbase.DirectObject import DirectObject
+
+# bump this to invalidate all cached exports after changes to the exporter
+CACHE_VERSION = 1
+
+PROJECT_EXTENSIONS = (".gui", ".guib")
+
+# the exporter of the current process, created by initWorker
+exporter = None
+# error which occured while setting up the exporter of the current process
+exporterError = None
+
+
+class ProjectFileExporter:
+    """Generates the scripts straight from the project files without
+    creating any widgets"""
+
+    def __init__(self):
+        from DirectGuiDesigner.core.CustomWidgets import CustomWidgets
+        from DirectGuiDesigner.export.PyGenerator import PyGenerator
+
+        customWidgetsHandler = CustomWidgets(None, None)
+        customWidgetsHandler.loadCustomWidgets()
+        self.generator = PyGenerator(customWidgetsHandler)
+
+    def export(self, projectPath, scriptPath):
+        try:
+            with open(scriptPath, 'w') as outfile:
+                self.generator.writeFromFile(projectPath, outfile)
+        except Exception:
+            # don't leave a partially written script behind
+            if os.path.exists(scriptPath):
+                os.remove(scriptPath)
+            raise
+
+
+class HeadlessEditor(DirectObject):
+    """The parts of the designer needed to load and export projects. This
+    doesn't create any of the editors panels except the canvas the elements
+    get placed on."""
+
+    def __init__(self):
+        # import the designer modules after the ShowBase has been created
+        from direct.gui.DirectFrame import DirectFrame
+        from DirectGuiDesigner.panels.CanvasPanel import CanvasPanel
+        from DirectGuiDesigner.core.ElementHandler import ElementHandler
+        from DirectGuiDesigner.core.ElementInfo import ElementInfo
+        from DirectGuiDesigner.core.CustomWidgets import CustomWidgets
+        from DirectGuiDesigner.core.DefaultValueRegistry import DefaultValueRegistry
+        from DirectGuiDesigner.core.ElementRegistry import ElementRegistry
+        from DirectGuiDesigner.core import WidgetDefinition
+
+        DirectObject.__init__(self)
+
+        # stands in for the frame of the designer holding the canvas
+        self.editorParent = DirectFrame(
+            frameSize=(0, 1920, -1080, 0),
+            parent=base.pixel2d)
+        self.editorFrame = CanvasPanel(self.editorParent)
+        self.visualEditorInfo = ElementInfo(self.editorFrame.visualEditor, "Editor")
+
+        self.elementHandler = ElementHandler(None, self.editorFrame.getEditorRootCanvas)
+        self.editorFrame.setElementHandler(self.elementHandler)
+        self.customWidgetsHandler = CustomWidgets(None, self.elementHandler)
+        self.customWidgetsHandler.loadCustomWidgets()
+
+        self.allWidgetDefinitions = {
+            **WidgetDefinition.DEFINITIONS,
+            **self.customWidgetsHandler.getCustomWidgetDefinitions()}
+        DefaultValueRegistry.prewarm(
+            self.allWidgetDefinitions,
+            self.customWidgetsHandler.customWidgetsDict)
+
+        self.elementDict = ElementRegistry()
+        self.warnings = []
+
+        self.accept("setVisualEditorParent", self.editorFrame.setVisualEditorParent)
+        self.accept("setVisualEditorCanvasSize", self.editorFrame.setVisualEditorCanvasSize)
+        self.accept("showWarning", self.warnings.append)
+
+    def getEditorFrame(self):
+        return self.editorFrame.visualEditor
+
+    def export(self, projectPath, scriptPath):
+        """Load the project and export it as python script. Raises an
+        exception if the project couldn't be loaded without errors."""
+        from DirectGuiDesigner.loader.Project import ProjectLoader
+        from DirectGuiDesigner.export.ExporterPy import ExporterPy
+
+        self.warnings.clear()
+        try:
+            projectLoader = ProjectLoader(
+                projectPath,
+                self.visualEditorInfo,
+                self.elementHandler,
+                self.customWidgetsHandler,
+                self.editorFrame.getEditorPlacer,
+                self.allWidgetDefinitions,
+                directLoad=True)
+            self.elementDict = projectLoader.get()
+            if self.warnings:
+                raise RuntimeError(" ".join(self.warnings).replace("\n", " "))
+
+            ExporterPy(
+                scriptPath,
+                self.elementDict,
+                self.customWidgetsHandler,
+                self.getEditorFrame,
+                self.editorFrame.getEditorRootCanvas,
+                self.editorFrame.getAllEditorPlacers,
+                self.allWidgetDefinitions,
+                None,
+                not self.editorFrame.visEditorInAspect2D,
+                exportDirectly=True)
+        finally:
+            self.clear()
+
+    def clear(self):
+        """Remove all elements of the last loaded project"""
+        # remove children prior to their parents
+        for elementInfo in reversed(list(self.elementDict.values())):
+            if not elementInfo.element.isEmpty():
+                elementInfo.element.destroy()
+        self.elementDict.clear()
+
+
+def initWorker(configLines, loadProjects):
+    """Set up the exporter for this process. If projects should be loaded
+    before exporting them, this creates a windowless ShowBase and editor."""
+    global exporter, exporterError
+    from direct.showbase.ShowBase import ShowBase
+
+    loadPrcFileData("", "window-type none\naudio-library-name null")
+
+    # use the same configuration as the designer
+    home = os.path.expanduser("~")
+    configFile = os.path.join(home, ".DirectGuiDesigner", ".DirectGuiDesigner.prc")
+    if os.path.exists(configFile):
+        loadPrcFile(Filename.fromOsSpecific(configFile))
+    for line in configLines:
+        loadPrcFileData("", line)
+
+    try:
+        if loadProjects:
+            ShowBase()
+            exporter = HeadlessEditor()
+        else:
+            exporter = ProjectFileExporter()
+    except Exception as e:
+        # a failing pool initializer would be restarted endlessly, so report
+        # the error with each job instead
+        logging.exception(e)
+        exporterError = f"Couldn't set up the exporter: {e}"
+
+
+def exportProject(job):
+    """Export a single project, returns the project path and an error
+    message or None if the export succeeded"""
+    projectPath, scriptPath = job
+    if exporter is None:
+        return projectPath, exporterError
+    try:
+        directory = os.path.dirname(scriptPath)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        exporter.export(projectPath, scriptPath)
+    except Exception as e:
+        logging.exception(e)
+        return projectPath, str(e) or type(e).__name__
+    return projectPath, None
+
+
+class BatchExport:
+    """Decides which projects need to be exported and runs the exports"""
+
+    def __init__(self, cachePath, configLines, force=False, loadProjects=False):
+        self.cachePath = cachePath
+        self.configLines = configLines
+        self.force = force
+        self.loadProjects = loadProjects
+        self.cache = self.__loadCache()
+
+    def __getSettings(self):
+        # exports done with other settings can't be reused
+        return {
+            "version": CACHE_VERSION,
+            "config": self.configLines,
+            "loadProjects": self.loadProjects}
+
+    def __loadCache(self):
+        if self.force or not os.path.exists(self.cachePath):
+            return {}
+        try:
+            with open(self.cachePath, "r") as infile:
+                content = json.load(infile)
+        except (OSError, ValueError):
+            logging.warning(f"Couldn't read export cache {self.cachePath}")
+            return {}
+        if content.get("settings") != self.__getSettings():
+            logging.info("Export settings changed, exporting all projects")
+            return {}
+        return content.get("files", {})
+
+    def __saveCache(self):
+        directory = os.path.dirname(self.cachePath)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        with open(self.cachePath, "w") as outfile:
+            json.dump(
+                {"settings": self.__getSettings(), "files": self.cache},
+                outfile,
+                indent=2)
+
+    @staticmethod
+    def hashFile(path):
+        sha = hashlib.sha256()
+        with open(path, "rb") as infile:
+            for block in iter(lambda: infile.read(65536), b""):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def __needsExport(self, projectPath, scriptPath, stat):
+        """Returns whether the project needs to be exported and its hash if
+        it had to be calculated"""
+        entry = self.cache.get(projectPath)
+        if entry is None \
+        or entry["output"] != scriptPath \
+        or not os.path.exists(scriptPath):
+            return True, None
+        if entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return False, None
+        # the file has been touched, check if the content actually changed
+        fileHash = self.hashFile(projectPath)
+        return fileHash != entry["sha256"], fileHash
+
+    def run(self, jobs, numProcesses):
+        """Export all given (project, script) pairs which changed since the
+        last run. Returns the number of failed exports."""
+        pending = {}
+        for projectPath, scriptPath in jobs:
+            projectPath = os.path.abspath(projectPath)
+            scriptPath = os.path.abspath(scriptPath)
+            stat = os.stat(projectPath)
+            needsExport, fileHash = self.__needsExport(projectPath, scriptPath, stat)
+            if needsExport:
+                pending[projectPath] = (scriptPath, stat, fileHash)
+            elif fileHash is not None:
+                # unchanged content, remember the new modification time
+                self.cache[projectPath]["mtime"] = stat.st_mtime_ns
+
+        logging.info(f"{len(pending)} of {len(jobs)} projects need to be exported")
+        failed = 0
+        for projectPath, error in self.__export(pending, numProcesses):
+            scriptPath, stat, fileHash = pending[projectPath]
+            if error is not None:
+                logging.error(f"Failed to export {projectPath}: {error}")
+                self.cache.pop(projectPath, None)
+                failed += 1
+                continue
+            logging.info(f"Exported {projectPath} to {scriptPath}")
+            self.cache[projectPath] = {
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": fileHash if fileHash is not None else self.hashFile(projectPath),
+                "output": scriptPath}
+
+        self.__saveCache()
+        return failed
+
+    def __export(self, pending, numProcesses):
+        jobs = [(projectPath, value[0]) for projectPath, value in pending.items()]
+        numProcesses = min(numProcesses, len(jobs))
+        if numProcesses == 0:
+            return
+        if numProcesses == 1:
+            # not worth starting another process
+            if exporter is None and exporterError is None:
+                initWorker(self.configLines, self.loadProjects)
+            for job in jobs:
+                yield exportProject(job)
+            return
+
+        # spawn fresh processes, forked ones would share the ShowBase state
+        context = multiprocessing.get_context("spawn")
+        initArgs = (self.configLines, self.loadProjects)
+        with context.Pool(numProcesses, initWorker, initArgs) as pool:
+            yield from pool.imap_unordered(exportProject, jobs)
+
+
+def findProjects(paths, outputDir):
+    """Returns (project, script) path pairs for all given project files and
+    project files found in the given folders"""
+    jobs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for fileName in sorted(files):
+                    if not fileName.endswith(PROJECT_EXTENSIONS):
+                        continue
+                    projectPath = os.path.join(root, fileName)
+                    relativePath = os.path.relpath(projectPath, path)
+                    jobs.append((projectPath, getScriptPath(projectPath, relativePath, outputDir)))
+        elif os.path.isfile(path):
+            jobs.append((path, getScriptPath(path, os.path.basename(path), outputDir)))
+        else:
+            logging.warning(f"Skipping {path}, no such file or folder")
+    return jobs
+
+
+def getScriptPath(projectPath, relativePath, outputDir):
+    if outputDir is None:
+        return os.path.splitext(projectPath)[0] + ".py"
+    return os.path.join(outputDir, os.path.splitext(relativePath)[0] + ".py")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export DirectGuiDesigner projects as python scripts")
+    parser.add_argument(
+        "paths", nargs="+",
+        help="project files or folders containing project files")
+    parser.add_argument(
+        "-o", "--output-dir", default=None,
+        help="folder to write the scripts to, defaults to next to the projects")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1,
+        help="number of worker processes")
+    parser.add_argument(
+        "-c", "--config", action="append", default=[],
+        help="additional Panda3D configuration line, e.g. \"create-executable-scripts #t\"")
+    parser.add_argument(
+        "--cache", default=None,
+        help="path of the file keeping track of exported projects")
+    parser.add_argument(
+        "-l", "--load-projects", action="store_true",
+        help="load the projects into a windowless editor before exporting them")
+    parser.add_argument(
+        "-f", "--force", action="store_true",
+        help="export all projects, even if they haven't changed")
+    parser.add_argument(
+        "-v", "--verbose", action="store_true",
+        help="log details of the loading and exporting")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(levelname)s: %(message)s")
+
+    cachePath = args.cache
+    if cachePath is None:
+        cachePath = os.path.join(args.output_dir or os.getcwd(), ".dgd-export-cache.json")
+
+    jobs = findProjects(args.paths, args.output_dir)
+    batchExport = BatchExport(cachePath, args.config, args.force, args.load_projects)
+    failed = batchExport.run(jobs, max(1, args.jobs))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
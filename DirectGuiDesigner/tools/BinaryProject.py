@@ -0,0 +1,335 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+__author__ = "Fireclaw the Fox"
+__license__ = """
+Simplified BSD (BSD 2-Clause) License.
+See License.txt or http://opensource.org/licenses/BSD-2-Clause for more info
+"""
+
+import sys
+import json
+import struct
+import logging
+
+from DirectGuiDesigner.tools.LiteralDecoder import LiteralDecoder
+
+MAGIC = b"DGDB"
+FORMAT_VERSION = 1
+
+# value tags
+TAG_NONE = ord("N")
+TAG_TRUE = ord("T")
+TAG_FALSE = ord("F")
+TAG_INT = ord("I")
+TAG_FLOAT = ord("D")
+TAG_STRING = ord("S")
+TAG_LIST = ord("L")
+TAG_TUPLE = ord("U")
+TAG_DICT = ord("M")
+TAG_FLOAT_ARRAY = ord("A")
+TAG_VECTOR = ord("V")
+TAG_EXPRESSION = ord("X")
+TAG_RAW = ord("R")
+
+class ProjectExpression(str):
+    """A stored value which couldn't be saved as typed value and will be
+    evaluated when loading, the same way as values in .gui files."""
+    pass
+
+
+class RawProjectValue:
+    """A value which hasn't been stored as repr string in the .gui file
+    where one would be expected."""
+    def __init__(self, value):
+        self.value = value
+
+
+class BinaryProject:
+    """Reads and writes projects in a binary format. The project data is the
+    same as in .gui files, but values which are stored as python repr strings
+    in the .gui files will be stored typed. Vectors and colors are stored as
+    numeric arrays and all strings, including option names and component
+    prefixes, are stored once in a string table."""
+
+    fileExtension = ".guib"
+
+    @staticmethod
+    def isBinaryProject(path):
+        """Returns True if the file at the given path is a binary project"""
+        with open(path, "rb") as infile:
+            return infile.read(len(MAGIC)) == MAGIC
+
+    @staticmethod
+    def load(path):
+        """Load a binary project file. Values which are stored as repr
+        strings in .gui files will be returned as python values or as
+        ProjectExpression if they need to be evaluated."""
+        with open(path, "rb") as infile:
+            return BinaryProject.loads(infile.read())
+
+    @staticmethod
+    def loads(data):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a binary DirectGuiDesigner project")
+        version = data[len(MAGIC)]
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary project version {version}")
+        return BinaryReader(data, len(MAGIC) + 1).readProject()
+
+    @staticmethod
+    def dumps(jsonProject):
+        """Encode a project as written to .gui files to the binary format"""
+        writer = BinaryWriter()
+        writer.writeValue(BinaryProject.typedFromJSON(jsonProject))
+        return MAGIC + bytes([FORMAT_VERSION]) + writer.getData()
+
+    @staticmethod
+    def typedFromJSON(jsonProject):
+        """Returns a copy of the project with all repr string values decoded
+        to typed values. Values which can't be decoded losslessly will be kept
+        as ProjectExpression."""
+        decoder = LiteralDecoder()
+
+        def toTyped(valueString):
+            if not isinstance(valueString, str):
+                return RawProjectValue(valueString)
+            success, value = decoder.tryDecode(valueString)
+            if success and BinaryProject.isTypedValue(value) and repr(value) == valueString:
+                return value
+            return ProjectExpression(valueString)
+
+        return BinaryProject.__convertReprValues(jsonProject, toTyped)
+
+    @staticmethod
+    def jsonFromTyped(typedProject):
+        """Returns a copy of the project with all typed values converted back
+        to the repr strings as stored in .gui files."""
+        def toJSON(value):
+            if isinstance(value, ProjectExpression):
+                return str(value)
+            if isinstance(value, RawProjectValue):
+                return value.value
+            return repr(value)
+
+        return BinaryProject.__convertReprValues(typedProject, toJSON)
+
+    @staticmethod
+    def isTypedValue(value):
+        """Returns True if the value can be stored without an expression"""
+        if value is None or type(value) in (bool, int, float, str):
+            return True
+        if type(value) in (tuple, list):
+            return all(BinaryProject.isTypedValue(v) for v in value)
+        if type(value) is dict:
+            return all(type(k) is str and BinaryProject.isTypedValue(v) for k, v in value.items())
+        return LiteralDecoder.knownConstructors.get(type(value).__name__) is type(value)
+
+    @staticmethod
+    def __convertReprValues(project, convert):
+        """Copy the project and run convert on all values stored as repr
+        strings in .gui files"""
+        project = dict(project)
+        editorConfig = dict(project["EditorConfig"])
+        editorConfig["canvasSize"] = convert(editorConfig["canvasSize"])
+        project["EditorConfig"] = editorConfig
+
+        componentList = {}
+        for name, component in project["ComponentList"].items():
+            component = dict(component)
+            component["element"] = {
+                option: convert(value) for option, value in component["element"].items()}
+            if "transparency" in component:
+                component["transparency"] = convert(component["transparency"])
+            componentList[name] = component
+        project["ComponentList"] = componentList
+        return project
+
+    @staticmethod
+    def convertGuiToBinary(guiPath, binaryPath):
+        with open(guiPath, "r") as infile:
+            jsonProject = json.load(infile)
+        with open(binaryPath, "wb") as outfile:
+            outfile.write(BinaryProject.dumps(jsonProject))
+
+    @staticmethod
+    def convertBinaryToGui(binaryPath, guiPath):
+        jsonProject = BinaryProject.jsonFromTyped(BinaryProject.load(binaryPath))
+        with open(guiPath, "w") as outfile:
+            json.dump(jsonProject, outfile, indent=2)
+
+
+class BinaryWriter:
+    def __init__(self):
+        self.strings = {}
+        self.body = bytearray()
+
+    def getData(self):
+        """Returns the string table followed by the encoded values"""
+        table = bytearray()
+        self.__writeVarint(table, len(self.strings))
+        for string in self.strings.keys():
+            encoded = string.encode("utf-8")
+            self.__writeVarint(table, len(encoded))
+            table += encoded
+        return bytes(table + self.body)
+
+    def __writeVarint(self, out, number):
+        while True:
+            byte = number & 0x7F
+            number >>= 7
+            if number:
+                out.append(byte | 0x80)
+            else:
+                out.append(byte)
+                return
+
+    def __writeString(self, string):
+        index = self.strings.get(string)
+        if index is None:
+            index = len(self.strings)
+            self.strings[string] = index
+        self.__writeVarint(self.body, index)
+
+    def writeValue(self, value):
+        body = self.body
+        valueType = type(value)
+        if value is None:
+            body.append(TAG_NONE)
+        elif value is True:
+            body.append(TAG_TRUE)
+        elif value is False:
+            body.append(TAG_FALSE)
+        elif valueType is int:
+            body.append(TAG_INT)
+            # zigzag encoding to keep small negative numbers small
+            self.__writeVarint(body, (value << 1) if value >= 0 else ((-value << 1) - 1))
+        elif valueType is float:
+            body.append(TAG_FLOAT)
+            body += struct.pack("<d", value)
+        elif valueType is ProjectExpression:
+            body.append(TAG_EXPRESSION)
+            self.__writeString(str(value))
+        elif valueType is RawProjectValue:
+            body.append(TAG_RAW)
+            self.writeValue(value.value)
+        elif valueType is str:
+            body.append(TAG_STRING)
+            self.__writeString(value)
+        elif valueType is tuple and value and all(type(v) is float for v in value):
+            body.append(TAG_FLOAT_ARRAY)
+            self.__writeVarint(body, len(value))
+            body += struct.pack(f"<{len(value)}d", *value)
+        elif valueType in (list, tuple):
+            body.append(TAG_LIST if valueType is list else TAG_TUPLE)
+            self.__writeVarint(body, len(value))
+            for item in value:
+                self.writeValue(item)
+        elif valueType is dict:
+            body.append(TAG_DICT)
+            self.__writeVarint(body, len(value))
+            for key, item in value.items():
+                # split option names like text0_fg in the component prefix
+                # and the option name, so both can be shared
+                prefix, separator, name = key.rpartition("_")
+                self.__writeString(prefix + separator)
+                self.__writeString(name)
+                self.writeValue(item)
+        elif LiteralDecoder.knownConstructors.get(valueType.__name__) is valueType:
+            body.append(TAG_VECTOR)
+            self.__writeString(valueType.__name__)
+            numberFormat = "f" if valueType.__name__.endswith("f") else "d"
+            body.append(len(value))
+            body += struct.pack(f"<{len(value)}{numberFormat}", *value)
+        else:
+            raise TypeError(f"Can't write value of type {valueType.__name__} to binary project")
+
+
+class BinaryReader:
+    def __init__(self, data, offset):
+        self.data = data
+        self.offset = offset
+        self.strings = []
+
+    def readProject(self):
+        count = self.__readVarint()
+        data = self.data
+        for i in range(count):
+            length = self.__readVarint()
+            self.strings.append(data[self.offset:self.offset + length].decode("utf-8"))
+            self.offset += length
+        return self.readValue()
+
+    def __readVarint(self):
+        data = self.data
+        number = 0
+        shift = 0
+        while True:
+            byte = data[self.offset]
+            self.offset += 1
+            number |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return number
+            shift += 7
+
+    def __readString(self):
+        return self.strings[self.__readVarint()]
+
+    def readValue(self):
+        tag = self.data[self.offset]
+        self.offset += 1
+        if tag == TAG_STRING:
+            return self.__readString()
+        elif tag == TAG_INT:
+            number = self.__readVarint()
+            return (number >> 1) if not number & 1 else -((number + 1) >> 1)
+        elif tag == TAG_FLOAT:
+            value = struct.unpack_from("<d", self.data, self.offset)[0]
+            self.offset += 8
+            return value
+        elif tag == TAG_DICT:
+            result = {}
+            for i in range(self.__readVarint()):
+                key = self.__readString() + self.__readString()
+                result[key] = self.readValue()
+            return result
+        elif tag == TAG_FLOAT_ARRAY:
+            count = self.__readVarint()
+            value = struct.unpack_from(f"<{count}d", self.data, self.offset)
+            self.offset += 8 * count
+            return value
+        elif tag == TAG_VECTOR:
+            className = self.__readString()
+            count = self.data[self.offset]
+            self.offset += 1
+            numberFormat = "f" if className.endswith("f") else "d"
+            values = struct.unpack_from(f"<{count}{numberFormat}", self.data, self.offset)
+            self.offset += struct.calcsize(f"<{count}{numberFormat}")
+            return LiteralDecoder.knownConstructors[className](*values)
+        elif tag == TAG_LIST:
+            return [self.readValue() for i in range(self.__readVarint())]
+        elif tag == TAG_TUPLE:
+            return tuple(self.readValue() for i in range(self.__readVarint()))
+        elif tag == TAG_EXPRESSION:
+            return ProjectExpression(self.__readString())
+        elif tag == TAG_RAW:
+            return RawProjectValue(self.readValue())
+        elif tag == TAG_NONE:
+            return None
+        elif tag == TAG_TRUE:
+            return True
+        elif tag == TAG_FALSE:
+            return False
+        raise ValueError(f"Unknown value tag {chr(tag)} in binary project")
+
+
+if __name__ == "__main__":
+    # convert projects between the .gui and the binary format
+    if len(sys.argv) != 3:
+        print(f"usage: {sys.argv[0]} INFILE OUTFILE")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO)
+    inPath, outPath = sys.argv[1:]
+    if BinaryProject.isBinaryProject(inPath):
+        BinaryProject.convertBinaryToGui(inPath, outPath)
+    else:
+        BinaryProject.convertGuiToBinary(inPath, outPath)
@@ -12,6 +12,8 @@ from direct.gui import DirectGuiGlobals as DGG
 from panda3d.core import NodePath
 from DirectGuiDesigner.core.PropertyHelper import PropertyHelper
 from DirectGuiDesigner.core.ElementInfo import ElementInfo
+from DirectGuiDesigner.core.DefaultValueRegistry import DefaultValueRegistry
+from DirectGuiDesigner.core.ElementRegistry import ElementRegistry
 from DirectGuiDesigner.core.WidgetDefinition import PropertyEditTypes
 
 class JSONTools:
@@ -64,18 +66,39 @@ class JSONTools:
         jsonElements["EditorConfig"]["canvasSize"] = repr(getEditorFrame()["canvasSize"])
         jsonElements["ComponentList"] = {}
 
-        self.writtenRoots = []
-
         self.getEditorRootCanvas = getEditorRootCanvas
         self.getAllEditorPlacers = getAllEditorPlacers
 
+        # Build an index of all parents and their children in one pass, so we
+        # don't have to walk the whole element dict for every parent
+        self.childrenIndex = {}
+        for name, elementInfo in self.guiElementsDict.items():
+            self.childrenIndex.setdefault(elementInfo.parent, []).append(elementInfo)
+
+        self.writtenRoots = set()
+
+        # lookup for elements by their NodePath, used for e.g. radio buttons
+        if isinstance(self.guiElementsDict, ElementRegistry):
+            self.elementRegistry = self.guiElementsDict
+        else:
+            self.elementRegistry = ElementRegistry(self.guiElementsDict)
+
+        # count how many elements could be taken from the cache
+        self.reusedEntries = 0
+        self.encodedEntries = 0
+
         roots = [None] + getAllEditorPlacers()
 
         for root in roots:
             self.writeSortedContent(root, jsonElements)
-            for name, elementInfo in self.guiElementsDict.items():
-                if elementInfo.parent not in self.writtenRoots:
-                    self.writeSortedContent(elementInfo.parent, jsonElements)
+
+        # write the sub-trees of all parents that haven't been reached from
+        # one of the roots above
+        for parent in self.childrenIndex.keys():
+            self.writeSortedContent(parent, jsonElements)
+
+        logging.debug("Project serialized, reused {} cached and encoded {} elements".format(
+            self.reusedEntries, self.encodedEntries))
 
         return jsonElements
 
@@ -83,22 +106,30 @@ class JSONTools:
         """To have everything in the right order, we're going to go through all
         elements here and add them from top to bottom, first the parents, then
         respectively their children."""
-        for name, elementInfo in self.guiElementsDict.items():
-            if elementInfo.parent == root:
-                if root not in self.writtenRoots: self.writtenRoots.append(root)
-                try:
-                    jsonElements["ComponentList"][elementInfo.name] = self.__createJSONEntry(elementInfo)
-                except Exception as e:
-                    logging.exception("error while writing {}:".format(elementInfo.name))
-                    base.messenger.send("showWarning", ["error while writing {}:".format(elementInfo.name)])
-                self.writeSortedContent(elementInfo, jsonElements)
+        if root in self.writtenRoots: return
+        self.writtenRoots.add(root)
+
+        # depth first walk through the tree, parents will always be written
+        # before their children
+        stack = list(reversed(self.childrenIndex.get(root, [])))
+        while stack:
+            elementInfo = stack.pop()
+            try:
+                jsonElements["ComponentList"][elementInfo.name] = self.__createJSONEntry(elementInfo)
+            except Exception as e:
+                logging.exception("error while writing {}:".format(elementInfo.name))
+                base.messenger.send("showWarning", ["error while writing {}:".format(elementInfo.name)])
+
+            if elementInfo in self.writtenRoots: continue
+            self.writtenRoots.add(elementInfo)
+            # reversed, so the first child will be written first
+            stack.extend(reversed(self.childrenIndex.get(elementInfo, [])))
 
     def __createJSONEntry(self, elementInfo):
-        from DirectGuiDesigner.DirectGuiDesigner import DirectGuiDesigner
         addItemExtraArgs = []
         for arg in elementInfo.addItemExtraArgs:
             if isinstance(arg, NodePath):
-                name = DirectGuiDesigner.elementDict[arg.guiId].name
+                name = self.elementRegistry.getByNode(arg).name
                 addItemExtraArgs.append(name)
             else:
                 addItemExtraArgs.append(arg)
@@ -111,7 +142,8 @@ class JSONTools:
             "extraArgs": elementInfo.extraArgs,
             "extraOptions": elementInfo.extraOptions,
             "addItemExtraArgs": addItemExtraArgs,
-            "addItemNode": elementInfo.addItemNode
+            "addItemNode": elementInfo.addItemNode,
+            "lazy": elementInfo.lazy
         }
 
     def __writeParent(self, parent):
@@ -139,6 +171,33 @@ class JSONTools:
             self.__getAllSubcomponents(subcomponentName, component.component(subcomponentName), componentPath)
 
     def __writeElement(self, elementInfo):
+        if "element" in elementInfo.jsonCache:
+            self.reusedEntries += 1
+            elementJson = elementInfo.jsonCache["element"].copy()
+        else:
+            self.encodedEntries += 1
+            elementJson, hasError = self.__encodeElement(elementInfo)
+            if hasError:
+                base.messenger.send("showWarning", ["Saved Project with errors! See log for more information"])
+            else:
+                elementInfo.jsonCache["element"] = elementJson.copy()
+
+        # special options for specific elements
+        # these depend on other elements so they will never be cached
+        if elementInfo.type == "DirectRadioButton":
+            others = []
+            for otherElement in elementInfo.element["others"]:
+                otherInfo = self.elementRegistry.getByNode(otherElement)
+                if otherInfo is not None:
+                    others.append("{}".format(otherInfo.name))
+            elementJson["others"] = others
+
+        # transparency attribute
+        elementJson["transparency"] = repr(elementInfo.element.getTransparency())
+
+        return elementJson
+
+    def __encodeElement(self, elementInfo):
         element = elementInfo.element
         elementJson = {}
 
@@ -223,36 +282,17 @@ class JSONTools:
                                 hasChanged = False
                                 break
                     else:
-                        newWidget = type(element)()
-                        needCheck = True
                         n = name + wd.internalName
-                        skipCheck = False
                         if n in elementInfo.valueHasChanged \
                         and elementInfo.valueHasChanged[n]:
                             hasChanged = True
-                            skipCheck = True
-
-                        if not skipCheck:
-                            if wd.getFunctionName is not None:
-                                if type(wd.getFunctionName) == str:
-                                    try:
-                                        origWidgetValue = getattr(
-                                            newWidget,
-                                            wd.getFunctionName)()
-                                    except Exception:
-                                        # this may happen if something hasn't
-                                        # been set in the vanilla widget. E.g.
-                                        # the geom of an OnscreenGeom. So there
-                                        # must have been changes in the widget
-                                        needCheck = False
-                                else:
-                                    origWidgetValue = wd.getFunctionName()
-                            else:
-                                origWidgetValue = getattr(
-                                    newWidget,
-                                    wd.internalName)
-
-                            if needCheck and value == origWidgetValue:
+                        else:
+                            origWidgetValue = DefaultValueRegistry.getDefaultValue(
+                                type(element), wd, wdList)
+                            # if we couldn't get the default, there must have
+                            # been changes in the widget
+                            if origWidgetValue is not DefaultValueRegistry.NO_DEFAULT \
+                            and value == origWidgetValue:
                                 hasChanged = False
 
                     if hasChanged:
@@ -321,20 +361,4 @@ class JSONTools:
                     if not (isinstance(value, type) and reprFunc(value).startswith("<class")):
                         elementJson[name + option[DGG._OPT_DEFAULT]] = reprFunc(value)
 
-            # special options for specific elements
-            if elementInfo.type == "DirectRadioButton":
-                elementNameDict = {}
-                others = []
-                for key, value in self.guiElementsDict.items():
-                    elementNameDict[value.element] = value.name
-                for otherElement in elementInfo.element["others"]:
-                    if otherElement in elementNameDict:
-                        others.append("{}".format(elementNameDict[otherElement]))
-                elementJson["others"] = others
-
-        # transparency attribute
-        elementJson["transparency"] = reprFunc(elementInfo.element.getTransparency())
-
-        if hasError:
-            base.messenger.send("showWarning", ["Saved Project with errors! See log for more information"])
-        return elementJson
+        return elementJson, hasError
@@ -0,0 +1,209 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+__author__ = "Fireclaw the Fox"
+__license__ = """
+Simplified BSD (BSD 2-Clause) License.
+See License.txt or http://opensource.org/licenses/BSD-2-Clause for more info
+"""
+
+import re
+import ast
+import logging
+
+from panda3d.core import TextNode
+from panda3d.core import LVecBase2f, LVecBase3f, LVecBase4f, LPoint2f, LPoint3f, LPoint4f
+from panda3d.core import LVecBase2, LVecBase3, LVecBase4, LPoint2, LPoint3, LPoint4
+
+class LiteralDecoder:
+    """Decodes the value strings written by the JSONTools back into python
+    values. Simple values like numbers, strings, tuples, lists, the Panda3D
+    vector types and the TextNode constants are decoded without eval. Every
+    distinct string is only parsed once, all other values will be passed
+    to eval."""
+
+    # classes which may be called with literal arguments
+    knownConstructors = {
+        "LVecBase2f": LVecBase2f,
+        "LVecBase3f": LVecBase3f,
+        "LVecBase4f": LVecBase4f,
+        "LPoint2f": LPoint2f,
+        "LPoint3f": LPoint3f,
+        "LPoint4f": LPoint4f,
+        "LVecBase2": LVecBase2,
+        "LVecBase3": LVecBase3,
+        "LVecBase4": LVecBase4,
+        "LPoint2": LPoint2,
+        "LPoint3": LPoint3,
+        "LPoint4": LPoint4}
+
+    # names of which attributes may be read, e.g. TextNode.A_center
+    knownNames = {
+        "TextNode": TextNode}
+
+    # numbers, tuples of numbers and known constructors called with numbers
+    # make up most values, these can be decoded without parsing the string
+    simpleCallPattern = re.compile(r"^(\w*)\(([-+0-9.e, ]*)\)$")
+
+    class UnknownForm(Exception):
+        pass
+
+    def __init__(self, evalGlobals=None):
+        # the globals eval will have access to if the fast path can't be used
+        self.evalGlobals = evalGlobals if evalGlobals is not None else {}
+
+        # value string: function creating the value
+        self.factories = {}
+
+        self.decodedCount = 0
+        self.evalCount = 0
+
+    def decode(self, valueString):
+        """Returns the python value of the given value string. Each call will
+        return a new object, so mutable values can safely be changed."""
+        factory = self.factories.get(valueString)
+        if factory is None:
+            factory = self.__createFactory(valueString)
+            self.factories[valueString] = factory
+        return factory()
+
+    def tryDecode(self, valueString):
+        """Decode the given value string without using eval. Returns a
+        tuple of a bool telling if the value could be decoded and the value
+        itself."""
+        factory = self.factories.get(valueString)
+        if factory is None:
+            factory = self.__createLiteralFactory(valueString)
+            if factory is None:
+                return False, None
+            self.factories[valueString] = factory
+        elif getattr(factory, "usesEval", False):
+            return False, None
+        return True, factory()
+
+    def __createLiteralFactory(self, valueString):
+        """Returns a function creating the value of the given string or None
+        if the string can't be decoded without eval"""
+        factory = self.__createSimpleFactory(valueString)
+        if factory is not None:
+            self.decodedCount += 1
+            return factory
+        try:
+            tree = ast.parse(valueString.strip(), mode="eval")
+            factory = self.__createNodeFactory(tree.body)[0]
+            self.decodedCount += 1
+            return factory
+        except (SyntaxError, AttributeError, LiteralDecoder.UnknownForm):
+            return None
+
+    def __createSimpleFactory(self, valueString):
+        """Decode simple values without the AST, returns None if the value
+        isn't one of the simple forms"""
+        try:
+            value = self.__toNumber(valueString)
+            return lambda: value
+        except ValueError:
+            pass
+
+        match = self.simpleCallPattern.match(valueString)
+        if match is None:
+            return None
+        name, args = match.groups()
+        if name != "" and name not in self.knownConstructors:
+            return None
+        args = args.split(",")
+        if args[-1].strip() == "":
+            if name == "" and len(args) == 1:
+                # this would be a grouping like "()" rather than a tuple
+                return None
+            args = args[:-1]
+        try:
+            values = tuple(self.__toNumber(arg) for arg in args)
+        except ValueError:
+            return None
+        if name == "":
+            if len(values) == 1 and not valueString.rstrip(")").rstrip().endswith(","):
+                # "(1)" is just a number in brackets
+                value = values[0]
+                return lambda: value
+            return lambda: values
+        constructor = self.knownConstructors[name]
+        return lambda: constructor(*values)
+
+    def __toNumber(self, text):
+        text = text.strip()
+        if text.isdigit() or (text[:1] in "-+" and text[1:].isdigit()):
+            return int(text)
+        if "_" in text or not any(c.isdigit() for c in text):
+            raise ValueError(text)
+        return float(text)
+
+    def __createFactory(self, valueString):
+        factory = self.__createLiteralFactory(valueString)
+        if factory is not None:
+            return factory
+
+        logging.debug(f"Use eval to decode value {valueString}")
+        self.evalCount += 1
+        code = compile(valueString, "<value>", "eval")
+        evalGlobals = self.evalGlobals
+        def evalFactory():
+            return eval(code, evalGlobals)
+        evalFactory.usesEval = True
+        return evalFactory
+
+    def __createNodeFactory(self, node):
+        """Returns a function creating the value of the given AST node and
+        whether the value is immutable and can be shared."""
+        if isinstance(node, ast.Constant):
+            value = node.value
+            return (lambda: value), True
+
+        if isinstance(node, ast.UnaryOp) \
+        and isinstance(node.op, (ast.USub, ast.UAdd)) \
+        and isinstance(node.operand, ast.Constant) \
+        and type(node.operand.value) in (int, float, complex):
+            value = node.operand.value
+            if isinstance(node.op, ast.USub):
+                value = -value
+            return (lambda: value), True
+
+        if isinstance(node, (ast.Tuple, ast.List)):
+            itemFactories = []
+            allConstant = True
+            for item in node.elts:
+                itemFactory, isConstant = self.__createNodeFactory(item)
+                itemFactories.append(itemFactory)
+                allConstant = allConstant and isConstant
+            if isinstance(node, ast.Tuple):
+                if allConstant:
+                    value = tuple(itemFactory() for itemFactory in itemFactories)
+                    return (lambda: value), True
+                return (lambda: tuple(itemFactory() for itemFactory in itemFactories)), False
+            return (lambda: [itemFactory() for itemFactory in itemFactories]), False
+
+        if isinstance(node, ast.Dict):
+            if None in node.keys:
+                raise LiteralDecoder.UnknownForm()
+            keyFactories = [self.__createNodeFactory(key)[0] for key in node.keys]
+            valueFactories = [self.__createNodeFactory(value)[0] for value in node.values]
+            return (lambda: {
+                keyFactory(): valueFactory()
+                for keyFactory, valueFactory in zip(keyFactories, valueFactories)}), False
+
+        if isinstance(node, ast.Attribute) \
+        and isinstance(node.value, ast.Name) \
+        and node.value.id in self.knownNames:
+            value = getattr(self.knownNames[node.value.id], node.attr)
+            if not isinstance(value, (int, float, str)):
+                raise LiteralDecoder.UnknownForm()
+            return (lambda: value), True
+
+        if isinstance(node, ast.Call) \
+        and isinstance(node.func, ast.Name) \
+        and node.func.id in self.knownConstructors \
+        and not node.keywords:
+            constructor = self.knownConstructors[node.func.id]
+            argFactories = [self.__createNodeFactory(arg)[0] for arg in node.args]
+            return (lambda: constructor(*[argFactory() for argFactory in argFactories])), False
+
+        raise LiteralDecoder.UnknownForm()
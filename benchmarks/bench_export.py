@@ -0,0 +1,35 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Times exporting project files to python scripts in both export styles,
+the way the batch export does it without loading the projects."""
+import os
+import tempfile
+
+import common
+
+
+def main():
+    args = common.parseArguments(__doc__, [1000, 10000], repeat=3)
+    from DirectGuiDesigner.export.PyGenerator import PyGenerator
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmpDir:
+        for count in args.sizes:
+            path = os.path.join(tmpDir, f"project{count}.gui")
+            common.writeProject(common.createProject(count), path)
+            scriptPath = os.path.join(tmpDir, f"project{count}.py")
+            times = [count]
+            for exportStyle in ("classic", "table"):
+                generator = PyGenerator(None, exportStyle)
+
+                def export():
+                    with open(scriptPath, "w") as outfile:
+                        generator.writeFromFile(path, outfile)
+
+                times.append(common.measure(export, args.repeat))
+            rows.append(times)
+    common.printResults("Python export", ["classic", "table"], rows)
+
+
+if __name__ == "__main__":
+    main()
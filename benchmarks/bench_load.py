@@ -0,0 +1,33 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Times loading projects with the elements stored parents first, as the
+designer saves them, and in random order, as in hand merged files. Both
+should take about the same time per element."""
+import os
+import tempfile
+
+import common
+
+
+def main():
+    args = common.parseArguments(__doc__, [1000, 10000])
+
+    editor = common.createEditor()
+    rows = []
+    with tempfile.TemporaryDirectory() as tmpDir:
+        for count in args.sizes:
+            times = [count]
+            for shuffle in (False, True):
+                path = os.path.join(tmpDir, f"project{count}.gui")
+                common.writeProject(common.createProject(count, shuffle), path)
+                times.append(common.measure(
+                    lambda: common.loadProject(editor, path),
+                    args.repeat,
+                    editor.clear))
+                editor.clear()
+            rows.append(times)
+    common.printResults("Project loading", ["ordered", "shuffled"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Times serializing projects of different sizes the way the designer does
+when saving them. The time per element should stay about the same for all
+sizes."""
+import os
+import tempfile
+
+import common
+
+
+def main():
+    args = common.parseArguments(__doc__, [100, 1000, 10000], repeat=3)
+    from DirectGuiDesigner.tools.JSONTools import JSONTools
+
+    editor = common.createEditor()
+    rows = []
+    with tempfile.TemporaryDirectory() as tmpDir:
+        for count in args.sizes:
+            path = os.path.join(tmpDir, f"project{count}.gui")
+            common.writeProject(common.createProject(count), path)
+            elementDict = common.loadProject(editor, path)
+
+            def invalidateCaches():
+                for elementInfo in elementDict.values():
+                    elementInfo.invalidateJSONCache()
+
+            def save():
+                JSONTools().getProjectJSON(
+                    elementDict,
+                    editor.getEditorFrame,
+                    editor.editorFrame.getEditorRootCanvas,
+                    editor.editorFrame.getAllEditorPlacers,
+                    editor.allWidgetDefinitions,
+                    not editor.editorFrame.visEditorInAspect2D)
+
+            rows.append((
+                count,
+                common.measure(save, args.repeat, invalidateCaches),
+                common.measure(save, args.repeat)))
+            editor.clear()
+    common.printResults("Project serialization", ["save", "cached save"], rows)
+
+
+if __name__ == "__main__":
+    main()
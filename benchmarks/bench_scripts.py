@@ -0,0 +1,56 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""Compares the scripts of both export styles at game startup. Times
+importing the generated module, which includes compiling it as no byte code
+will be cached, and creating the GUI."""
+import os
+import sys
+import tempfile
+import importlib.util
+
+import common
+
+
+def importScript(path, moduleName):
+    spec = importlib.util.spec_from_file_location(moduleName, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    args = common.parseArguments(__doc__, [1000, 10000], repeat=3)
+    from DirectGuiDesigner.export.PyGenerator import PyGenerator
+
+    sys.dont_write_bytecode = True
+    common.createShowBase()
+    rows = []
+    with tempfile.TemporaryDirectory() as tmpDir:
+        for count in args.sizes:
+            jsonProject = common.createProject(count)
+            times = [count]
+            for exportStyle in ("classic", "table"):
+                moduleName = f"{exportStyle}{count}"
+                scriptPath = os.path.join(tmpDir, f"{moduleName}.py")
+                with open(scriptPath, "w") as outfile:
+                    PyGenerator(None, exportStyle).write(jsonProject, outfile, False)
+
+                modules = []
+                guis = []
+                times.append(common.measure(
+                    lambda: modules.append(importScript(scriptPath, moduleName)),
+                    args.repeat))
+                times.append(common.measure(
+                    lambda: guis.append(modules[-1].GUI()),
+                    args.repeat,
+                    lambda: guis and guis.pop().destroy()))
+                guis.pop().destroy()
+            rows.append(times)
+    common.printResults(
+        "Generated scripts",
+        ["classic import", "classic create", "table import", "table create"],
+        rows)
+
+
+if __name__ == "__main__":
+    main()
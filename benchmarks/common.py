@@ -0,0 +1,164 @@
+"""Shared parts of the benchmarks. These create synthetic projects of any
+size, set up the headless editor used by the batch export and time the
+steps the benchmarks compare. Each benchmark is a script, for example
+    python benchmarks/bench_save.py --sizes 100 1000"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+from panda3d.core import loadPrcFileData
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+loadPrcFileData("", "window-type none\naudio-library-name null")
+
+# options of the elements of the synthetic projects by element type
+ELEMENT_TEMPLATES = {
+    "DirectFrame": {
+        "element": {
+            "frameSize": "(-1, 1, -1, 1)",
+            "frameColor": "(1, 1, 1, 1)",
+            "pos": "LPoint3f(0, 0, 0)",
+            "transparency": "0"},
+        "extraOptions": {}},
+    "DirectButton": {
+        "element": {
+            "pos": "LPoint3f(0, 0, 0)",
+            "scale": "LVecBase3f(0.1, 0.1, 0.1)",
+            "transparency": "0",
+            "text": "'button'"},
+        "extraOptions": {"pressEffect": 1}},
+    "DirectLabel": {
+        "element": {
+            "pos": "LPoint3f(0, 0, 0)",
+            "scale": "LVecBase3f(0.1, 0.1, 0.1)",
+            "transparency": "1",
+            "text": "'label'"},
+        "extraOptions": {}},
+}
+
+
+def createProject(count, shuffle=False, seed=1):
+    """Returns the JSON data of a project with the given number of elements.
+    Every tenth element is a frame, the others are buttons and labels placed
+    in the last frame. Frames are nested in groups of three. If shuffle is
+    set, the elements will be stored in random order instead of parents
+    first."""
+    componentList = {}
+    parentFrame = "root"
+    frame = "root"
+    for i in range(count):
+        if i % 10 == 0:
+            elementType = "DirectFrame"
+            parent = "root" if i % 30 == 0 else parentFrame
+            name = f"frame{i}"
+            if parent == "root":
+                parentFrame = name
+            frame = name
+        else:
+            elementType = "DirectButton" if i % 2 else "DirectLabel"
+            parent = frame
+            name = f"{elementType[6:].lower()}{i}"
+        template = ELEMENT_TEMPLATES[elementType]
+        element = dict(template["element"])
+        # every element has its own place like in real projects
+        element["pos"] = f"LPoint3f({i % 100 * 0.01}, 0, {i // 100 * -0.01})"
+        componentList[name] = {
+            "element": element,
+            "type": elementType,
+            "parent": parent,
+            "command": None,
+            "extraArgs": None,
+            "extraOptions": dict(template["extraOptions"]),
+            "addItemExtraArgs": [],
+            "addItemNode": None}
+    if shuffle:
+        items = list(componentList.items())
+        random.Random(seed).shuffle(items)
+        componentList = dict(items)
+    return {
+        "ProjectVersion": "0.2a",
+        "EditorConfig": {
+            "usePixel2D": False,
+            "canvasSize": "(-960.0, 960.0, -540.0, 540.0)"},
+        "ComponentList": componentList}
+
+
+def writeProject(jsonProject, path):
+    with open(path, "w") as outfile:
+        json.dump(jsonProject, outfile, indent=2)
+
+
+def createShowBase():
+    """Creates the windowless ShowBase needed to create any widgets"""
+    from direct.showbase.ShowBase import ShowBase
+    return ShowBase()
+
+
+def createEditor():
+    """Returns the headless editor of the batch export, creating the
+    ShowBase it needs first."""
+    createShowBase()
+    from DirectGuiDesigner.tools.BatchExport import HeadlessEditor
+    return HeadlessEditor()
+
+
+def loadProject(editor, path):
+    """Loads the project into the editor and returns its elements"""
+    from DirectGuiDesigner.loader.Project import ProjectLoader
+    projectLoader = ProjectLoader(
+        path,
+        editor.visualEditorInfo,
+        editor.elementHandler,
+        editor.customWidgetsHandler,
+        editor.editorFrame.getEditorPlacer,
+        editor.allWidgetDefinitions,
+        directLoad=True)
+    editor.elementDict = projectLoader.get()
+    return editor.elementDict
+
+
+def measure(func, repeat=1, setup=None):
+    """Returns the fastest time in seconds of repeat calls of func. The
+    optional setup function is called before each call and isn't timed."""
+    best = None
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        duration = time.perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+    return best
+
+
+def parseArguments(description, sizes, repeat=1):
+    """Parses the command line options all benchmarks share"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "-s", "--sizes", type=int, nargs="+", default=sizes,
+        help="Numbers of elements of the projects to test")
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=repeat,
+        help="Times each step is run, the fastest run will be reported")
+    return parser.parse_args()
+
+
+def printResults(title, columns, rows):
+    """Prints a table of the results. Every row starts with the number of
+    elements followed by the times of the columns in seconds, each with its
+    time per element as the scaling should be linear."""
+    print(title)
+    header = f"{'elements':>10}"
+    for column in columns:
+        header += f" {column + ' (s)':>18} {'us/element':>11}"
+    print(header)
+    for count, *times in rows:
+        line = f"{count:>10}"
+        for duration in times:
+            line += f" {duration:>18.4f} {duration / count * 1e6:>11.1f}"
+        print(line)
@@ -0,0 +1,23 @@
+"""Fixtures shared by all tests. The tests run with a windowless ShowBase
+and the headless editor used by the batch export."""
+import os
+import sys
+
+import pytest
+from panda3d.core import loadPrcFileData
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+loadPrcFileData("", "window-type none\naudio-library-name null")
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+@pytest.fixture(scope="session")
+def headlessEditor():
+    from direct.showbase.ShowBase import ShowBase
+    from DirectGuiDesigner.tools.BatchExport import HeadlessEditor
+    ShowBase()
+    editor = HeadlessEditor()
+    yield editor
+    editor.clear()
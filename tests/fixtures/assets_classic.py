@@ -0,0 +1,153 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# This file was created using the DirectGUI Designer
+
+from direct.gui import DirectGuiGlobals as DGG
+
+from direct.gui.DirectFrame import DirectFrame
+from direct.gui.DirectButton import DirectButton
+from panda3d.core import (
+    LPoint3f,
+    LVecBase3f,
+    LVecBase4f,
+    TextNode
+)
+import logging
+
+
+# Paths of all assets used by the elements by the kind of asset. Use
+# preloadAssets to load them in the background before creating the GUI.
+ASSETS = {
+    'texture': ('models/maps/circle.png',),
+    'model': ('models/box',),
+    'sfx': ('audio/sfx/GUI_click.wav',),
+    'font': ('models/cmss12',),
+}
+
+# (kind, path): loaded asset, shared by all elements using the asset
+loadedAssets = {}
+
+
+def getAsset(kind, path):
+    """Returns the asset with the given kind and path. Assets which haven't
+    been preloaded will be loaded now."""
+    asset = loadedAssets.get((kind, path))
+    if asset is None:
+        if kind == "font":
+            asset = loader.loadFont(path)
+        elif kind == "texture":
+            asset = loader.loadTexture(path)
+        elif kind == "sfx":
+            asset = loader.loadSfx(path)
+        else:
+            asset = loader.loadModel(path)
+        loadedAssets[(kind, path)] = asset
+    return asset
+
+
+def preloadAssets(callback=None):
+    """Load all assets of the GUI in the background. The callback will be
+    called once everything has been loaded, after which the GUI can be
+    created without loading anything from disk."""
+    pending = ["model", "sfx", "pool"]
+
+    def finished(assets, kind, paths):
+        for path, asset in zip(paths, assets):
+            loadedAssets.setdefault((kind, path), asset)
+        pending.remove(kind)
+        if not pending and callback is not None:
+            callback()
+
+    for kind, load in (("model", loader.loadModel), ("sfx", loader.loadSfx)):
+        paths = [path for path in ASSETS.get(kind, ()) if (kind, path) not in loadedAssets]
+        if paths:
+            load(paths, callback=finished, extraArgs=[kind, paths])
+        else:
+            finished([], kind, [])
+
+    # fonts and textures can't be loaded by the asynchronous loader, so
+    # load them on a thread of their own
+    def loadFromPools(task):
+        try:
+            for kind in ("font", "texture"):
+                for path in ASSETS.get(kind, ()):
+                    try:
+                        getAsset(kind, path)
+                    except Exception:
+                        # the asset will be loaded again when it's used
+                        logging.exception(f"Couldn't preload {kind} {path}")
+        finally:
+            # always report back, so the callback won't wait forever
+            taskMgr.add(reportPoolsLoaded, "guiAssetsPreloaded")
+        return task.done
+
+    def reportPoolsLoaded(task):
+        finished([], "pool", [])
+        return task.done
+
+    if ASSETS.get("font") or ASSETS.get("texture"):
+        if not taskMgr.hasTaskChain("guiAssetLoader"):
+            taskMgr.setupTaskChain("guiAssetLoader", numThreads=1)
+        taskMgr.add(loadFromPools, "preloadGuiAssets", taskChain="guiAssetLoader")
+    else:
+        finished([], "pool", [])
+
+
+class GUI:
+    def __init__(self, rootParent=None):
+        
+        self.f1 = DirectFrame(
+            frameSize = (-1, 1, -1, 1),
+            frameColor = (1, 1, 1, 1),
+            pos = LPoint3f(0, 0, 0),
+            parent=rootParent,
+            image=getAsset('texture', 'models/maps/circle.png'),
+            geom=getAsset('model', 'models/box'),
+        )
+        self.f1.setTransparency(0)
+
+        self.b2 = DirectButton(
+            pos = LPoint3f(0, 0, 0),
+            scale = LVecBase3f(0.1, 0.1, 0.1),
+            text = 'button',
+            parent=self.f1,
+            clickSound=getAsset('sfx', 'audio/sfx/GUI_click.wav'),
+        )
+        self.b2.setTransparency(0)
+
+        self.f2 = DirectFrame(
+            frameSize = (-1, 1, -1, 1),
+            frameColor = (1, 1, 1, 1),
+            pos = LPoint3f(0, 0, 0),
+            parent=rootParent,
+            image=getAsset('texture', 'models/maps/circle.png'),
+        )
+        self.f2.setTransparency(0)
+
+        self.b1 = DirectButton(
+            pos = LPoint3f(0, 0, 0),
+            scale = LVecBase3f(0.1, 0.1, 0.1),
+            text = 'button',
+            parent=rootParent,
+            clickSound=getAsset('sfx', 'audio/sfx/GUI_click.wav'),
+            rolloverSound=getAsset('sfx', 'audio/sfx/GUI_click.wav'),
+            text0_font=getAsset('font', 'models/cmss12'),
+        )
+        self.b1.setTransparency(0)
+
+
+    def show(self):
+        self.f1.show()
+        self.f2.show()
+        self.b1.show()
+
+    def hide(self):
+        self.f1.hide()
+        self.f2.hide()
+        self.b1.hide()
+
+    def destroy(self):
+        self.f1.destroy()
+        self.f2.destroy()
+        self.b1.destroy()
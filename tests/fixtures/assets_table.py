@@ -0,0 +1,223 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# This file was created using the DirectGUI Designer
+
+from direct.gui import DirectGuiGlobals as DGG
+
+from direct.gui.DirectFrame import DirectFrame
+from direct.gui.DirectButton import DirectButton
+from panda3d.core import (
+    LPoint3f,
+    LVecBase3f,
+    LVecBase4f,
+    TextNode
+)
+import logging
+
+
+# Paths of all assets used by the elements by the kind of asset. Use
+# preloadAssets to load them in the background before creating the GUI.
+ASSETS = {
+    'texture': ('models/maps/circle.png',),
+    'model': ('models/box',),
+    'sfx': ('audio/sfx/GUI_click.wav',),
+    'font': ('models/cmss12',),
+}
+
+# (kind, path): loaded asset, shared by all elements using the asset
+loadedAssets = {}
+
+
+def getAsset(kind, path):
+    """Returns the asset with the given kind and path. Assets which haven't
+    been preloaded will be loaded now."""
+    asset = loadedAssets.get((kind, path))
+    if asset is None:
+        if kind == "font":
+            asset = loader.loadFont(path)
+        elif kind == "texture":
+            asset = loader.loadTexture(path)
+        elif kind == "sfx":
+            asset = loader.loadSfx(path)
+        else:
+            asset = loader.loadModel(path)
+        loadedAssets[(kind, path)] = asset
+    return asset
+
+
+def preloadAssets(callback=None):
+    """Load all assets of the GUI in the background. The callback will be
+    called once everything has been loaded, after which the GUI can be
+    created without loading anything from disk."""
+    pending = ["model", "sfx", "pool"]
+
+    def finished(assets, kind, paths):
+        for path, asset in zip(paths, assets):
+            loadedAssets.setdefault((kind, path), asset)
+        pending.remove(kind)
+        if not pending and callback is not None:
+            callback()
+
+    for kind, load in (("model", loader.loadModel), ("sfx", loader.loadSfx)):
+        paths = [path for path in ASSETS.get(kind, ()) if (kind, path) not in loadedAssets]
+        if paths:
+            load(paths, callback=finished, extraArgs=[kind, paths])
+        else:
+            finished([], kind, [])
+
+    # fonts and textures can't be loaded by the asynchronous loader, so
+    # load them on a thread of their own
+    def loadFromPools(task):
+        try:
+            for kind in ("font", "texture"):
+                for path in ASSETS.get(kind, ()):
+                    try:
+                        getAsset(kind, path)
+                    except Exception:
+                        # the asset will be loaded again when it's used
+                        logging.exception(f"Couldn't preload {kind} {path}")
+        finally:
+            # always report back, so the callback won't wait forever
+            taskMgr.add(reportPoolsLoaded, "guiAssetsPreloaded")
+        return task.done
+
+    def reportPoolsLoaded(task):
+        finished([], "pool", [])
+        return task.done
+
+    if ASSETS.get("font") or ASSETS.get("texture"):
+        if not taskMgr.hasTaskChain("guiAssetLoader"):
+            taskMgr.setupTaskChain("guiAssetLoader", numThreads=1)
+        taskMgr.add(loadFromPools, "preloadGuiAssets", taskChain="guiAssetLoader")
+    else:
+        finished([], "pool", [])
+
+import json
+
+
+# Name, widget class name, parent, options, options which need to be
+# created for each element, transparency and the lazily created element
+# each element will be created with. The parent is given as list of the kind of parent
+# and the names needed to find it. The options are indices into OPTION_SETS
+# and CREATE_OPTIONS.
+ELEMENTS = json.loads(r"""[
+["f1", "DirectFrame", ["root"], 0, 0, 0, null],
+["b2", "DirectButton", ["element", "f1"], 1, 1, 0, null],
+["f2", "DirectFrame", ["root"], 0, 2, 0, null],
+["b1", "DirectButton", ["root"], 1, 3, 0, null]
+]""")
+
+# Options with literal values, where lists stand for tuples, and options
+# with values of VALUE_TYPES, given as the name of the type and the
+# arguments to create the value with
+OPTION_SETS = json.loads(r"""[
+[{"frameSize": [-1, 1, -1, 1], "frameColor": [1, 1, 1, 1]}, {"pos": ["LPoint3f", [0, 0, 0]]}],
+[{"text": "button"}, {"pos": ["LPoint3f", [0, 0, 0]], "scale": ["LVecBase3f", [0.1, 0.1, 0.1]]}]
+]""")
+
+VALUE_TYPES = {
+    'LPoint3f': LPoint3f,
+    'LVecBase3f': LVecBase3f,
+}
+
+# Source code of the options which have to be created for each element
+# when it's created, like mutable values, assets and commands. Each will be
+# compiled when it's needed the first time.
+CREATE_OPTIONS = (
+    "{'image': getAsset('texture', 'models/maps/circle.png'), 'geom': getAsset('model', 'models/box')}",
+    "{'clickSound': getAsset('sfx', 'audio/sfx/GUI_click.wav')}",
+    "{'image': getAsset('texture', 'models/maps/circle.png')}",
+    "{'clickSound': getAsset('sfx', 'audio/sfx/GUI_click.wav'), 'rolloverSound': getAsset('sfx', 'audio/sfx/GUI_click.wav'), 'text0_font': getAsset('font', 'models/cmss12')}",
+)
+
+# index in CREATE_OPTIONS: compiled code
+createOptionsCode = {}
+
+
+def toTuple(value):
+    """Returns the value read from JSON with all lists turned to tuples"""
+    if isinstance(value, list):
+        return tuple(toTuple(item) for item in value)
+    return value
+
+
+WIDGET_CLASSES = {
+    'DirectFrame': DirectFrame,
+    'DirectButton': DirectButton,
+}
+
+TOP_LEVEL_ELEMENTS = ('f1', 'f2', 'b1',)
+
+# Elements which will only be created when they are shown the first time,
+# with all elements which will be created and released together with them
+LAZY_SUBTREES = {}
+
+
+class GUI:
+    def __init__(self, rootParent=None):
+        self.rootParent = rootParent
+        for names in LAZY_SUBTREES.values():
+            for name in names:
+                setattr(self, name, None)
+        self.createElements(None)
+
+    def createElements(self, lazyRoot):
+        for name, widgetType, parent, options, createOptions, transparency, elementLazyRoot in ELEMENTS:
+            if elementLazyRoot != lazyRoot:
+                continue
+            options = self.getOptions(options)
+            if createOptions is not None:
+                options = {**options, **self.getCreateOptions(createOptions)}
+            widgetClass = WIDGET_CLASSES[widgetType]
+            if parent is None:
+                element = widgetClass(**options)
+            else:
+                element = widgetClass(parent=self.getParent(parent), **options)
+            if transparency is not None:
+                element.setTransparency(transparency)
+            setattr(self, name, element)
+
+    def getOptions(self, index):
+        literalOptions, valueOptions = OPTION_SETS[index]
+        options = {key: toTuple(value) for key, value in literalOptions.items()}
+        for key, (valueType, args) in valueOptions.items():
+            options[key] = VALUE_TYPES[valueType](*args)
+        return options
+
+    def getCreateOptions(self, index):
+        code = createOptionsCode.get(index)
+        if code is None:
+            code = compile(CREATE_OPTIONS[index], f"<CREATE_OPTIONS[{index}]>", "eval")
+            createOptionsCode[index] = code
+        return eval(code, globals(), {"self": self})
+
+    def getParent(self, parent):
+        kind = parent[0]
+        if kind == "root":
+            return self.rootParent
+        if kind == "base":
+            return getattr(base, parent[1])
+        element = getattr(self, parent[1])
+        if kind == "canvas":
+            return element.getCanvas()
+        if kind == "node":
+            return getattr(element, parent[2])
+        return element
+
+    def show(self):
+        for name in TOP_LEVEL_ELEMENTS:
+            if getattr(self, name) is not None:
+                getattr(self, name).show()
+
+    def hide(self):
+        for name in TOP_LEVEL_ELEMENTS:
+            if getattr(self, name) is not None:
+                getattr(self, name).hide()
+
+    def destroy(self):
+        for name in LAZY_SUBTREES:
+            self.hideSubtree(name, release=True)
+        for name in TOP_LEVEL_ELEMENTS:
+            if getattr(self, name) is not None:
+                getattr(self, name).destroy()
@@ -0,0 +1,160 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# This file was created using the DirectGUI Designer
+
+from direct.gui import DirectGuiGlobals as DGG
+
+from direct.gui.DirectFrame import DirectFrame
+from direct.gui.DirectButton import DirectButton
+from direct.gui.DirectLabel import DirectLabel
+from direct.gui.DirectEntry import DirectEntry
+from direct.gui.DirectRadioButton import DirectRadioButton
+from direct.gui.DirectSlider import DirectSlider
+from direct.gui.DirectCheckButton import DirectCheckButton
+from direct.gui.DirectWaitBar import DirectWaitBar
+from direct.gui.DirectScrolledFrame import DirectScrolledFrame
+from panda3d.core import (
+    LPoint3f,
+    LVecBase3f,
+    LVecBase4f,
+    TextNode
+)
+
+class GUI:
+    def __init__(self, rootParent=None):
+        
+        self.frame = DirectFrame(
+            frameSize = (-1, 1, -1, 1),
+            frameColor = (1, 1, 1, 1),
+            pos = LPoint3f(0, 0, 0),
+            parent=rootParent,
+        )
+        self.frame.setTransparency(0)
+
+        self.button = DirectButton(
+            pos = LPoint3f(0, 0, 0),
+            scale = LVecBase3f(0.1, 0.1, 0.1),
+            text = 'button',
+            parent=rootParent,
+            pressEffect=1,
+        )
+        self.button.setTransparency(0)
+
+        self.label = DirectLabel(
+            pos = LPoint3f(0, 0, 0),
+            scale = LVecBase3f(0.1, 0.1, 0.1),
+            text = 'hello',
+            parent=rootParent,
+        )
+        self.label.setTransparency(1)
+
+        self.entry = DirectEntry(
+            pos = LPoint3f(0, 0, 0),
+            scale = LVecBase3f(0.1, 0.1, 0.1),
+            parent=rootParent,
+        )
+        self.entry.setTransparency(0)
+
+        self.radio1 = DirectRadioButton(
+            pos = LPoint3f(0, 0, 0),
+            scale = LVecBase3f(0.1, 0.1, 0.1),
+            text = 'Radiobutton',
+            others = ['radio2'],
+            parent=rootParent,
+            variable=[],
+            value=[],
+        )
+        self.radio1.setTransparency(0)
+
+        self.radio2 = DirectRadioButton(
+            pos = LPoint3f(0, 0, 0),
+            scale = LVecBase3f(0.1, 0.1, 0.1),
+            text = 'Radiobutton',
+            others = ['radio1'],
+            parent=rootParent,
+            variable=[],
+            value=[],
+        )
+        self.radio2.setTransparency(0)
+
+        self.slider = DirectSlider(
+            pos = LPoint3f(0, 0, 0),
+            text = 'Slider',
+            text0_scale = (0.1, 0.1),
+            parent=rootParent,
+        )
+        self.slider.setTransparency(0)
+
+        self.topleft = DirectFrame(
+            frameSize = (-1, 1, -1, 1),
+            frameColor = (1, 1, 1, 1),
+            pos = LPoint3f(0, 0, 0),
+            parent=rootParent,
+        )
+        self.topleft.setTransparency(0)
+
+        self.check = DirectCheckButton(
+            pos = LPoint3f(0, 0, 0),
+            scale = LVecBase3f(0.1, 0.1, 0.1),
+            text = 'Checkbutton',
+            parent=rootParent,
+        )
+        self.check.setTransparency(0)
+
+        self.waitbar = DirectWaitBar(
+            state = 'normal',
+            pos = LPoint3f(0, 0, 0),
+            text = '0%',
+            text0_scale = (0.1, 0.1),
+            parent=rootParent,
+        )
+        self.waitbar.setTransparency(0)
+
+        self.scrolled = DirectScrolledFrame(
+            state = 'normal',
+            frameColor = (1, 1, 1, 1),
+            pos = LPoint3f(0, 0, 0),
+            parent=rootParent,
+        )
+        self.scrolled.setTransparency(0)
+
+
+    def show(self):
+        self.frame.show()
+        self.button.show()
+        self.label.show()
+        self.entry.show()
+        self.radio1.show()
+        self.radio2.show()
+        self.slider.show()
+        self.topleft.show()
+        self.check.show()
+        self.waitbar.show()
+        self.scrolled.show()
+
+    def hide(self):
+        self.frame.hide()
+        self.button.hide()
+        self.label.hide()
+        self.entry.hide()
+        self.radio1.hide()
+        self.radio2.hide()
+        self.slider.hide()
+        self.topleft.hide()
+        self.check.hide()
+        self.waitbar.hide()
+        self.scrolled.hide()
+
+    def destroy(self):
+        self.frame.destroy()
+        self.button.destroy()
+        self.label.destroy()
+        self.entry.destroy()
+        self.radio1.destroy()
+        self.radio2.destroy()
+        self.slider.destroy()
+        self.topleft.destroy()
+        self.check.destroy()
+        self.waitbar.destroy()
+        self.scrolled.destroy()
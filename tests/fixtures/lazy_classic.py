@@ -0,0 +1,154 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# This file was created using the DirectGUI Designer
+
+from direct.gui import DirectGuiGlobals as DGG
+
+from direct.gui.DirectFrame import DirectFrame
+from direct.gui.DirectButton import DirectButton
+from direct.gui.DirectLabel import DirectLabel
+from panda3d.core import (
+    LPoint3f,
+    LVecBase3f,
+    LVecBase4f,
+    TextNode
+)
+
+# Elements which will only be created when they are shown the first time,
+# with all elements which will be created and released together with them
+LAZY_SUBTREES = {
+    'popup': ('popup', 'popupLabel',),
+    'panel': ('panel', 'panelBtn', 'sub', 'subLabel',),
+    'sub': ('sub', 'subLabel',),
+}
+
+class GUI:
+    def __init__(self, rootParent=None):
+        self.rootParent = rootParent
+        self.popup = None
+        self.popupLabel = None
+        self.panel = None
+        self.panelBtn = None
+        self.sub = None
+        self.subLabel = None
+
+        self.main = DirectFrame(
+            frameSize = (-1, 1, -1, 1),
+            frameColor = (1, 1, 1, 1),
+            pos = LPoint3f(0, 0, 0),
+            parent=rootParent,
+        )
+        self.main.setTransparency(0)
+
+        self.mainBtn = DirectButton(
+            pos = LPoint3f(0, 0, 0),
+            scale = LVecBase3f(0.1, 0.1, 0.1),
+            text = 'button',
+            parent=self.main,
+        )
+        self.mainBtn.setTransparency(0)
+
+
+    def create_popup(self):
+        rootParent = self.rootParent
+
+        self.popup = DirectFrame(
+            frameSize = (-1, 1, -1, 1),
+            frameColor = (1, 1, 1, 1),
+            pos = LPoint3f(0, 0, 0),
+            parent=self.main,
+        )
+        self.popup.setTransparency(0)
+
+        self.popupLabel = DirectLabel(
+            pos = LPoint3f(0, 0, 0),
+            scale = LVecBase3f(0.1, 0.1, 0.1),
+            text = 'hello',
+            parent=self.popup,
+        )
+        self.popupLabel.setTransparency(1)
+
+
+    def create_panel(self):
+        rootParent = self.rootParent
+
+        self.panel = DirectFrame(
+            frameSize = (-1, 1, -1, 1),
+            frameColor = (1, 1, 1, 1),
+            pos = LPoint3f(0, 0, 0),
+            parent=rootParent,
+        )
+        self.panel.setTransparency(0)
+
+        self.panelBtn = DirectButton(
+            pos = LPoint3f(0, 0, 0),
+            scale = LVecBase3f(0.1, 0.1, 0.1),
+            text = 'button',
+            parent=self.panel,
+        )
+        self.panelBtn.setTransparency(0)
+
+
+    def create_sub(self):
+        if self.panel is None:
+            self.create_panel()
+        rootParent = self.rootParent
+
+        self.sub = DirectFrame(
+            frameSize = (-1, 1, -1, 1),
+            frameColor = (1, 1, 1, 1),
+            pos = LPoint3f(0, 0, 0),
+            parent=self.panel,
+        )
+        self.sub.setTransparency(0)
+
+        self.subLabel = DirectLabel(
+            pos = LPoint3f(0, 0, 0),
+            scale = LVecBase3f(0.1, 0.1, 0.1),
+            text = 'hello',
+            parent=self.sub,
+        )
+        self.subLabel.setTransparency(1)
+
+
+    def show(self):
+        self.main.show()
+        if self.panel is not None:
+            self.panel.show()
+
+    def hide(self):
+        self.main.hide()
+        if self.panel is not None:
+            self.panel.hide()
+
+    def destroy(self):
+        self.hideSubtree('popup', release=True)
+        self.hideSubtree('panel', release=True)
+        self.hideSubtree('sub', release=True)
+        self.main.destroy()
+
+    def createSubtree(self, name):
+        getattr(self, f"create_{name}")()
+
+    def showSubtree(self, name):
+        """Show the lazily created element with the given name. The element
+        and its children will be created if they don't exist yet."""
+        if getattr(self, name) is None:
+            self.createSubtree(name)
+        getattr(self, name).show()
+
+    def hideSubtree(self, name, release=False):
+        """Hide the lazily created element with the given name. If release
+        is set, the element and its children will be destroyed and created
+        again by the next call to showSubtree."""
+        if getattr(self, name) is None:
+            return
+        if not release:
+            getattr(self, name).hide()
+            return
+        for elementName in reversed(LAZY_SUBTREES[name]):
+            element = getattr(self, elementName)
+            if element is not None:
+                element.destroy()
+                setattr(self, elementName, None)
@@ -0,0 +1,186 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# This file was created using the DirectGUI Designer
+
+from direct.gui import DirectGuiGlobals as DGG
+
+from direct.gui.DirectFrame import DirectFrame
+from direct.gui.DirectButton import DirectButton
+from direct.gui.DirectLabel import DirectLabel
+from panda3d.core import (
+    LPoint3f,
+    LVecBase3f,
+    LVecBase4f,
+    TextNode
+)
+import json
+
+
+# Name, widget class name, parent, options, options which need to be
+# created for each element, transparency and the lazily created element
+# each element will be created with. The parent is given as list of the kind of parent
+# and the names needed to find it. The options are indices into OPTION_SETS
+# and CREATE_OPTIONS.
+ELEMENTS = json.loads(r"""[
+["main", "DirectFrame", ["root"], 0, null, 0, null],
+["mainBtn", "DirectButton", ["element", "main"], 1, null, 0, null],
+["popup", "DirectFrame", ["element", "main"], 0, null, 0, "popup"],
+["popupLabel", "DirectLabel", ["element", "popup"], 2, null, 1, "popup"],
+["panel", "DirectFrame", ["root"], 0, null, 0, "panel"],
+["panelBtn", "DirectButton", ["element", "panel"], 1, null, 0, "panel"],
+["sub", "DirectFrame", ["element", "panel"], 0, null, 0, "sub"],
+["subLabel", "DirectLabel", ["element", "sub"], 2, null, 1, "sub"]
+]""")
+
+# Options with literal values, where lists stand for tuples, and options
+# with values of VALUE_TYPES, given as the name of the type and the
+# arguments to create the value with
+OPTION_SETS = json.loads(r"""[
+[{"frameSize": [-1, 1, -1, 1], "frameColor": [1, 1, 1, 1]}, {"pos": ["LPoint3f", [0, 0, 0]]}],
+[{"text": "button"}, {"pos": ["LPoint3f", [0, 0, 0]], "scale": ["LVecBase3f", [0.1, 0.1, 0.1]]}],
+[{"text": "hello"}, {"pos": ["LPoint3f", [0, 0, 0]], "scale": ["LVecBase3f", [0.1, 0.1, 0.1]]}]
+]""")
+
+VALUE_TYPES = {
+    'LPoint3f': LPoint3f,
+    'LVecBase3f': LVecBase3f,
+}
+
+# Source code of the options which have to be created for each element
+# when it's created, like mutable values, assets and commands. Each will be
+# compiled when it's needed the first time.
+CREATE_OPTIONS = (
+)
+
+# index in CREATE_OPTIONS: compiled code
+createOptionsCode = {}
+
+
+def toTuple(value):
+    """Returns the value read from JSON with all lists turned to tuples"""
+    if isinstance(value, list):
+        return tuple(toTuple(item) for item in value)
+    return value
+
+
+WIDGET_CLASSES = {
+    'DirectFrame': DirectFrame,
+    'DirectButton': DirectButton,
+    'DirectLabel': DirectLabel,
+}
+
+TOP_LEVEL_ELEMENTS = ('main', 'panel',)
+
+# Elements which will only be created when they are shown the first time,
+# with all elements which will be created and released together with them
+LAZY_SUBTREES = {
+    'popup': ('popup', 'popupLabel',),
+    'panel': ('panel', 'panelBtn', 'sub', 'subLabel',),
+    'sub': ('sub', 'subLabel',),
+}
+
+
+class GUI:
+    def __init__(self, rootParent=None):
+        self.rootParent = rootParent
+        for names in LAZY_SUBTREES.values():
+            for name in names:
+                setattr(self, name, None)
+        self.createElements(None)
+
+    def createElements(self, lazyRoot):
+        for name, widgetType, parent, options, createOptions, transparency, elementLazyRoot in ELEMENTS:
+            if elementLazyRoot != lazyRoot:
+                continue
+            options = self.getOptions(options)
+            if createOptions is not None:
+                options = {**options, **self.getCreateOptions(createOptions)}
+            widgetClass = WIDGET_CLASSES[widgetType]
+            if parent is None:
+                element = widgetClass(**options)
+            else:
+                element = widgetClass(parent=self.getParent(parent), **options)
+            if transparency is not None:
+                element.setTransparency(transparency)
+            setattr(self, name, element)
+
+    def create_popup(self):
+        self.createElements('popup')
+
+    def create_panel(self):
+        self.createElements('panel')
+
+    def create_sub(self):
+        if self.panel is None:
+            self.create_panel()
+        self.createElements('sub')
+
+    def getOptions(self, index):
+        literalOptions, valueOptions = OPTION_SETS[index]
+        options = {key: toTuple(value) for key, value in literalOptions.items()}
+        for key, (valueType, args) in valueOptions.items():
+            options[key] = VALUE_TYPES[valueType](*args)
+        return options
+
+    def getCreateOptions(self, index):
+        code = createOptionsCode.get(index)
+        if code is None:
+            code = compile(CREATE_OPTIONS[index], f"<CREATE_OPTIONS[{index}]>", "eval")
+            createOptionsCode[index] = code
+        return eval(code, globals(), {"self": self})
+
+    def getParent(self, parent):
+        kind = parent[0]
+        if kind == "root":
+            return self.rootParent
+        if kind == "base":
+            return getattr(base, parent[1])
+        element = getattr(self, parent[1])
+        if kind == "canvas":
+            return element.getCanvas()
+        if kind == "node":
+            return getattr(element, parent[2])
+        return element
+
+    def show(self):
+        for name in TOP_LEVEL_ELEMENTS:
+            if getattr(self, name) is not None:
+                getattr(self, name).show()
+
+    def hide(self):
+        for name in TOP_LEVEL_ELEMENTS:
+            if getattr(self, name) is not None:
+                getattr(self, name).hide()
+
+    def destroy(self):
+        for name in LAZY_SUBTREES:
+            self.hideSubtree(name, release=True)
+        for name in TOP_LEVEL_ELEMENTS:
+            if getattr(self, name) is not None:
+                getattr(self, name).destroy()
+
+    def createSubtree(self, name):
+        getattr(self, f"create_{name}")()
+
+    def showSubtree(self, name):
+        """Show the lazily created element with the given name. The element
+        and its children will be created if they don't exist yet."""
+        if getattr(self, name) is None:
+            self.createSubtree(name)
+        getattr(self, name).show()
+
+    def hideSubtree(self, name, release=False):
+        """Hide the lazily created element with the given name. If release
+        is set, the element and its children will be destroyed and created
+        again by the next call to showSubtree."""
+        if getattr(self, name) is None:
+            return
+        if not release:
+            getattr(self, name).hide()
+            return
+        for elementName in reversed(LAZY_SUBTREES[name]):
+            element = getattr(self, elementName)
+            if element is not None:
+                element.destroy()
+                setattr(self, elementName, None)
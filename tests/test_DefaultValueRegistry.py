@@ -0,0 +1,40 @@
+from DirectGuiDesigner.core.DefaultValueRegistry import DefaultValueRegistry
+from DirectGuiDesigner.tools.JSONTools import JSONTools
+
+
+def countNodePaths():
+    return render2d.findAllMatches("**").getNumPaths()
+
+
+def saveProject(editor):
+    return JSONTools().getProjectJSON(
+        editor.elementDict,
+        editor.getEditorFrame,
+        editor.editorFrame.getEditorRootCanvas,
+        editor.editorFrame.getAllEditorPlacers,
+        editor.allWidgetDefinitions,
+        False)
+
+
+def test_saveDoesNotCreateNodePaths(headlessEditor):
+    # the text of a button is an OnscreenText, which has no options method
+    elementInfo = headlessEditor.elementHandler.createDirectButton()
+    headlessEditor.elementDict[elementInfo.element.guiId] = elementInfo
+    try:
+        before = countNodePaths()
+        saveProject(headlessEditor)
+        elementInfo.invalidateJSONCache()
+        jsonProject = saveProject(headlessEditor)
+        assert countNodePaths() == before
+        assert elementInfo.name in jsonProject["ComponentList"]
+    finally:
+        headlessEditor.clear()
+
+
+def test_widgetWhichCantBeCreated(headlessEditor):
+    class NeedsArguments:
+        def __init__(self, value):
+            pass
+
+    # every value of such widgets counts as changed
+    assert DefaultValueRegistry.getDefaultValues(NeedsArguments, []) == {}
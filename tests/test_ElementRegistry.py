@@ -0,0 +1,33 @@
+from DirectGuiDesigner.core.ElementRegistry import ElementRegistry
+
+
+def createElements(editor, count):
+    elementInfos = []
+    for i in range(count):
+        elementInfo = editor.elementHandler.createDirectFrame()
+        elementInfo.name = "frame"
+        elementInfos.append(elementInfo)
+    return elementInfos
+
+
+def test_duplicateNames(headlessEditor):
+    first, second = createElements(headlessEditor, 2)
+    try:
+        registry = ElementRegistry()
+        registry[first.element.guiId] = first
+        registry[second.element.guiId] = second
+        assert registry.getByName("frame") is first
+
+        # the other element keeps the name
+        registry.rename(first, "renamed")
+        assert registry.getByName("frame") is second
+        assert registry.getByName("renamed") is first
+
+        registry.rename(first, "frame")
+        del registry[second.element.guiId]
+        assert registry.getByName("frame") is first
+        del registry[first.element.guiId]
+        assert registry.getByName("frame") is None
+    finally:
+        first.element.destroy()
+        second.element.destroy()
@@ -0,0 +1,67 @@
+import pytest
+
+from DirectGuiDesigner.core.KillRing import KillRing
+
+
+def test_transactionGroupsActions():
+    killRing = KillRing()
+    with killRing.transaction():
+        killRing.push("a", "set", "text", 1, 2)
+        killRing.push("b", "set", "text", 3, 4)
+    assert killRing.entryCount == 1
+    group = killRing.pop()
+    assert group.action == "group"
+    assert [entry.editObject for entry in group.newValue] == ["a", "b"]
+
+
+def test_transactionIsCommittedOnError():
+    killRing = KillRing()
+    with pytest.raises(RuntimeError):
+        with killRing.transaction():
+            killRing.push("a", "set", "text", 1, 2)
+            raise RuntimeError()
+    assert killRing.transactionDepth == 0
+    assert killRing.entryCount == 1
+
+    # following actions are added as their own entries again
+    killRing.push("b", "set", "text", 3, 4)
+    assert killRing.entryCount == 2
+
+
+def test_abortTransaction():
+    killRing = KillRing()
+    killRing.beginTransaction()
+    killRing.beginTransaction()
+    killRing.push("a", "set", "text", 1, 2)
+    killRing.abortTransaction()
+    assert killRing.transactionDepth == 0
+    assert killRing.entryCount == 1
+    killRing.push("b", "set", "text", 3, 4)
+    assert killRing.entryCount == 2
+
+
+def test_removedSubtreeNodesAreCountedOnce():
+    from panda3d.core import NodePath
+    root = NodePath("root")
+    parent = root.attachNewNode("parent")
+    child = parent.attachNewNode("child")
+    grandChild = child.attachNewNode("grandChild")
+    grandChild.attachNewNode("text")
+
+    killRing = KillRing()
+    with killRing.transaction():
+        for node in (parent, child, grandChild):
+            killRing.push(node, "kill", "element", None, None)
+    nodeCount = parent.countNumDescendants() + 1
+    assert nodeCount * killRing.nodeSize <= killRing.memoryUsage < (nodeCount + 1) * killRing.nodeSize
+
+
+def test_liveElementsAreNotCounted():
+    from panda3d.core import NodePath
+    element = NodePath("element")
+    for i in range(10):
+        element.attachNewNode("child")
+
+    killRing = KillRing()
+    killRing.push(element, "set", "text", "a", "b")
+    assert killRing.memoryUsage < killRing.nodeSize
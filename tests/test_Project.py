@@ -0,0 +1,85 @@
+import os
+
+import pytest
+from panda3d.core import ConfigVariableDouble
+
+import DirectGuiDesigner.loader.Project as Project
+from DirectGuiDesigner.loader.Project import ProjectLoader
+
+from conftest import FIXTURES
+
+PROJECT_PATH = os.path.join(FIXTURES, "classic.gui")
+
+
+class FileBrowser:
+    """Stands in for the file browser, which always picks the project"""
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get(self):
+        return PROJECT_PATH
+
+    def destroy(self):
+        pass
+
+
+@pytest.fixture
+def startLoad(headlessEditor, monkeypatch):
+    """Returns a function which starts loading the project like the
+    designer does, creating one element per frame"""
+    monkeypatch.setattr(Project, "DirectFolderBrowser", FileBrowser)
+    frameBudget = ConfigVariableDouble("project-load-frame-budget")
+    frameBudget.setValue(0)
+
+    def startLoad():
+        projectLoader = ProjectLoader(
+            PROJECT_PATH,
+            headlessEditor.visualEditorInfo,
+            headlessEditor.elementHandler,
+            headlessEditor.customWidgetsHandler,
+            headlessEditor.editorFrame.getEditorPlacer,
+            headlessEditor.allWidgetDefinitions,
+            newProjectCall=lambda: True)
+        projectLoader.Load(True)
+        return projectLoader
+
+    yield startLoad
+    frameBudget.clearLocalValue()
+    headlessEditor.warnings.clear()
+
+
+def finishLoad():
+    while ProjectLoader.isLoading():
+        taskMgr.step()
+
+
+def test_secondLoadIsRefused(startLoad, headlessEditor):
+    loaded = []
+    base.accept("updateElementDict-afterLoad", loaded.append)
+    try:
+        first = startLoad()
+        taskMgr.step()
+        assert ProjectLoader.isLoading()
+
+        second = startLoad()
+        assert len(headlessEditor.warnings) == 1
+        assert len(second.elementDict) == 0
+
+        finishLoad()
+        assert loaded == [first.elementDict]
+    finally:
+        base.ignore("updateElementDict-afterLoad")
+        first.cancelLoad()
+
+
+def test_failedLoadRemovesProgressDialog(startLoad, headlessEditor):
+    projectLoader = startLoad()
+    taskMgr.step()
+    assert projectLoader.progressDialog is not None
+
+    projectLoader.componentList = None
+    taskMgr.step()
+    assert not ProjectLoader.isLoading()
+    assert projectLoader.progressDialog is None
+    assert len(projectLoader.elementDict) == 0
+    assert len(headlessEditor.warnings) == 1
@@ -0,0 +1,69 @@
+"""Golden file tests of the python export. Each project in the fixtures
+folder has an expected script per export style, named <project>_<style>.py.
+If the generated code changes on purpose, export the fixtures again and
+review the differences of the expected scripts."""
+import os
+
+import pytest
+from panda3d.core import ConfigVariableString
+
+from DirectGuiDesigner.export.PyGenerator import PyGenerator
+from DirectGuiDesigner.tools.BatchExport import ProjectFileExporter
+
+from conftest import FIXTURES
+
+PROJECTS = ["classic", "lazy", "assets"]
+STYLES = ["classic", "table"]
+
+
+def getProjectPath(project):
+    return os.path.join(FIXTURES, f"{project}.gui")
+
+
+def getExpectedScript(project, style):
+    with open(os.path.join(FIXTURES, f"{project}_{style}.py")) as infile:
+        return infile.read()
+
+
+@pytest.fixture
+def exportStyle(request):
+    """Sets the export style used if none is given to the generator"""
+    configVariable = ConfigVariableString("python-export-style", "classic")
+    configVariable.setValue(request.param)
+    yield request.param
+    configVariable.clearLocalValue()
+
+
+@pytest.mark.parametrize("project", PROJECTS)
+@pytest.mark.parametrize("style", STYLES)
+def test_generateFromFile(project, style):
+    generator = PyGenerator(None, style)
+    content = generator.generateFromFile(getProjectPath(project))
+    assert content == getExpectedScript(project, style)
+
+
+@pytest.mark.parametrize("project", PROJECTS)
+@pytest.mark.parametrize("exportStyle", STYLES, indirect=True)
+def test_batchExport(project, exportStyle, tmp_path):
+    # the default of the batch export, without loading the project
+    scriptPath = os.path.join(tmp_path, f"{project}.py")
+    ProjectFileExporter().export(getProjectPath(project), scriptPath)
+    with open(scriptPath) as infile:
+        assert infile.read() == getExpectedScript(project, exportStyle)
+
+
+@pytest.mark.parametrize("project", PROJECTS)
+@pytest.mark.parametrize("exportStyle", STYLES, indirect=True)
+def test_exportLoadedProject(headlessEditor, project, exportStyle, tmp_path):
+    # the export of the designer, which uses the elements created for the
+    # loaded project instead of the project file
+    scriptPath = os.path.join(tmp_path, f"{project}.py")
+    headlessEditor.export(getProjectPath(project), scriptPath)
+    with open(scriptPath) as infile:
+        assert infile.read() == getExpectedScript(project, exportStyle)
+
+
+@pytest.mark.parametrize("project", PROJECTS)
+@pytest.mark.parametrize("style", STYLES)
+def test_expectedScriptsCompile(project, style):
+    compile(getExpectedScript(project, style), f"{project}_{style}.py", "exec")
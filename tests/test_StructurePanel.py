@@ -0,0 +1,91 @@
+import os
+
+import pytest
+from panda3d.core import getModelPath
+from direct.gui.DirectFrame import DirectFrame
+
+from DirectGuiDesigner.core.ElementInfo import ElementInfo
+from DirectGuiDesigner.core.ElementRegistry import ElementRegistry
+
+
+@pytest.fixture
+def structure(headlessEditor):
+    """Returns a structure panel showing the elements of a registry which
+    are placed below a root node"""
+    from DirectGuiDesigner.panels.StructurePanel import StructurePanel
+    import DirectGuiDesigner
+    # the panel loads its icons relative to the designer package
+    getModelPath().appendDirectory(os.path.dirname(DirectGuiDesigner.__file__))
+
+    parent = DirectFrame(frameSize=(0, 300, -400, 0), parent=base.pixel2d)
+    root = base.aspect2d.attachNewNode("structureRoot")
+    elementDict = ElementRegistry()
+    panel = StructurePanel(parent, lambda: root, elementDict, None)
+    yield panel, root, elementDict
+    root.removeNode()
+    parent.destroy()
+
+
+def addFrame(elementDict, parent):
+    frame = DirectFrame(parent=parent)
+    elementDict[frame.guiId] = ElementInfo(frame, "DirectFrame")
+    return frame
+
+
+def getTreeNodes(panel):
+    return [item[0] for item in panel.treeItems]
+
+
+def test_addsInOneFrameAreIndexedOnce(structure):
+    panel, root, elementDict = structure
+    first = addFrame(elementDict, root)
+    second = addFrame(elementDict, root)
+    panel.refreshStructureTree(elementDict, None)
+
+    reindexCount = panel.reindexCount
+    for i in range(20):
+        # every add marks the subtree of the new elements parent
+        panel.queueSubtreeRefresh(first)
+        addFrame(elementDict, first)
+        panel.queueSubtreeRefresh(second)
+        addFrame(elementDict, second)
+    panel.refreshQueuedSubtrees()
+    assert panel.reindexCount == reindexCount + 1
+    assert panel.dirtyNodes == {}
+
+    nodes = getTreeNodes(panel)
+    itemIndex = dict(panel.itemIndex)
+    panel.refreshStructureTree(elementDict, None)
+    assert nodes == getTreeNodes(panel)
+    assert itemIndex == panel.itemIndex
+
+
+def test_nestedSubtreesAreRefreshedWithTheirAncestor(structure):
+    panel, root, elementDict = structure
+    outer = addFrame(elementDict, root)
+    inner = addFrame(elementDict, outer)
+    panel.refreshStructureTree(elementDict, None)
+
+    panel.queueSubtreeRefresh(inner)
+    addFrame(elementDict, inner)
+    panel.queueSubtreeRefresh(outer)
+    addFrame(elementDict, outer)
+    rebuildCount = panel.rebuildCount
+    panel.refreshQueuedSubtrees()
+    assert panel.rebuildCount == rebuildCount
+
+    nodes = getTreeNodes(panel)
+    panel.refreshStructureTree(elementDict, None)
+    assert nodes == getTreeNodes(panel)
+
+
+def test_changesBelowTheRootRebuildTheTree(structure):
+    panel, root, elementDict = structure
+    panel.refreshStructureTree(elementDict, None)
+
+    panel.queueSubtreeRefresh(root)
+    frame = addFrame(elementDict, root)
+    rebuildCount = panel.rebuildCount
+    panel.refreshQueuedSubtrees()
+    assert panel.rebuildCount == rebuildCount + 1
+    assert getTreeNodes(panel) == [frame]